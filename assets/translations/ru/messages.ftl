@@ -1074,6 +1074,7 @@ msg-importer-sync-completed =
     Новые пользователи: { $added_users }
     Добавлены подписки: { $added_subscription }
     Обновлены подписки: { $updated}
+    Без изменений: { $unchanged }
     
     Пользователи без Telegram ID: { $missing_telegram }
     Ошибки при синхронизации: { $errors }
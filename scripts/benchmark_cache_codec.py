@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Compare the redis_cache serialization paths for the most cached DTOs.
+
+"legacy" is the former path: dump_python -> prepare_for_cache -> msgspec encode to str,
+and msgspec decode -> validate_python on reads. "current" is what redis_cache does now:
+dump_python -> msgspec encode with a SecretStr hook (zlib above the size threshold),
+and validate_json straight from bytes.
+
+Usage:
+  python scripts/benchmark_cache_codec.py
+  python scripts/benchmark_cache_codec.py --iterations 20000 --list-size 100
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import timeit
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Callable
+from uuid import uuid4
+
+from pydantic import SecretStr, TypeAdapter
+from remnapy.enums import TrafficLimitStrategy
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.core.enums import PlanType  # noqa: E402
+from src.core.utils import json_utils  # noqa: E402
+from src.core.utils.time import datetime_now  # noqa: E402
+from src.infrastructure.database.models.dto import (  # noqa: E402
+    PlanSnapshotDto,
+    SettingsDto,
+    SubscriptionDto,
+    UserDto,
+)
+from src.infrastructure.redis.cache import decode_from_cache, encode_for_cache  # noqa: E402
+
+
+def _prepare_for_cache(obj: Any) -> Any:
+    if isinstance(obj, SecretStr):
+        return obj.get_secret_value()
+    elif isinstance(obj, dict):
+        return {k: _prepare_for_cache(v) for k, v in obj.items()}
+    elif isinstance(obj, list):
+        return [_prepare_for_cache(v) for v in obj]
+    return obj
+
+
+def _subscription() -> SubscriptionDto:
+    return SubscriptionDto(
+        user_remna_id=uuid4(),
+        traffic_limit=100,
+        device_limit=3,
+        traffic_limit_strategy=TrafficLimitStrategy.NO_RESET,
+        internal_squads=[uuid4(), uuid4()],
+        external_squad=None,
+        expire_at=datetime_now() + timedelta(days=30),
+        url="https://example.com/sub/abcdef",
+        plan=PlanSnapshotDto(
+            id=1,
+            name="Monthly",
+            type=PlanType.BOTH,
+            traffic_limit=100,
+            device_limit=3,
+            duration=30,
+            internal_squads=[uuid4()],
+        ),
+    )
+
+
+def _user(telegram_id: int) -> UserDto:
+    return UserDto(
+        telegram_id=telegram_id,
+        username=f"user{telegram_id}",
+        referral_code=f"ref{telegram_id}",
+        name=f"User {telegram_id}",
+        current_subscription=_subscription(),
+    )
+
+
+def _legacy(adapter: TypeAdapter[Any]) -> tuple[Callable[[Any], Any], Callable[[Any], Any]]:
+    def encode(value: Any) -> bytes:
+        return json_utils.encode(_prepare_for_cache(adapter.dump_python(value))).encode()
+
+    def decode(raw: bytes) -> Any:
+        return adapter.validate_python(json_utils.decode(raw.decode()))
+
+    return encode, decode
+
+
+def _current(adapter: TypeAdapter[Any]) -> tuple[Callable[[Any], Any], Callable[[Any], Any]]:
+    def encode(value: Any) -> bytes:
+        return encode_for_cache(adapter.dump_python(value))
+
+    def decode(raw: bytes) -> Any:
+        return adapter.validate_json(decode_from_cache(raw))
+
+    return encode, decode
+
+
+def _run(name: str, value: Any, adapter: TypeAdapter[Any], iterations: int) -> None:
+    print(f"{name}:")  # noqa: T201
+
+    for codec_name, codec in (("legacy", _legacy), ("current", _current)):
+        encode, decode = codec(adapter)
+        raw = encode(value)
+        assert adapter.dump_python(decode(raw)) == adapter.dump_python(value)
+
+        encode_time = timeit.timeit(lambda: encode(value), number=iterations)
+        decode_time = timeit.timeit(lambda: decode(raw), number=iterations)
+        print(  # noqa: T201
+            f"  {codec_name:<8} encode {iterations / encode_time:>10,.0f} ops/s   "
+            f"decode {iterations / decode_time:>10,.0f} ops/s   size {len(raw):>7} B"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=10_000)
+    parser.add_argument("--list-size", type=int, default=50)
+    args = parser.parse_args()
+
+    users = [_user(telegram_id) for telegram_id in range(args.list_size)]
+
+    _run("UserDto", users[0], TypeAdapter(UserDto), args.iterations)
+    _run("SettingsDto", SettingsDto(), TypeAdapter(SettingsDto), args.iterations)
+    _run("SubscriptionDto", _subscription(), TypeAdapter(SubscriptionDto), args.iterations)
+    _run(
+        f"list[UserDto] ({args.list_size})",
+        users,
+        TypeAdapter(list[UserDto]),
+        max(1, args.iterations // args.list_size),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -22,6 +22,9 @@ def create_app(config: AppConfig, dispatcher: Dispatcher) -> FastAPI:
     telegram_webhook_endpoint = TelegramWebhookEndpoint(
         dispatcher=dispatcher,
         secret_token=config.bot.secret_token.get_secret_value(),
+        concurrency=config.bot.update_concurrency,
+        queue_size=config.bot.update_queue_size,
+        overflow_policy=config.bot.update_overflow_policy,
     )
     telegram_webhook_endpoint.register(app=app, path=config.bot.webhook_path)
     app.state.telegram_webhook_endpoint = telegram_webhook_endpoint
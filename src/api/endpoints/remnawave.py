@@ -1,19 +1,31 @@
-import traceback
-from typing import cast
+import hashlib
 
-from aiogram.utils.formatting import Text
 from dishka import FromDishka
 from dishka.integrations.fastapi import inject
 from fastapi import APIRouter, HTTPException, Request, Response, status
 from loguru import logger
+from redis.asyncio import Redis
 from remnapy.controllers import WebhookUtility
-from remnapy.models.webhook import NodeDto, UserDto, UserHwidDeviceEventDto
 
 from src.core.config import AppConfig
-from src.core.constants import API_V1, REMNAWAVE_WEBHOOK_PATH
-from src.core.utils.message_payload import MessagePayload
-from src.services.notification import NotificationService
-from src.services.remnawave import RemnawaveService
+from src.core.constants import (
+    API_V1,
+    REMNAWAVE_USER_EVENT_TTL,
+    REMNAWAVE_WEBHOOK_DEDUP_TTL,
+    REMNAWAVE_WEBHOOK_PATH,
+)
+from src.core.enums import RemnaUserEvent
+from src.core.storage.keys import (
+    RemnawaveUserEventsKey,
+    RemnawaveUserEventsOwnerKey,
+    RemnawaveWebhookKey,
+)
+from src.core.utils import json_utils
+from src.infrastructure.redis import PushResult, RedisRepository, discard_event, push_event
+from src.infrastructure.taskiq.tasks.remnawave import (
+    handle_remnawave_user_events_task,
+    handle_remnawave_webhook_task,
+)
 
 router = APIRouter(prefix=API_V1)
 
@@ -23,62 +35,66 @@ router = APIRouter(prefix=API_V1)
 async def remnawave_webhook(
     request: Request,
     config: FromDishka[AppConfig],
-    remnawave_service: FromDishka[RemnawaveService],
-    notification_service: FromDishka[NotificationService],
+    redis_client: FromDishka[Redis],
+    redis_repository: FromDishka[RedisRepository],
 ) -> Response:
     try:
-        raw_body = await request.body()
-        data = await request.json()
-        logger.debug(f"Received Remnawave webhook payload: '{data}'")
-        payload = WebhookUtility.parse_webhook(
-            body=raw_body.decode("utf-8"),
+        body = (await request.body()).decode("utf-8")
+        logger.debug(f"Received Remnawave webhook payload: '{body}'")
+        is_valid = WebhookUtility.validate_webhook_with_headers(
+            body=body,
             headers=dict(request.headers),
             webhook_secret=config.remnawave.webhook_secret.get_secret_value(),
-            validate=True,
         )
+        data = json_utils.decode(body) if is_valid else None
     except Exception as exception:
         logger.exception(f"Webhook validation failed with error '{exception}'")
         raise HTTPException(status_code=401)
 
-    if not payload:
+    if not data:
         logger.warning("Payload is empty after validation")
         raise HTTPException(status_code=401, detail="Unauthorized")
 
+    # NOTE: The panel redelivers on timeouts, identical bodies are handled once
+    dedup_key = RemnawaveWebhookKey(digest=hashlib.sha256(body.encode()).hexdigest())
+    if not await redis_repository.set(dedup_key, True, ex=REMNAWAVE_WEBHOOK_DEDUP_TTL, nx=True):
+        logger.debug(f"Duplicate Remnawave webhook '{data.get('event')}' skipped")
+        return Response(status_code=status.HTTP_200_OK)
+
+    event = data.get("event", "")
+
     try:
-        if WebhookUtility.is_user_event(payload.event):
-            user = cast(UserDto, WebhookUtility.get_typed_data(payload))
-            await remnawave_service.handle_user_event(payload.event, user)
+        if WebhookUtility.is_user_event(event):
+            # NOTE: Events of one user are applied in order by a single consumer,
+            # a burst of modifications collapses into the latest one still pending
+            user_uuid = data["data"]["uuid"]
+            queue_key = RemnawaveUserEventsKey(uuid=user_uuid).pack()
+            owner_key = RemnawaveUserEventsOwnerKey(uuid=user_uuid).pack()
+            queue_item = f"{event}\n{body}"
 
-        elif WebhookUtility.is_user_hwid_devices_event(payload.event):
-            event = cast(UserHwidDeviceEventDto, WebhookUtility.get_typed_data(payload))
-            await remnawave_service.handle_device_event(
-                payload.event,
-                event.user,
-                event.hwid_user_device,
+            pushed = await push_event(
+                redis_client,
+                queue_key,
+                owner_key,
+                queue_item,
+                ttl=REMNAWAVE_USER_EVENT_TTL,
+                coalesce_prefix=f"{RemnaUserEvent.MODIFIED}\n",
             )
 
-        elif WebhookUtility.is_node_event(payload.event):
-            node = cast(NodeDto, WebhookUtility.get_typed_data(payload))
-            await remnawave_service.handle_node_event(payload.event, node)
-
+            if pushed == PushResult.SCHEDULE:
+                try:
+                    await handle_remnawave_user_events_task.kiq(user_uuid)
+                except Exception:
+                    await discard_event(redis_client, queue_key, owner_key, queue_item)
+                    raise
+            elif pushed == PushResult.COALESCED:
+                logger.debug(f"Coalesced modification for RemnaUser '{user_uuid}'")
         else:
-            logger.warning(f"Unhandled Remnawave event type '{payload.event}'")
-
+            await handle_remnawave_webhook_task.kiq(body)
     except Exception as exception:
-        logger.exception(f"Failed to process Remnawave webhook due to '{exception}'")
-        traceback_str = traceback.format_exc()
-        error_type_name = type(exception).__name__
-        error_message = Text(str(exception)[:512])
-
-        await notification_service.error_notify(
-            traceback_str=traceback_str,
-            payload=MessagePayload.not_deleted(
-                i18n_key="ntf-event-error",
-                i18n_kwargs={
-                    "user": False,
-                    "error": f"{error_type_name}: {error_message.as_html()}",
-                },
-            ),
-        )
+        # NOTE: Let the panel retry instead of losing the event
+        logger.exception(f"Failed to enqueue Remnawave webhook due to '{exception}'")
+        await redis_repository.delete(dedup_key)
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE)
 
     return Response(status_code=status.HTTP_200_OK)
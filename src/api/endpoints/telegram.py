@@ -1,24 +1,61 @@
 import asyncio
 import secrets
-from typing import Annotated, Any
+from collections import deque
+from typing import Annotated, Any, Hashable
 
 from aiogram import Bot, Dispatcher
 from aiogram.methods import TelegramMethod
 from aiogram.types import Update
+from aiogram.types.update import UpdateTypeLookupError
 from dishka.integrations.fastapi import FromDishka, inject
 from fastapi import Body, FastAPI, Header, HTTPException, Response, status
 from loguru import logger
 
+from src.core.enums import UpdateOverflowPolicy
+
 
 class TelegramWebhookEndpoint:
     dispatcher: Dispatcher
     secret_token: str
+    overflow_policy: UpdateOverflowPolicy
     _feed_update_tasks: set[asyncio.Task[Any]]
+    _lanes: dict[Hashable, deque[Update]]
+    _queue_slots: asyncio.Semaphore
+    _workers: asyncio.Semaphore
+    _queued: int
+    _in_flight: int
+    _peak_queued: int
+    _overflowed: int
 
-    def __init__(self, dispatcher: Dispatcher, secret_token: str) -> None:
+    def __init__(
+        self,
+        dispatcher: Dispatcher,
+        secret_token: str,
+        concurrency: int,
+        queue_size: int,
+        overflow_policy: UpdateOverflowPolicy = UpdateOverflowPolicy.WAIT,
+    ) -> None:
         self.dispatcher = dispatcher
         self.secret_token = secret_token
+        self.overflow_policy = overflow_policy
         self._feed_update_tasks = set()
+        self._lanes = {}
+        self._queue_slots = asyncio.Semaphore(queue_size)
+        self._workers = asyncio.Semaphore(concurrency)
+        self._queued = 0
+        self._in_flight = 0
+        self._peak_queued = 0
+        self._overflowed = 0
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return {
+            "queued": self._queued,
+            "in_flight": self._in_flight,
+            "lanes": len(self._lanes),
+            "peak_queued": self._peak_queued,
+            "overflowed": self._overflowed,
+        }
 
     async def startup(self) -> None:
         await self.dispatcher.emit_startup(**self.dispatcher.workflow_data)
@@ -31,6 +68,7 @@ class TelegramWebhookEndpoint:
                 task.cancel()
 
         await asyncio.gather(*self._feed_update_tasks, return_exceptions=True)
+        logger.info(f"Update processing stopped: {self.stats}")
 
     def register(self, app: FastAPI, path: str) -> None:
         app.add_api_route(path=path, endpoint=self._handle_request, methods=["POST"])
@@ -43,6 +81,63 @@ class TelegramWebhookEndpoint:
         if isinstance(result, TelegramMethod):
             await self.dispatcher.silent_call_request(bot=bot, result=result)
 
+    @staticmethod
+    def _get_lane_key(update: Update) -> Hashable:
+        # NOTE: Updates of one user are processed in order, the rest have no ordering needs
+        try:
+            event = update.event
+        except UpdateTypeLookupError:
+            return ("update", update.update_id)
+
+        user = getattr(event, "from_user", None)
+        if user is not None:
+            return ("user", user.id)
+
+        chat = getattr(event, "chat", None)
+        if chat is not None:
+            return ("chat", chat.id)
+
+        return ("update", update.update_id)
+
+    def _enqueue(self, bot: Bot, update: Update) -> None:
+        self._queued += 1
+        self._peak_queued = max(self._peak_queued, self._queued)
+
+        key = self._get_lane_key(update)
+        lane = self._lanes.get(key)
+
+        if lane is not None:
+            lane.append(update)
+            return
+
+        self._lanes[key] = deque([update])
+        task = asyncio.create_task(self._run_lane(bot, key))
+        self._feed_update_tasks.add(task)
+        task.add_done_callback(self._feed_update_tasks.discard)
+
+    async def _run_lane(self, bot: Bot, key: Hashable) -> None:
+        lane = self._lanes[key]
+
+        try:
+            while lane:
+                update = lane[0]
+
+                try:
+                    async with self._workers:
+                        self._in_flight += 1
+                        try:
+                            await self._feed_update(bot=bot, update=update)
+                        finally:
+                            self._in_flight -= 1
+                except Exception as exception:
+                    logger.exception(f"Failed to process update '{update.update_id}': {exception}")
+                finally:
+                    lane.popleft()
+                    self._queued -= 1
+                    self._queue_slots.release()
+        finally:
+            self._lanes.pop(key, None)
+
     @inject
     async def _handle_request(
         self,
@@ -54,9 +149,29 @@ class TelegramWebhookEndpoint:
             logger.warning(f"Invalid secret token for update '{update.update_id}'")
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Unauthorized")
 
-        task = asyncio.create_task(self._feed_update(bot=bot, update=update))
-        self._feed_update_tasks.add(task)
-        task.add_done_callback(self._feed_update_tasks.discard)
+        if self._queue_slots.locked():
+            if self.overflow_policy != UpdateOverflowPolicy.WAIT:
+                self._overflowed += 1
+
+            logger.warning(
+                f"Update queue is full, applying '{self.overflow_policy}' "
+                f"to update '{update.update_id}': {self.stats}"
+            )
+
+            if self.overflow_policy == UpdateOverflowPolicy.REJECT:
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Update queue is full",
+                )
+
+            if self.overflow_policy == UpdateOverflowPolicy.DROP:
+                return Response(status_code=status.HTTP_200_OK)
+
+        await self._queue_slots.acquire()
+        self._enqueue(bot=bot, update=update)
 
-        logger.debug(f"Update '{update.update_id}' scheduled for processing")
+        logger.debug(
+            f"Update '{update.update_id}' scheduled for processing "
+            f"(queued={self._queued}, in_flight={self._in_flight})"
+        )
         return Response(status_code=status.HTTP_200_OK)
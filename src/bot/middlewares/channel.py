@@ -1,5 +1,5 @@
 import traceback
-from typing import Any, Awaitable, Callable, Union
+from typing import Any, Awaitable, Callable, Optional, Union
 
 from aiogram import Bot
 from aiogram.enums import ChatMemberStatus
@@ -9,10 +9,17 @@ from dishka import AsyncContainer
 from loguru import logger
 
 from src.bot.keyboards import CALLBACK_CHANNEL_CONFIRM, get_channel_keyboard, get_user_keyboard
-from src.core.constants import CONTAINER_KEY, USER_KEY
+from src.core.constants import (
+    CHANNEL_MEMBER_CACHE_TTL,
+    CHANNEL_NON_MEMBER_CACHE_TTL,
+    CONTAINER_KEY,
+    USER_KEY,
+)
 from src.core.enums import MiddlewareEventType
+from src.core.storage.keys import ChannelMemberKey
 from src.core.utils.message_payload import MessagePayload
 from src.infrastructure.database.models.dto import UserDto
+from src.infrastructure.redis import RedisRepository
 from src.services.notification import NotificationService
 from src.services.settings import SettingsService
 
@@ -63,39 +70,59 @@ class ChannelMiddleware(EventTypedMiddleware):
             )
             return await handler(event, data)
 
-        try:
-            member = await bot.get_chat_member(
-                chat_id=chat_id,
-                user_id=user.telegram_id,
-            )
-        except Exception as exception:
-            traceback_str = traceback.format_exc()
-            error_type_name = type(exception).__name__
-            error_message = Text(str(exception)[:512])
-
-            await notification_service.error_notify(
-                error_id=user.telegram_id,
-                traceback_str=traceback_str,
-                payload=MessagePayload.not_deleted(
-                    i18n_key="ntf-event-error",
-                    i18n_kwargs={
-                        "user": True,
-                        "user_id": str(user.telegram_id),
-                        "user_name": user.name,
-                        "username": user.username or False,
-                        "error": f"{error_type_name}: Skipped channel required '{channel_link}' "
-                        + f"check due to error: {error_message.as_html()}",
-                    },
-                    reply_markup=get_user_keyboard(user.telegram_id),
+        redis_repository: RedisRepository = await container.get(RedisRepository)
+        cache_key = ChannelMemberKey(chat_id=chat_id, user_id=user.telegram_id)
+        status: Optional[ChatMemberStatus] = None
+
+        # NOTE: A confirm click means the user claims to have just joined, always re-check it
+        if not self._is_click_confirm(event):
+            status = await redis_repository.get(cache_key, ChatMemberStatus)
+
+        if status is None:
+            try:
+                member = await bot.get_chat_member(
+                    chat_id=chat_id,
+                    user_id=user.telegram_id,
+                )
+            except Exception as exception:
+                traceback_str = traceback.format_exc()
+                error_type_name = type(exception).__name__
+                error_message = Text(str(exception)[:512])
+
+                await notification_service.error_notify(
+                    error_id=user.telegram_id,
+                    traceback_str=traceback_str,
+                    payload=MessagePayload.not_deleted(
+                        i18n_key="ntf-event-error",
+                        i18n_kwargs={
+                            "user": True,
+                            "user_id": str(user.telegram_id),
+                            "user_name": user.name,
+                            "username": user.username or False,
+                            "error": f"{error_type_name}: Skipped channel required "
+                            + f"'{channel_link}' check due to error: {error_message.as_html()}",
+                        },
+                        reply_markup=get_user_keyboard(user.telegram_id),
+                    ),
+                )
+                return await handler(event, data)
+
+            status = member.status
+            await redis_repository.set(
+                cache_key,
+                status,
+                ex=(
+                    CHANNEL_MEMBER_CACHE_TTL
+                    if status in ALLOWED_STATUSES
+                    else CHANNEL_NON_MEMBER_CACHE_TTL
                 ),
             )
-            return await handler(event, data)
 
-        if member.status in ALLOWED_STATUSES:
+        if status in ALLOWED_STATUSES:
             if self._is_click_confirm(event):
                 await self._delete_channel_message(event)
 
-            logger.debug(f"User '{user.telegram_id}' passed channel check. Status: {member.status}")
+            logger.debug(f"User '{user.telegram_id}' passed channel check. Status: {status}")
             # TODO: Auto confirming
             return await handler(event, data)
 
@@ -113,7 +140,7 @@ class ChannelMiddleware(EventTypedMiddleware):
             logger.debug(f"User '{user.telegram_id}' failed channel check")
             return
 
-        if member.status == ChatMemberStatus.LEFT:
+        if status == ChatMemberStatus.LEFT:
             i18n_key = "ntf-channel-join-required-left"
         else:
             i18n_key = "ntf-channel-join-required"
@@ -1,7 +1,6 @@
 from typing import Any, Awaitable, Callable
 
 from aiogram.types import TelegramObject
-from cachetools import TTLCache
 from dishka import AsyncContainer
 from loguru import logger
 
@@ -9,6 +8,7 @@ from src.core.constants import CONTAINER_KEY, USER_KEY
 from src.core.enums import MiddlewareEventType
 from src.core.utils.message_payload import MessagePayload
 from src.infrastructure.database.models.dto import UserDto
+from src.infrastructure.redis import UserThrottler
 from src.services.notification import NotificationService
 
 from .base import EventTypedMiddleware
@@ -17,9 +17,6 @@ from .base import EventTypedMiddleware
 class ThrottlingMiddleware(EventTypedMiddleware):
     __event_types__ = [MiddlewareEventType.MESSAGE, MiddlewareEventType.CALLBACK_QUERY]
 
-    def __init__(self, ttl: float = 0.5) -> None:
-        self.cache: TTLCache[int, Any] = TTLCache(maxsize=10_000, ttl=ttl)
-
     async def middleware_logic(
         self,
         handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
@@ -29,15 +26,16 @@ class ThrottlingMiddleware(EventTypedMiddleware):
         container: AsyncContainer = data[CONTAINER_KEY]
         user: UserDto = data[USER_KEY]
 
-        notification_service: NotificationService = await container.get(NotificationService)
+        throttler: UserThrottler = await container.get(UserThrottler)
+        retry_after_ms = await throttler.hit(user.telegram_id, user.role)
 
-        if user.telegram_id in self.cache:
+        if retry_after_ms:
+            notification_service: NotificationService = await container.get(NotificationService)
             await notification_service.notify_user(
                 user=user,
                 payload=MessagePayload(i18n_key="ntf-throttling-many-requests"),
             )
-            logger.warning(f"User '{user.telegram_id}' throttled")
+            logger.warning(f"User '{user.telegram_id}' throttled for '{retry_after_ms}' ms")
             return
 
-        self.cache[user.telegram_id] = None
         return await handler(event, data)
@@ -104,7 +104,7 @@ async def view_getter(
     if not task_id:
         raise ValueError("Task ID not found in dialog data")
 
-    broadcast = await broadcast_service.get(task_id)
+    broadcast = await broadcast_service.get_state(task_id)
 
     if not broadcast:
         raise ValueError(f"Broadcast '{task_id}' not found")
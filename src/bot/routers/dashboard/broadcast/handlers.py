@@ -288,23 +288,20 @@ async def on_send(
         raise ValueError("BroadcastAudience not found in dialog data")
 
     if is_double_click(dialog_manager, key="broadcast_confirm", cooldown=10):
-        users = await broadcast_service.get_audience_users(audience, plan_id=plan_id)
+        audience_count = await broadcast_service.get_audience_count(audience, plan_id=plan_id)
 
         task_id = uuid.uuid4()
         broadcast = BroadcastDto(
             task_id=task_id,
             status=BroadcastStatus.PROCESSING,
-            total_count=len(users),
+            total_count=audience_count,
             audience=audience,
             payload=payload,
+            plan_id=plan_id,
         )
         broadcast = await broadcast_service.create(broadcast)
 
-        task = (
-            await send_broadcast_task.kicker()
-            .with_task_id(str(task_id))
-            .kiq(broadcast, users, payload)
-        )
+        task = await send_broadcast_task.kicker().with_task_id(str(task_id)).kiq(broadcast)
 
         dialog_manager.dialog_data["task_id"] = task.task_id
         await dialog_manager.switch_to(state=DashboardBroadcast.VIEW)
@@ -327,7 +324,7 @@ async def on_cancel(
 ) -> None:
     user: UserDto = dialog_manager.middleware_data[USER_KEY]
     task_id = dialog_manager.dialog_data["task_id"]
-    broadcast = await broadcast_service.get(task_id)
+    broadcast = await broadcast_service.get_state(task_id)
 
     if not broadcast:
         raise ValueError(f"Broadcast '{task_id}' not found")
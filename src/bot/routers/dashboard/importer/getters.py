@@ -3,7 +3,8 @@ from typing import Any
 from aiogram_dialog import DialogManager
 from dishka import FromDishka
 from dishka.integrations.aiogram_dialog import inject
-from remnapy import RemnawaveSDK
+
+from src.services.remnawave import RemnawaveService
 
 
 async def from_xui_getter(
@@ -28,10 +29,10 @@ async def from_xui_getter(
 @inject
 async def squads_getter(
     dialog_manager: DialogManager,
-    remnawave: FromDishka[RemnawaveSDK],
+    remnawave_service: FromDishka[RemnawaveService],
     **kwargs: Any,
 ) -> dict[str, Any]:
-    result = await remnawave.internal_squads.get_internal_squads()
+    internal_squads = await remnawave_service.get_internal_squads()
     selected_squads = dialog_manager.dialog_data.get("selected_squads", [])
 
     squads = [
@@ -40,7 +41,7 @@ async def squads_getter(
             "name": squad.name,
             "selected": True if str(squad.uuid) in selected_squads else False,
         }
-        for squad in result.internal_squads
+        for squad in internal_squads
     ]
 
     return {"squads": squads}
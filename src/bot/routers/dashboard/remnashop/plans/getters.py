@@ -4,13 +4,13 @@ from typing import Any, Optional
 from aiogram_dialog import DialogManager
 from dishka import FromDishka
 from dishka.integrations.aiogram_dialog import inject
-from remnapy import RemnawaveSDK
 from remnapy.enums.users import TrafficLimitStrategy
 
 from src.core.enums import Currency, PlanAvailability, PlanType
 from src.core.utils.adapter import DialogDataAdapter
 from src.infrastructure.database.models.dto import PlanDto, PlanDurationDto, PlanPriceDto
 from src.services.plan import PlanService
+from src.services.remnawave import RemnawaveService
 
 
 @inject
@@ -211,7 +211,7 @@ async def allowed_users_getter(dialog_manager: DialogManager, **kwargs: Any) ->
 @inject
 async def squads_getter(
     dialog_manager: DialogManager,
-    remnawave: FromDishka[RemnawaveSDK],
+    remnawave_service: FromDishka[RemnawaveService],
     **kwargs: Any,
 ) -> dict[str, Any]:
     adapter = DialogDataAdapter(dialog_manager)
@@ -220,14 +220,14 @@ async def squads_getter(
     if not plan:
         raise ValueError("PlanDto not found in dialog data")
 
-    internal_response = await remnawave.internal_squads.get_internal_squads()
-    internal_dict = {s.uuid: s.name for s in internal_response.internal_squads}
+    internal_squads = await remnawave_service.get_internal_squads()
+    internal_dict = {s.uuid: s.name for s in internal_squads}
     internal_squads_names = ", ".join(
         internal_dict.get(squad, str(squad)) for squad in plan.internal_squads
     )
 
-    external_response = await remnawave.external_squads.get_external_squads()
-    external_dict = {s.uuid: s.name for s in external_response.external_squads}
+    external_squads = await remnawave_service.get_external_squads()
+    external_dict = {s.uuid: s.name for s in external_squads}
     external_squad_name = external_dict.get(plan.external_squad) if plan.external_squad else False
 
     return {
@@ -239,7 +239,7 @@ async def squads_getter(
 @inject
 async def internal_squads_getter(
     dialog_manager: DialogManager,
-    remnawave: FromDishka[RemnawaveSDK],
+    remnawave_service: FromDishka[RemnawaveService],
     **kwargs: Any,
 ) -> dict[str, Any]:
     adapter = DialogDataAdapter(dialog_manager)
@@ -248,8 +248,8 @@ async def internal_squads_getter(
     if not plan:
         raise ValueError("PlanDto not found in dialog data")
 
-    result = await remnawave.internal_squads.get_internal_squads()
-    existing_squad_uuids = {squad.uuid for squad in result.internal_squads}
+    internal_squads = await remnawave_service.get_internal_squads()
+    existing_squad_uuids = {squad.uuid for squad in internal_squads}
 
     if plan.internal_squads:
         plan_squad_uuids_set = set(plan.internal_squads)
@@ -264,7 +264,7 @@ async def internal_squads_getter(
             "name": squad.name,
             "selected": True if squad.uuid in plan.internal_squads else False,
         }
-        for squad in result.internal_squads
+        for squad in internal_squads
     ]
 
     return {
@@ -275,7 +275,7 @@ async def internal_squads_getter(
 @inject
 async def external_squads_getter(
     dialog_manager: DialogManager,
-    remnawave: FromDishka[RemnawaveSDK],
+    remnawave_service: FromDishka[RemnawaveService],
     **kwargs: Any,
 ) -> dict[str, Any]:
     adapter = DialogDataAdapter(dialog_manager)
@@ -284,8 +284,8 @@ async def external_squads_getter(
     if not plan:
         raise ValueError("PlanDto not found in dialog data")
 
-    result = await remnawave.external_squads.get_external_squads()
-    existing_squad_uuids = {squad.uuid for squad in result.external_squads}
+    external_squads = await remnawave_service.get_external_squads()
+    existing_squad_uuids = {squad.uuid for squad in external_squads}
 
     if plan.external_squad and plan.external_squad not in existing_squad_uuids:
         plan.external_squad = None
@@ -298,7 +298,7 @@ async def external_squads_getter(
             "name": squad.name,
             "selected": True if squad.uuid == plan.external_squad else False,
         }
-        for squad in result.external_squads
+        for squad in external_squads
     ]
 
     return {
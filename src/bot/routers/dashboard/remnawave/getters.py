@@ -14,6 +14,7 @@ from src.core.utils.formatters import (
     i18n_format_bytes_to_unit,
     i18n_format_seconds,
 )
+from src.services.remnawave import RemnawaveService
 
 PAGE_SIZE = 10
 
@@ -81,11 +82,11 @@ async def users_getter(
 @inject
 async def hosts_getter(
     dialog_manager: DialogManager,
-    remnawave: FromDishka[RemnawaveSDK],
+    remnawave_service: FromDishka[RemnawaveService],
     i18n: FromDishka[TranslatorRunner],
     **kwargs: Any,
 ) -> dict[str, Any]:
-    result = await remnawave.hosts.get_all_hosts()
+    result = await remnawave_service.get_hosts()
 
     hosts_list: list[dict[str, Any]] = []
     hosts_details: list[str] = []
@@ -125,7 +126,7 @@ async def hosts_getter(
 @inject
 async def host_getter(
     dialog_manager: DialogManager,
-    remnawave: FromDishka[RemnawaveSDK],
+    remnawave_service: FromDishka[RemnawaveService],
     i18n: FromDishka[TranslatorRunner],
     **kwargs: Any,
 ) -> dict[str, Any]:
@@ -133,7 +134,11 @@ async def host_getter(
     details: list[str] = dialog_manager.dialog_data.get("hosts_details", [])
 
     if not details:
-        await hosts_getter(dialog_manager=dialog_manager, remnawave=remnawave, i18n=i18n)
+        await hosts_getter(
+            dialog_manager=dialog_manager,
+            remnawave_service=remnawave_service,
+            i18n=i18n,
+        )
         details = dialog_manager.dialog_data.get("hosts_details", [])
 
     if not details:
@@ -146,11 +151,11 @@ async def host_getter(
 @inject
 async def nodes_getter(
     dialog_manager: DialogManager,
-    remnawave: FromDishka[RemnawaveSDK],
+    remnawave_service: FromDishka[RemnawaveService],
     i18n: FromDishka[TranslatorRunner],
     **kwargs: Any,
 ) -> dict[str, Any]:
-    result = await remnawave.nodes.get_all_nodes()
+    result = await remnawave_service.get_nodes()
     nodes_list: list[dict[str, Any]] = []
     nodes_details: list[str] = []
 
@@ -203,7 +208,7 @@ async def nodes_getter(
 @inject
 async def node_getter(
     dialog_manager: DialogManager,
-    remnawave: FromDishka[RemnawaveSDK],
+    remnawave_service: FromDishka[RemnawaveService],
     i18n: FromDishka[TranslatorRunner],
     **kwargs: Any,
 ) -> dict[str, Any]:
@@ -211,7 +216,11 @@ async def node_getter(
     details: list[str] = dialog_manager.dialog_data.get("nodes_details", [])
 
     if not details:
-        await nodes_getter(dialog_manager=dialog_manager, remnawave=remnawave, i18n=i18n)
+        await nodes_getter(
+            dialog_manager=dialog_manager,
+            remnawave_service=remnawave_service,
+            i18n=i18n,
+        )
         details = dialog_manager.dialog_data.get("nodes_details", [])
 
     if not details:
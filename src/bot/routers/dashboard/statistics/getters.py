@@ -6,32 +6,19 @@ from dishka import FromDishka
 from dishka.integrations.aiogram_dialog import inject
 from fluentogram import TranslatorRunner
 
-from src.core.enums import Currency, PaymentGatewayType, PromocodeRewardType, SubscriptionStatus
+from src.core.enums import Currency, PaymentGatewayType, PromocodeRewardType
 from src.core.utils.formatters import format_percent, i18n_format_days
-from src.core.utils.time import datetime_now
-from src.infrastructure.database.models.dto import (
-    PlanDto,
-    PromocodeDto,
-    SubscriptionDto,
-    TransactionDto,
-    UserDto,
-)
+from src.infrastructure.database.models.dto import PlanDto
 from src.services.plan import PlanService
-from src.services.promocode import PromocodeService
-from src.services.subscription import SubscriptionService
-from src.services.transaction import TransactionService
-from src.services.user import UserService
+from src.services.statistics import StatisticsService
 
 
 @inject
 async def statistics_getter(
     dialog_manager: DialogManager,
     i18n: FromDishka[TranslatorRunner],
-    users_service: FromDishka[UserService],
-    transaction_service: FromDishka[TransactionService],
-    subscription_service: FromDishka[SubscriptionService],
+    statistics_service: FromDishka[StatisticsService],
     plan_service: FromDishka[PlanService],
-    promocode_service: FromDishka[PromocodeService],
     **kwargs: Any,
 ) -> dict[str, Any]:
     widget: Optional[ManagedScroll] = dialog_manager.find("statistics")
@@ -43,27 +30,23 @@ async def statistics_getter(
 
     match current_page:
         case 0:
-            users = await users_service.get_all()
-            transactions = await transaction_service.get_all()
-            subscriptions = await subscription_service.get_all()
-            statistics = get_users_statistics(users, transactions, subscriptions)
+            users = await statistics_service.get_users_statistics()
+            statistics = get_users_statistics(users)
             template = "msg-statistics-users"
         case 1:
-            transactions = await transaction_service.get_all()
+            transactions = await statistics_service.get_transactions_statistics()
             statistics = get_transactions_statistics(transactions, i18n)
             template = "msg-statistics-transactions"
         case 2:
-            subscriptions = await subscription_service.get_all()
-            statistics = get_subscriptions_statistics(subscriptions)
+            statistics = await statistics_service.get_subscriptions_statistics()
             template = "msg-statistics-subscriptions"
         case 3:
             plans = await plan_service.get_all()
-            subscriptions = await subscription_service.get_all()
-            transactions = await transaction_service.get_all()
-            statistics = get_plans_statistics(plans, subscriptions, transactions, i18n)
+            plans_statistics = await statistics_service.get_plans_statistics()
+            statistics = get_plans_statistics(plans, plans_statistics, i18n)
             template = "msg-statistics-plans"
         case 4:
-            promocodes = await promocode_service.get_all()
+            promocodes = await statistics_service.get_promocodes_statistics()
             statistics = get_promocodes_statistics(promocodes)
             template = "msg-statistics-promocodes"
         case 5:
@@ -82,139 +65,58 @@ async def statistics_getter(
     }
 
 
-def get_users_statistics(
-    users: list[UserDto],
-    transactions: list[TransactionDto],
-    subscriptions: list[SubscriptionDto],
-) -> dict[str, Any]:
-    total_users = len(users)
-    new_users_daily = sum(1 for u in users if u.age_days is not None and u.age_days == 0)
-    new_users_weekly = sum(1 for u in users if u.age_days is not None and u.age_days <= 7)
-    new_users_monthly = sum(1 for u in users if u.age_days is not None and u.age_days <= 30)
-
-    users_with_subscription = sum(1 for u in users if u.current_subscription)
-    users_without_subscription = total_users - users_with_subscription
-    users_with_trial = sum(
-        1 for u in users if u.current_subscription and u.current_subscription.is_trial
-    )
-
-    blocked_users = sum(1 for u in users if u.is_blocked)
-    bot_blocked_users = sum(1 for u in users if u.is_bot_blocked)
-
-    paying_users_ids = {
-        t.user.id
-        for t in transactions
-        if t.is_completed and not t.pricing.is_free and t.user is not None
-    }
-    user_conversion = format_percent(len(paying_users_ids), total_users) if total_users else 0
-
-    trial_users = 0
-    converted_from_trial = 0
-
-    subs_by_user: dict[int, list[SubscriptionDto]] = {}
-    for s in subscriptions:
-        if not s.user:
-            continue
-
-        subs_by_user.setdefault(s.user.telegram_id, []).append(s)
-
-    for user in users:
-        user_subs = subs_by_user.get(user.telegram_id, [])
-
-        if not user_subs:
-            continue
-
-        had_trial = any(s.is_trial for s in user_subs)
-        if had_trial:
-            trial_users += 1
-            converted = any(not s.is_trial and s for s in user_subs)
-            if converted:
-                converted_from_trial += 1
-
-    trial_conversion = format_percent(converted_from_trial, trial_users) if trial_users else 0
+def get_users_statistics(users: dict[str, Any]) -> dict[str, Any]:
+    total_users = users["total_users"]
+    trial_users = users["trial_users"]
 
     return {
         "total_users": total_users,
-        "new_users_daily": new_users_daily,
-        "new_users_weekly": new_users_weekly,
-        "new_users_monthly": new_users_monthly,
-        "users_with_subscription": users_with_subscription,
-        "users_without_subscription": users_without_subscription,
-        "users_with_trial": users_with_trial,
-        "blocked_users": blocked_users,
-        "bot_blocked_users": bot_blocked_users,
-        "user_conversion": user_conversion,
-        "trial_conversion": trial_conversion,
+        "new_users_daily": users["new_users_daily"],
+        "new_users_weekly": users["new_users_weekly"],
+        "new_users_monthly": users["new_users_monthly"],
+        "users_with_subscription": users["users_with_subscription"],
+        "users_without_subscription": total_users - users["users_with_subscription"],
+        "users_with_trial": users["users_with_trial"],
+        "blocked_users": users["blocked_users"],
+        "bot_blocked_users": users["bot_blocked_users"],
+        "user_conversion": (
+            format_percent(users["paying_users"], total_users) if total_users else 0
+        ),
+        "trial_conversion": (
+            format_percent(users["converted_from_trial"], trial_users) if trial_users else 0
+        ),
     }
 
 
 def get_transactions_statistics(
-    transactions: list[TransactionDto],
+    transactions: dict[str, Any],
     i18n: TranslatorRunner,
 ) -> dict[str, Any]:
-    total_transactions = len(transactions)
-    completed_transactions = sum(1 for t in transactions if t.is_completed)
-    free_transactions = sum(1 for t in transactions if t.pricing.is_free)
-    gateways_stats: dict[str, dict[str, float]] = {}
-
-    for t in transactions:
-        if not t.is_completed:
-            continue
-
-        g = t.gateway_type
-
-        if g not in gateways_stats:
-            gateways_stats[g] = {
-                "total": 0.0,
-                "daily": 0.0,
-                "weekly": 0.0,
-                "monthly": 0.0,
-                "completed": 0,
-                "discount": 0.0,
-                "paid_count": 0,
-            }
-
-        stats = gateways_stats[g]
-        amount = float(t.pricing.final_amount)
-        stats["total"] += amount
-        stats["completed"] += 1 if t.is_completed else 0
-        stats["discount"] += float(t.pricing.original_amount - t.pricing.final_amount)
-
-        if not t.pricing.is_free:
-            stats["paid_count"] += 1
-
-        days_ago = (datetime_now() - t.created_at).days if t.created_at else 0
-        if days_ago == 0:
-            stats["daily"] += amount
-        if days_ago <= 7:
-            stats["weekly"] += amount
-        if days_ago <= 30:
-            stats["monthly"] += amount
-
+    gateways_stats: list[dict[str, Any]] = transactions["gateways"]
     popular_gateway = None
 
     if len(gateways_stats) > 1:
-        popular_gateway = max(gateways_stats.items(), key=lambda x: x[1]["paid_count"])[0]
+        popular_gateway = max(gateways_stats, key=lambda x: x["paid_count"])["gateway_type"]
 
     payment_gateways_stats = [
         i18n.get(
             "msg-statistics-transactions-gateway",
-            gateway_type=gateway,
+            gateway_type=stats["gateway_type"],
             total_income=stats["total"],
             daily_income=stats["daily"],
             weekly_income=stats["weekly"],
             monthly_income=stats["monthly"],
             average_check=round(stats["total"] / max(1, stats["paid_count"])),
             total_discounts=stats["discount"],
-            currency=Currency.from_gateway_type(PaymentGatewayType(gateway)).symbol,
+            currency=Currency.from_gateway_type(PaymentGatewayType(stats["gateway_type"])).symbol,
         )
-        for gateway, stats in gateways_stats.items()
+        for stats in gateways_stats
     ]
 
     return {
-        "total_transactions": total_transactions,
-        "completed_transactions": completed_transactions,
-        "free_transactions": free_transactions,
+        "total_transactions": transactions["total_transactions"],
+        "completed_transactions": transactions["completed_transactions"],
+        "free_transactions": transactions["free_transactions"],
         "popular_gateway": i18n.get("gateway-type", gateway_type=popular_gateway)
         if popular_gateway
         else False,
@@ -222,94 +124,37 @@ def get_transactions_statistics(
     }
 
 
-def get_subscriptions_statistics(
-    subscriptions: list[SubscriptionDto],
-) -> dict[str, Any]:
-    total_active_subscriptions = 0
-    total_expire_subscriptions = 0
-    active_trial_subscriptions = 0
-    expiring_subscriptions = 0
-    total_unlimited = 0
-    total_traffic = 0
-    total_devices = 0
-
-    now = datetime_now()
-
-    for s in subscriptions:
-        if s.is_active:
-            total_active_subscriptions += 1
-            if s.is_trial:
-                active_trial_subscriptions += 1
-            if 0 <= (s.expire_at - now).days <= 7:
-                expiring_subscriptions += 1
-
-            # TODO: separate unlim for traffic, device, duration
-            if not s.has_devices_limit or not s.has_traffic_limit or s.is_unlimited:
-                total_unlimited += 1
-            if s.traffic_limit != -1:
-                total_traffic += 1
-            if s.device_limit != -1:
-                total_devices += 1
-
-        elif s.get_status == SubscriptionStatus.EXPIRED:
-            total_expire_subscriptions += 1
-
-    return {
-        "total_active_subscriptions": total_active_subscriptions,
-        "total_expire_subscriptions": total_expire_subscriptions,
-        "active_trial_subscriptions": active_trial_subscriptions,
-        "expiring_subscriptions": expiring_subscriptions,
-        "total_unlimited": total_unlimited,
-        "total_traffic": total_traffic,
-        "total_devices": total_devices,
-    }
-
-
 def get_plans_statistics(
     plans: list[PlanDto],
-    subscriptions: list[SubscriptionDto],
-    transactions: list[TransactionDto],
+    plans_statistics: dict[str, Any],
     i18n: TranslatorRunner,
 ) -> dict[str, Any]:
     plan_income: dict[int, dict[str, float]] = {}
     plan_durations_count: dict[int, dict[int, int]] = {}
+    total_plan_counts: dict[int, int] = {}
+    active_plan_counts: dict[int, int] = {}
 
-    for s in subscriptions:
-        plan_id = s.plan.id
-        plan_durations_count.setdefault(plan_id, {})
-        duration_days = s.plan.duration
-        plan_durations_count[plan_id][duration_days] = (
-            plan_durations_count[plan_id].get(duration_days, 0) + 1
-        )
-
-    for t in transactions:
-        if not (t.is_completed and t.plan and t.plan.id):
-            continue
-        plan_id = t.plan.id
-        currency = t.currency.symbol
-        amount = float(t.pricing.final_amount)
+    for row in plans_statistics["subscriptions"]:
+        plan_id = row["plan_id"]
+        plan_durations_count.setdefault(plan_id, {})[row["duration"]] = row["total"]
+        total_plan_counts[plan_id] = total_plan_counts.get(plan_id, 0) + row["total"]
+        active_plan_counts[plan_id] = active_plan_counts.get(plan_id, 0) + row["active"]
 
-        plan_income.setdefault(plan_id, {})
-        plan_income[plan_id][currency] = plan_income[plan_id].get(currency, 0.0) + amount
+    for row in plans_statistics["income"]:
+        currency = Currency(row["currency"]).symbol
+        plan_income.setdefault(row["plan_id"], {})[currency] = float(row["amount"])
 
-    active_plan_counts = {
-        p.id: sum(1 for s in subscriptions if s.plan.id == p.id and s.is_active)
-        for p in plans
-        if p.id
-    }
+    plan_active_counts = {p.id: active_plan_counts.get(p.id, 0) for p in plans if p.id}
 
     popular_plan_id = None
-    if len(active_plan_counts) > 1:
-        popular_plan_id = max(active_plan_counts.items(), key=lambda x: x[1])[0]
+    if len(plan_active_counts) > 1:
+        popular_plan_id = max(plan_active_counts.items(), key=lambda x: x[1])[0]
 
     plans_stats = []
     for p in plans:
         if not p.id:
             continue
 
-        total_subs = sum(1 for s in subscriptions if s.plan.id == p.id)
-        active_subs = sum(1 for s in subscriptions if s.plan.id == p.id and s.is_active)
-
         durations_count = plan_durations_count.get(p.id, {})
         popular_duration = (
             max(durations_count.items(), key=lambda x: x[1])[0] if durations_count else 0
@@ -339,8 +184,8 @@ def get_plans_statistics(
                 "msg-statistics-plan",
                 popular=(p.id == popular_plan_id),
                 plan_name=p.name,
-                total_subscriptions=total_subs,
-                active_subscriptions=active_subs,
+                total_subscriptions=total_plan_counts.get(p.id, 0),
+                active_subscriptions=active_plan_counts.get(p.id, 0),
                 popular_duration=i18n.get(key, **kw),
                 all_income=all_income,
             )
@@ -349,9 +194,9 @@ def get_plans_statistics(
     return {"plans": "\n\n".join(plans_stats)}
 
 
-def get_promocodes_statistics(promocodes: list[PromocodeDto]) -> dict[str, Any]:
-    total_promo_activations = sum(len(p.activations) for p in promocodes)
-    most_popular_promo = max(promocodes, key=lambda p: len(p.activations), default=None)
+def get_promocodes_statistics(promocodes: list[dict[str, Any]]) -> dict[str, Any]:
+    total_promo_activations = sum(p["activations"] for p in promocodes)
+    most_popular_promo = max(promocodes, key=lambda p: p["activations"], default=None)
 
     total_promo_days = 0
     total_promo_traffic = 0
@@ -360,23 +205,24 @@ def get_promocodes_statistics(promocodes: list[PromocodeDto]) -> dict[str, Any]:
     total_promo_purchase_discounts = 0
 
     for p in promocodes:
-        times_used = len(p.activations)
-        reward_value = p.reward or 0
+        times_used = p["activations"]
+        reward_value = p["reward"]
+        reward_type = PromocodeRewardType(p["reward_type"])
 
-        if p.reward_type == PromocodeRewardType.DURATION:
+        if reward_type == PromocodeRewardType.DURATION:
             total_promo_days += reward_value * times_used
-        elif p.reward_type == PromocodeRewardType.TRAFFIC:
+        elif reward_type == PromocodeRewardType.TRAFFIC:
             total_promo_traffic += reward_value * times_used
-        elif p.reward_type == PromocodeRewardType.SUBSCRIPTION:
+        elif reward_type == PromocodeRewardType.SUBSCRIPTION:
             total_promo_subscriptions += reward_value * times_used
-        elif p.reward_type == PromocodeRewardType.PERSONAL_DISCOUNT:
+        elif reward_type == PromocodeRewardType.PERSONAL_DISCOUNT:
             total_promo_personal_discounts += reward_value * times_used
-        elif p.reward_type == PromocodeRewardType.PURCHASE_DISCOUNT:
+        elif reward_type == PromocodeRewardType.PURCHASE_DISCOUNT:
             total_promo_purchase_discounts += reward_value * times_used
 
     return {
         "total_promo_activations": total_promo_activations,
-        "most_popular_promo": most_popular_promo.code if most_popular_promo else "-",
+        "most_popular_promo": most_popular_promo["code"] if most_popular_promo else "-",
         "total_promo_days": total_promo_days,
         "total_promo_traffic": total_promo_traffic,
         "total_promo_subscriptions": total_promo_subscriptions,
@@ -66,16 +66,16 @@ async def all_users_getter(
     user_service: FromDishka[UserService],
     **kwargs: Any,
 ) -> dict[str, Any]:
-    users = await user_service.get_all()
-    page = _get_page(dialog_manager, "page_all_users")
-    page_users, page = _paginate(users, page)
-    pages = max(1, ceil(len(users) / PAGE_SIZE))
+    count_users = await user_service.count()
+    pages = max(1, ceil(count_users / PAGE_SIZE))
+    page = min(_get_page(dialog_manager, "page_all_users"), pages)
+    page_users = await user_service.get_page(page, PAGE_SIZE)
     return {
         "all_users": [{"telegram_id": u.telegram_id, "label": _user_label(u)} for u in page_users],
-        "count_users": len(users),
+        "count_users": count_users,
         "page": page,
         "pages": pages,
-        "show_pager": len(users) > PAGE_SIZE,
+        "show_pager": count_users > PAGE_SIZE,
     }
 
 
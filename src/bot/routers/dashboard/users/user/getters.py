@@ -4,9 +4,7 @@ from aiogram_dialog import DialogManager
 from dishka import FromDishka
 from dishka.integrations.aiogram_dialog import inject
 from fluentogram import TranslatorRunner
-from remnapy import RemnawaveSDK
-from remnapy.exceptions import NotFoundError
-from remnapy.models import GetOneNodeResponseDto
+from remnapy.models.nodes import NodeResponseDto
 
 from src.core.config import AppConfig
 from src.core.constants import DATETIME_FORMAT
@@ -90,7 +88,6 @@ async def subscription_getter(
     user_service: FromDishka[UserService],
     subscription_service: FromDishka[SubscriptionService],
     remnawave_service: FromDishka[RemnawaveService],
-    remnawave: FromDishka[RemnawaveSDK],
     **kwargs: Any,
 ) -> dict[str, Any]:
     target_telegram_id = dialog_manager.dialog_data["target_telegram_id"]
@@ -115,10 +112,9 @@ async def subscription_getter(
         else False
     )
 
-    last_node: Optional[GetOneNodeResponseDto] = None
+    last_node: Optional[NodeResponseDto] = None
     if remna_user.last_connected_node_uuid:
-        result = await remnawave.nodes.get_one_node(remna_user.last_connected_node_uuid)
-        last_node = result
+        last_node = await remnawave_service.get_node(remna_user.last_connected_node_uuid)
 
     return {
         "is_trial": subscription.is_trial,
@@ -266,7 +262,7 @@ async def device_limit_getter(
 async def squads_getter(
     dialog_manager: DialogManager,
     subscription_service: FromDishka[SubscriptionService],
-    remnawave: FromDishka[RemnawaveSDK],
+    remnawave_service: FromDishka[RemnawaveService],
     **kwargs: Any,
 ) -> dict[str, Any]:
     target_telegram_id = dialog_manager.dialog_data["target_telegram_id"]
@@ -275,14 +271,14 @@ async def squads_getter(
     if not subscription:
         raise ValueError(f"Current subscription for user '{target_telegram_id}' not found")
 
-    internal_response = await remnawave.internal_squads.get_internal_squads()
-    internal_dict = {s.uuid: s.name for s in internal_response.internal_squads}
+    internal_squads = await remnawave_service.get_internal_squads()
+    internal_dict = {s.uuid: s.name for s in internal_squads}
     internal_squads_names = ", ".join(
         internal_dict.get(squad, str(squad)) for squad in subscription.internal_squads
     )
 
-    external_response = await remnawave.external_squads.get_external_squads()
-    external_dict = {s.uuid: s.name for s in external_response.external_squads}
+    external_squads = await remnawave_service.get_external_squads()
+    external_dict = {s.uuid: s.name for s in external_squads}
     external_squad_name = (
         external_dict.get(subscription.external_squad) if subscription.external_squad else False
     )
@@ -297,7 +293,7 @@ async def squads_getter(
 async def internal_squads_getter(
     dialog_manager: DialogManager,
     subscription_service: FromDishka[SubscriptionService],
-    remnawave: FromDishka[RemnawaveSDK],
+    remnawave_service: FromDishka[RemnawaveService],
     **kwargs: Any,
 ) -> dict[str, Any]:
     target_telegram_id = dialog_manager.dialog_data["target_telegram_id"]
@@ -306,7 +302,7 @@ async def internal_squads_getter(
     if not subscription:
         raise ValueError(f"Current subscription for user '{target_telegram_id}' not found")
 
-    result = await remnawave.internal_squads.get_internal_squads()
+    internal_squads = await remnawave_service.get_internal_squads()
 
     squads = [
         {
@@ -314,7 +310,7 @@ async def internal_squads_getter(
             "name": squad.name,
             "selected": True if squad.uuid in subscription.internal_squads else False,
         }
-        for squad in result.internal_squads
+        for squad in internal_squads
     ]
 
     return {"squads": squads}
@@ -324,7 +320,7 @@ async def internal_squads_getter(
 async def external_squads_getter(
     dialog_manager: DialogManager,
     subscription_service: FromDishka[SubscriptionService],
-    remnawave: FromDishka[RemnawaveSDK],
+    remnawave_service: FromDishka[RemnawaveService],
     **kwargs: Any,
 ) -> dict[str, Any]:
     target_telegram_id = dialog_manager.dialog_data["target_telegram_id"]
@@ -333,8 +329,8 @@ async def external_squads_getter(
     if not subscription:
         raise ValueError(f"Current subscription for user '{target_telegram_id}' not found")
 
-    result = await remnawave.external_squads.get_external_squads()
-    existing_squad_uuids = {squad.uuid for squad in result.external_squads}
+    external_squads = await remnawave_service.get_external_squads()
+    existing_squad_uuids = {squad.uuid for squad in external_squads}
 
     if subscription.external_squad and subscription.external_squad not in existing_squad_uuids:
         subscription.external_squad = None
@@ -345,7 +341,7 @@ async def external_squads_getter(
             "name": squad.name,
             "selected": True if squad.uuid == subscription.external_squad else False,
         }
-        for squad in result.external_squads
+        for squad in external_squads
     ]
 
     return {"squads": squads}
@@ -543,7 +539,7 @@ async def sync_getter(  # noqa: C901
     i18n: FromDishka[TranslatorRunner],
     user_service: FromDishka[UserService],
     subscription_service: FromDishka[SubscriptionService],
-    remnawave: FromDishka[RemnawaveSDK],
+    remnawave_service: FromDishka[RemnawaveService],
     **kwargs: Any,
 ) -> dict[str, Any]:
     target_telegram_id = dialog_manager.dialog_data["target_telegram_id"]
@@ -556,10 +552,7 @@ async def sync_getter(  # noqa: C901
 
     remna_subscription: Optional[RemnaSubscriptionDto] = None
 
-    try:
-        result = await remnawave.users.get_users_by_telegram_id(telegram_id=str(target_telegram_id))
-    except NotFoundError:
-        result = None
+    result = await remnawave_service.get_users_by_telegram_id(target_telegram_id)
 
     if result:
         remna_user = result[0]
@@ -570,8 +563,8 @@ async def sync_getter(  # noqa: C901
     bot_version = ""
     remna_version = ""
 
-    internal_response = await remnawave.internal_squads.get_internal_squads()
-    internal_dict = {s.uuid: s.name for s in internal_response.internal_squads}
+    internal_squads = await remnawave_service.get_internal_squads()
+    internal_dict = {s.uuid: s.name for s in internal_squads}
 
     if bot_subscription:
         internal_squads_names = ", ".join(
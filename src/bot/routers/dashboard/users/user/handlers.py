@@ -116,6 +116,7 @@ async def on_active_toggle(
     widget: Button,
     dialog_manager: DialogManager,
     subscription_service: FromDishka[SubscriptionService],
+    remnawave_service: FromDishka[RemnawaveService],
     remnawave: FromDishka[RemnawaveSDK],
 ) -> None:
     user: UserDto = dialog_manager.middleware_data[USER_KEY]
@@ -134,6 +135,7 @@ async def on_active_toggle(
     )
 
     await remnawave_toggle_status(subscription.user_remna_id)
+    await remnawave_service.clear_user_cache(subscription.user_remna_id, target_telegram_id)
     subscription.status = new_status
     await subscription_service.update(subscription)
     logger.info(
@@ -292,6 +294,7 @@ async def on_reset_traffic(
     widget: Button,
     dialog_manager: DialogManager,
     subscription_service: FromDishka[SubscriptionService],
+    remnawave_service: FromDishka[RemnawaveService],
     remnawave: FromDishka[RemnawaveSDK],
 ) -> None:
     user: UserDto = dialog_manager.middleware_data[USER_KEY]
@@ -302,6 +305,7 @@ async def on_reset_traffic(
         raise ValueError(f"Current subscription for user '{target_telegram_id}' not found")
 
     await remnawave.users.reset_user_traffic(subscription.user_remna_id)
+    await remnawave_service.clear_user_cache(subscription.user_remna_id, target_telegram_id)
     logger.info(f"{log(user)} Reset trafic for user '{target_telegram_id}'")
 
 
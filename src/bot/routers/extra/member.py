@@ -1,11 +1,15 @@
+from typing import Union
+
 from aiogram import Router
 from aiogram.filters import JOIN_TRANSITION, LEAVE_TRANSITION, ChatMemberUpdatedFilter
 from aiogram.types import ChatMemberUpdated
 from dishka import FromDishka
 from loguru import logger
 
+from src.core.storage.keys import ChannelMemberKey
 from src.core.utils.formatters import format_user_log as log
 from src.infrastructure.database.models.dto import UserDto
+from src.infrastructure.redis import RedisRepository
 from src.services.user import UserService
 
 # For only ChatType.PRIVATE (app/bot/filters/private.py)
@@ -30,3 +34,23 @@ async def on_blocked(
 ) -> None:
     logger.info(f"{log(user)} Bot blocked")
     await user_service.set_bot_blocked(user=user, blocked=True)
+
+
+@router.chat_member()
+async def on_channel_member_changed(
+    member: ChatMemberUpdated,
+    redis_repository: FromDishka[RedisRepository],
+) -> None:
+    user_id = member.new_chat_member.user.id
+    chat_ids: list[Union[int, str]] = [member.chat.id]
+
+    if member.chat.username:
+        chat_ids.append(f"@{member.chat.username}")
+
+    for chat_id in chat_ids:
+        await redis_repository.delete(ChannelMemberKey(chat_id=chat_id, user_id=user_id))
+
+    logger.debug(
+        f"Channel membership cache for user '{user_id}' in '{member.chat.id}' invalidated "
+        f"({member.old_chat_member.status} -> {member.new_chat_member.status})"
+    )
@@ -4,6 +4,7 @@ from pydantic import SecretStr, field_validator
 from pydantic_core.core_schema import FieldValidationInfo
 
 from src.core.constants import API_V1, BOT_WEBHOOK_PATH, URL_PATTERN
+from src.core.enums import UpdateOverflowPolicy
 
 from .base import BaseConfig
 from .validators import validate_not_change_me, validate_username
@@ -23,6 +24,10 @@ class BotConfig(BaseConfig, env_prefix="BOT_"):
     notify_lifetime: bool = True
     notify_remnashop_info: bool = True
 
+    update_concurrency: int = 20
+    update_queue_size: int = 1000
+    update_overflow_policy: UpdateOverflowPolicy = UpdateOverflowPolicy.WAIT
+
     @property
     def webhook_path(self) -> str:
         return f"{API_V1}{BOT_WEBHOOK_PATH}"
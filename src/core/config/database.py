@@ -18,6 +18,7 @@ class DatabaseConfig(BaseConfig, env_prefix="DATABASE_"):
     max_overflow: int = 30
     pool_timeout: int = 10
     pool_recycle: int = 3600
+    reuse_connection: bool = False
 
     @property
     def dsn(self) -> str:
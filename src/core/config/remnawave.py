@@ -18,6 +18,15 @@ class RemnawaveConfig(BaseConfig, env_prefix="REMNAWAVE_"):
     webhook_secret: SecretStr
     cookie: SecretStr = SecretStr("")
 
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    pool_timeout: float = 10.0
+    http2: bool = False
+    proxy: SecretStr = SecretStr("")
+
+    reconcile_delete: bool = False
+
     @property
     def is_external(self) -> bool:
         return self.host.get_secret_value() != "remnawave"
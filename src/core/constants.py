@@ -56,5 +56,32 @@ TIME_10M: Final[int] = TIME_1M * 10
 RECENT_REGISTERED_MAX_COUNT: Final[int] = 25
 RECENT_ACTIVITY_MAX_COUNT: Final[int] = 25
 
-BATCH_SIZE: Final[int] = 20
-BATCH_DELAY: Final[int] = 1
+LOCAL_CACHE_MAX_SIZE: Final[int] = 10_000
+USER_LOCAL_CACHE_TTL: Final[int] = 30
+
+CHANNEL_MEMBER_CACHE_TTL: Final[int] = TIME_10M
+CHANNEL_NON_MEMBER_CACHE_TTL: Final[int] = 30
+
+BULK_INSERT_CHUNK_SIZE: Final[int] = 1000
+
+REMNAWAVE_SYNC_PAGE_SIZE: Final[int] = 250
+REMNAWAVE_SYNC_CONCURRENCY: Final[int] = 5
+REMNAWAVE_SLOW_REQUEST_THRESHOLD: Final[float] = 2.0
+REMNAWAVE_POOL_WAIT_WARNING: Final[float] = 0.5
+REMNAWAVE_USER_CACHE_TTL: Final[int] = 15
+REMNAWAVE_WEBHOOK_DEDUP_TTL: Final[int] = TIME_10M
+# NOTE: Outlives the queue backlog, otherwise a pending event could expire before it is handled
+REMNAWAVE_USER_EVENT_TTL: Final[int] = TIME_1M * 60
+
+BROADCAST_PAGE_SIZE: Final[int] = 500
+BROADCAST_BATCH_SIZE: Final[int] = 30
+BROADCAST_MAX_ATTEMPTS: Final[int] = 3
+BROADCAST_STALE_TIMEOUT: Final[int] = TIME_10M
+
+TELEGRAM_GLOBAL_RATE_LIMIT: Final[int] = 30
+TELEGRAM_CHAT_RATE_LIMIT: Final[int] = 1
+TELEGRAM_CHAT_BURST: Final[int] = 3
+TELEGRAM_BULK_RESERVE: Final[int] = 5
+
+# NOTE: Refunds and late payments change past days, so the last few days are always rebuilt
+STATISTICS_ROLLUP_LOOKBACK_DAYS: Final[int] = 3
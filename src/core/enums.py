@@ -47,6 +47,17 @@ class BroadcastMessageStatus(UpperStrEnum):
     PENDING = auto()
 
 
+class SendPriority(UpperStrEnum):
+    INTERACTIVE = auto()
+    BULK = auto()
+
+
+class UpdateOverflowPolicy(UpperStrEnum):
+    WAIT = auto()
+    REJECT = auto()
+    DROP = auto()
+
+
 class BroadcastAudience(UpperStrEnum):
     ALL = auto()
     PLAN = auto()
@@ -1,3 +1,8 @@
+from typing import Union
+
+from pydantic import field_validator
+
+from src.core.enums import UserRole
 from src.core.storage.key_builder import StorageKey
 
 
@@ -6,13 +11,72 @@ class WebhookLockKey(StorageKey, prefix="webhook_lock"):
     webhook_hash: str
 
 
+class RemnawaveWebhookKey(StorageKey, prefix="remnawave_webhook"):
+    digest: str
+
+
+class RemnawaveUserEventsKey(StorageKey, prefix="remnawave_user_events"):
+    uuid: str
+
+
+class RemnawaveUserEventsOwnerKey(StorageKey, prefix="remnawave_user_events_owner"):
+    uuid: str
+
+
 class LastNotifiedVersionKey(StorageKey, prefix="last_notified_version"): ...
 
 
 class SyncRunningKey(StorageKey, prefix="sync_running"): ...
 
 
+class StatisticsRollupLockKey(StorageKey, prefix="statistics_rollup_lock"): ...
+
+
 class AccessWaitListKey(StorageKey, prefix="access_wait_list"): ...
 
 
-class RecentActivityUsersKey(StorageKey, prefix="recent_activity_users"): ...
+# NOTE: Sorted set scored by last activity time, renamed from the former list key
+class RecentActivityUsersKey(StorageKey, prefix="recent_activity"): ...
+
+
+# NOTE: Former list of recently active users, only kept to be deleted on startup
+class LegacyRecentActivityUsersKey(StorageKey, prefix="recent_activity_users"): ...
+
+
+class UserRoleIdsKey(StorageKey, prefix="user_role_ids"):
+    role: UserRole
+
+
+class BlockedUserIdsKey(StorageKey, prefix="blocked_user_ids"): ...
+
+
+class ChannelMemberKey(StorageKey, prefix="channel_member"):
+    chat_id: Union[int, str]
+    user_id: int
+
+    @field_validator("chat_id")
+    @classmethod
+    def normalize_chat_id(cls, field: Union[int, str]) -> Union[int, str]:
+        # NOTE: Channel usernames are case-insensitive
+        return field.lower() if isinstance(field, str) else field
+
+
+class UserThrottleKey(StorageKey, prefix="user_throttle"):
+    telegram_id: int
+
+
+class BroadcastLockKey(StorageKey, prefix="broadcast_lock"):
+    broadcast_id: int
+
+
+class BotSendRateKey(StorageKey, prefix="bot_send_rate"):
+    bot_id: int
+
+
+class BotSendPauseKey(StorageKey, prefix="bot_send_pause"):
+    bot_id: int
+
+
+class ChatSendRateKey(StorageKey, prefix="chat_send_rate"):
+    bot_id: int
+    chat_id: Union[int, str]
@@ -2,7 +2,7 @@ from typing import Any, Callable, Final
 
 from msgspec.json import Decoder, Encoder
 
-decode: Final[Callable[..., Any]] = Decoder[dict[str, Any]]().decode
+decode: Final[Callable[..., Any]] = Decoder().decode
 bytes_encode: Final[Callable[..., bytes]] = Encoder().encode
 
 
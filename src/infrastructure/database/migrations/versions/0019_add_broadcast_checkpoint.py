@@ -0,0 +1,42 @@
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0019"
+down_revision: Union[str, None] = "0018"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("broadcasts", sa.Column("plan_id", sa.Integer(), nullable=True))
+    op.add_column(
+        "broadcasts",
+        sa.Column("last_user_id", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.add_column(
+        "broadcasts",
+        sa.Column(
+            "heartbeat_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("timezone('UTC', now())"),
+            nullable=False,
+        ),
+    )
+
+    # Existing broadcasts created all their messages upfront,
+    # so a resume must only finish their PENDING rows.
+    op.execute("UPDATE broadcasts SET last_user_id = (SELECT COALESCE(MAX(id), 0) FROM users)")
+    op.create_index(
+        "ix_broadcast_messages_broadcast_id_status",
+        "broadcast_messages",
+        ["broadcast_id", "status"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_broadcast_messages_broadcast_id_status", table_name="broadcast_messages")
+    op.drop_column("broadcasts", "heartbeat_at")
+    op.drop_column("broadcasts", "last_user_id")
+    op.drop_column("broadcasts", "plan_id")
@@ -0,0 +1,68 @@
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision: str = "0020"
+down_revision: Union[str, None] = "0019"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "daily_user_statistics",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("registrations", sa.Integer(), nullable=False),
+        sa.Column("trials", sa.Integer(), nullable=False),
+        sa.Column("conversions", sa.Integer(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("timezone('UTC', now())"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("timezone('UTC', now())"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("day"),
+    )
+
+    op.create_table(
+        "daily_revenue_statistics",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column(
+            "gateway_type",
+            postgresql.ENUM(name="payment_gateway_type", create_type=False),
+            nullable=False,
+        ),
+        sa.Column("currency", postgresql.ENUM(name="currency", create_type=False), nullable=False),
+        sa.Column("transactions", sa.Integer(), nullable=False),
+        sa.Column("completed", sa.Integer(), nullable=False),
+        sa.Column("free", sa.Integer(), nullable=False),
+        sa.Column("paid", sa.Integer(), nullable=False),
+        sa.Column("income", sa.Float(), nullable=False),
+        sa.Column("discount", sa.Float(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("timezone('UTC', now())"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("timezone('UTC', now())"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("day", "gateway_type", "currency"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("daily_revenue_statistics")
+    op.drop_table("daily_user_statistics")
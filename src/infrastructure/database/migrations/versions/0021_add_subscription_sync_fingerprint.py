@@ -0,0 +1,18 @@
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0021"
+down_revision: Union[str, None] = "0020"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing rows stay NULL and get their fingerprint on the next sync.
+    op.add_column("subscriptions", sa.Column("sync_fingerprint", sa.String(32), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("subscriptions", "sync_fingerprint")
@@ -0,0 +1,26 @@
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0022"
+down_revision: Union[str, None] = "0021"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Trial conversion is computed per user, daily counters cannot be summed into it.
+    op.drop_column("daily_user_statistics", "conversions")
+    op.drop_column("daily_user_statistics", "trials")
+
+
+def downgrade() -> None:
+    op.add_column(
+        "daily_user_statistics",
+        sa.Column("trials", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "daily_user_statistics",
+        sa.Column("conversions", sa.Integer(), nullable=False, server_default="0"),
+    )
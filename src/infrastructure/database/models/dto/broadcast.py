@@ -23,6 +23,10 @@ class BroadcastDto(TrackableDto):
     failed_count: int = 0
     payload: MessagePayload
 
+    plan_id: Optional[int] = None
+    last_user_id: int = 0
+    heartbeat_at: Optional[datetime] = Field(default=None, frozen=True)
+
     messages: Optional[list["BroadcastMessageDto"]] = []
 
     created_at: Optional[datetime] = Field(default=None, frozen=True)
@@ -6,7 +6,9 @@ if TYPE_CHECKING:
     from .plan import PlanSnapshotDto
     from .user import BaseUserDto
 
+import hashlib
 from datetime import datetime, timedelta
+from enum import Enum
 from uuid import UUID
 
 from pydantic import BaseModel, Field
@@ -24,6 +26,37 @@ from src.core.utils.types import RemnaUserDto
 from .base import TrackableDto
 
 
+def build_sync_fingerprint(
+    remna_id: UUID,
+    status: SubscriptionStatus,
+    expire_at: datetime,
+    url: str,
+    traffic_limit: int,
+    device_limit: int,
+    traffic_limit_strategy: Optional[TrafficLimitStrategy],
+    tag: Optional[str],
+    internal_squads: list[UUID],
+    external_squad: Optional[UUID],
+) -> str:
+    parts = (
+        remna_id,
+        status,
+        expire_at.timestamp(),  # NOTE: The same instant may come back in another timezone
+        url,
+        traffic_limit,
+        device_limit,
+        traffic_limit_strategy,
+        tag,
+        ",".join(sorted(map(str, internal_squads))),
+        external_squad,
+    )
+    payload = "|".join(
+        "" if part is None else str(part.value if isinstance(part, Enum) else part)
+        for part in parts
+    )
+    return hashlib.md5(payload.encode(), usedforsecurity=False).hexdigest()
+
+
 class RemnaSubscriptionDto(BaseModel):
     uuid: UUID
     status: SubscriptionStatus
@@ -53,6 +86,21 @@ class RemnaSubscriptionDto(BaseModel):
             external_squad=remna_user.external_squad_uuid,
         )
 
+    @property
+    def sync_fingerprint(self) -> str:
+        return build_sync_fingerprint(
+            self.uuid,
+            self.status,
+            self.expire_at,
+            self.url,
+            self.traffic_limit,
+            self.device_limit,
+            self.traffic_limit_strategy,
+            self.tag,
+            self.internal_squads,
+            self.external_squad,
+        )
+
 
 class BaseSubscriptionDto(TrackableDto):
     id: Optional[int] = Field(default=None, frozen=True)
@@ -74,6 +122,7 @@ class BaseSubscriptionDto(TrackableDto):
     url: str
 
     plan: "PlanSnapshotDto"
+    sync_fingerprint: Optional[str] = None
 
     created_at: Optional[datetime] = Field(default=None, frozen=True)
     updated_at: Optional[datetime] = Field(default=None, frozen=True)
@@ -96,6 +145,23 @@ class BaseSubscriptionDto(TrackableDto):
             return SubscriptionStatus.EXPIRED
         return self.status
 
+    def refresh_sync_fingerprint(self) -> None:
+        fingerprint = build_sync_fingerprint(
+            self.user_remna_id,
+            self.status,
+            self.expire_at,
+            self.url,
+            self.traffic_limit,
+            self.device_limit,
+            self.traffic_limit_strategy,
+            self.tag,
+            self.internal_squads,
+            self.external_squad,
+        )
+
+        if fingerprint != self.sync_fingerprint:
+            self.sync_fingerprint = fingerprint
+
     @property
     def get_traffic_reset_delta(self) -> Optional[timedelta]:
         from src.services.subscription import SubscriptionService  # noqa: PLC0415
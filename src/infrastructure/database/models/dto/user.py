@@ -94,6 +94,6 @@ class UserDto(BaseUserDto):
     ) -> Optional["UserDto"]:
         dto = super().from_model(model_instance, decrypt=decrypt)
         if dto and model_instance:
-            dto._has_any_subscription = bool(getattr(model_instance, "subscriptions", []))
-            dto._is_invited_user = bool(getattr(model_instance, "referral", None))
+            dto._has_any_subscription = bool(getattr(model_instance, "has_any_subscription", None))
+            dto._is_invited_user = bool(getattr(model_instance, "is_invited_user", None))
         return dto
@@ -5,6 +5,7 @@ from .plan import Plan, PlanDuration, PlanPrice
 from .promocode import Promocode, PromocodeActivation
 from .referral import Referral, ReferralReward
 from .settings import Settings
+from .statistics import DailyRevenueStatistics, DailyUserStatistics
 from .subscription import Subscription
 from .transaction import Transaction
 from .user import User
@@ -13,6 +14,8 @@ __all__ = [
     "BaseSql",
     "Broadcast",
     "BroadcastMessage",
+    "DailyRevenueStatistics",
+    "DailyUserStatistics",
     "PaymentGateway",
     "Plan",
     "PlanDuration",
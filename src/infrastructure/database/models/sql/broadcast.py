@@ -1,6 +1,8 @@
+from datetime import datetime
+from typing import Optional
 from uuid import UUID
 
-from sqlalchemy import JSON, BigInteger, Enum, ForeignKey, Integer
+from sqlalchemy import JSON, BigInteger, DateTime, Enum, ForeignKey, Index, Integer
 from sqlalchemy import UUID as PG_UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -8,7 +10,7 @@ from src.core.enums import BroadcastAudience, BroadcastMessageStatus, BroadcastS
 from src.core.utils.message_payload import MessagePayload
 
 from .base import BaseSql
-from .timestamp import TimestampMixin
+from .timestamp import NOW_FUNC, TimestampMixin
 
 
 class Broadcast(BaseSql, TimestampMixin):
@@ -42,15 +44,24 @@ class Broadcast(BaseSql, TimestampMixin):
     failed_count: Mapped[int] = mapped_column(Integer, nullable=False)
     payload: Mapped[MessagePayload] = mapped_column(JSON, nullable=False)
 
+    plan_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    last_user_id: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    heartbeat_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=NOW_FUNC,
+        nullable=False,
+    )
+
     messages: Mapped[list["BroadcastMessage"]] = relationship(
         back_populates="broadcast",
         cascade="all, delete-orphan",
-        lazy="selectin",
+        lazy="raise",
     )
 
 
 class BroadcastMessage(BaseSql):
     __tablename__ = "broadcast_messages"
+    __table_args__ = (Index("ix_broadcast_messages_broadcast_id_status", "broadcast_id", "status"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
 
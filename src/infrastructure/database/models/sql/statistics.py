@@ -0,0 +1,48 @@
+from datetime import date
+
+from sqlalchemy import Date, Enum, Float, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.core.enums import Currency, PaymentGatewayType
+
+from .base import BaseSql
+from .timestamp import TimestampMixin
+
+
+class DailyUserStatistics(BaseSql, TimestampMixin):
+    __tablename__ = "daily_user_statistics"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+
+    registrations: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+class DailyRevenueStatistics(BaseSql, TimestampMixin):
+    __tablename__ = "daily_revenue_statistics"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    gateway_type: Mapped[PaymentGatewayType] = mapped_column(
+        Enum(
+            PaymentGatewayType,
+            name="payment_gateway_type",
+            create_constraint=True,
+            validate_strings=True,
+        ),
+        primary_key=True,
+    )
+    currency: Mapped[Currency] = mapped_column(
+        Enum(
+            Currency,
+            name="currency",
+            create_constraint=True,
+            validate_strings=True,
+        ),
+        primary_key=True,
+    )
+
+    transactions: Mapped[int] = mapped_column(Integer, nullable=False)
+    completed: Mapped[int] = mapped_column(Integer, nullable=False)
+    free: Mapped[int] = mapped_column(Integer, nullable=False)
+    paid: Mapped[int] = mapped_column(Integer, nullable=False)
+    income: Mapped[float] = mapped_column(Float, nullable=False)
+    discount: Mapped[float] = mapped_column(Float, nullable=False)
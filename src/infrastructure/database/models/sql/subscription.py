@@ -65,10 +65,13 @@ class Subscription(BaseSql, TimestampMixin):
 
     plan: Mapped[PlanSnapshotDto] = mapped_column(JSON, nullable=False)
 
+    # NOTE: Hash of the panel-side fields, lets the periodic sync skip unchanged rows
+    sync_fingerprint: Mapped[Optional[str]] = mapped_column(String(32), nullable=True)
+
     user: Mapped["User"] = relationship(
         "User",
         back_populates="subscriptions",
         primaryjoin="Subscription.user_telegram_id==User.telegram_id",
         foreign_keys="Subscription.user_telegram_id",
-        lazy="selectin",
+        lazy="raise",
     )
@@ -7,7 +7,7 @@ if TYPE_CHECKING:
     from .subscription import Subscription
 
 from sqlalchemy import BigInteger, Boolean, Enum, ForeignKey, Integer, String
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.orm import Mapped, mapped_column, query_expression, relationship
 
 from src.core.enums import Locale, UserRole
 
@@ -59,7 +59,7 @@ class User(BaseSql, TimestampMixin):
     current_subscription: Mapped[Optional["Subscription"]] = relationship(
         "Subscription",
         foreign_keys=[current_subscription_id],
-        lazy="selectin",
+        lazy="raise",
     )
 
     subscriptions: Mapped[list["Subscription"]] = relationship(
@@ -67,7 +67,7 @@ class User(BaseSql, TimestampMixin):
         back_populates="user",
         primaryjoin="User.telegram_id==Subscription.user_telegram_id",
         foreign_keys="[Subscription.user_telegram_id]",
-        lazy="selectin",
+        lazy="raise",
     )
 
     referral: Mapped[Optional["Referral"]] = relationship(
@@ -75,5 +75,9 @@ class User(BaseSql, TimestampMixin):
         back_populates="referred",
         primaryjoin="User.telegram_id==Referral.referred_telegram_id",
         uselist=False,
-        lazy="selectin",
+        lazy="raise",
     )
+
+    # NOTE: Loaded on demand by UserRepository instead of the whole relationships above
+    has_any_subscription: Mapped[Optional[bool]] = query_expression()
+    is_invited_user: Mapped[Optional[bool]] = query_expression()
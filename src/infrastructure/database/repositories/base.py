@@ -1,9 +1,12 @@
-from typing import Any, Optional, Type, TypeVar, Union
+from typing import Any, Optional, Sequence, Type, TypeVar, Union
 
-from sqlalchemy import ColumnExpressionArgument, delete, func, select, update
+from sqlalchemy import ColumnExpressionArgument, delete, func, insert, inspect, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import InstrumentedAttribute
+from sqlalchemy.sql.base import ExecutableOption
 
+from src.core.constants import BULK_INSERT_CHUNK_SIZE
+from src.core.utils.iterables import chunked
 from src.infrastructure.database.models.sql import BaseSql
 
 T = TypeVar("T", bound=BaseSql)
@@ -29,11 +32,7 @@ class BaseRepository:
         if not instances:
             return []
 
-        self.session.add_all(instances)
-        await self.session.flush()
-        for instance in instances:
-            await self.session.refresh(instance)
-        return instances
+        return await self._create_many(type(instances[0]), self._instance_values(instances))
 
     async def merge_instance(self, instance: T) -> T:
         return await self.session.merge(instance)
@@ -41,8 +40,42 @@ class BaseRepository:
     async def delete_instance(self, instance: T) -> None:
         await self.session.delete(instance)
 
-    async def _get_one(self, model: ModelType[T], *conditions: ConditionType) -> Optional[T]:
-        stmt = select(model).where(*conditions)
+    async def _create_many(
+        self,
+        model: ModelType[T],
+        values: list[dict[str, Any]],
+        chunk_size: int = BULK_INSERT_CHUNK_SIZE,
+    ) -> list[T]:
+        created: list[T] = []
+
+        for chunk in chunked(values, chunk_size):
+            stmt = insert(model).returning(model, sort_by_parameter_order=True)
+            result = await self.session.scalars(stmt, chunk)
+            created.extend(result.all())
+
+        return created
+
+    async def _update_many(self, model: ModelType[T], values: list[dict[str, Any]]) -> None:
+        # NOTE: Each dict must carry the primary key, rows are grouped by their set of columns
+        for chunk in chunked(values, BULK_INSERT_CHUNK_SIZE):
+            await self.session.execute(update(model), chunk)
+
+    @staticmethod
+    def _instance_values(instances: Sequence[T]) -> list[dict[str, Any]]:
+        # NOTE: Only unset attributes fall back to defaults, an explicit None is written as NULL
+        columns = inspect(type(instances[0])).column_attrs
+        return [
+            {c.key: instance.__dict__[c.key] for c in columns if c.key in instance.__dict__}
+            for instance in instances
+        ]
+
+    async def _get_one(
+        self,
+        model: ModelType[T],
+        *conditions: ConditionType,
+        options: Sequence[ExecutableOption] = (),
+    ) -> Optional[T]:
+        stmt = select(model).where(*conditions).options(*options)
         result = await self.session.execute(stmt)
         return result.unique().scalar_one_or_none()
 
@@ -53,8 +86,9 @@ class BaseRepository:
         order_by: Optional[OrderByArgument] = None,
         limit: Optional[int] = None,
         offset: Optional[int] = None,
+        options: Sequence[ExecutableOption] = (),
     ) -> list[T]:
-        query = select(model).where(*conditions)
+        query = select(model).where(*conditions).options(*options)
 
         if order_by is not None:
             if isinstance(order_by, (list, tuple)):
@@ -1,9 +1,13 @@
+from datetime import datetime
 from typing import Any, Optional
 from uuid import UUID
 
-from sqlalchemy import update
+from sqlalchemy import select, update
+from sqlalchemy.orm import noload, selectinload
 
+from src.core.enums import BroadcastMessageStatus, BroadcastStatus
 from src.infrastructure.database.models.sql import Broadcast, BroadcastMessage
+from src.infrastructure.database.models.sql.timestamp import NOW_FUNC
 
 from .base import BaseRepository
 
@@ -12,14 +16,49 @@ class BroadcastRepository(BaseRepository):
     async def create(self, broadcast: Broadcast) -> Broadcast:
         return await self.create_instance(broadcast)
 
-    async def create_messages(self, messages: list[BroadcastMessage]) -> list[BroadcastMessage]:
-        return await self.create_instances(messages)
+    async def create_messages(self, values: list[dict[str, Any]]) -> list[BroadcastMessage]:
+        return await self._create_many(BroadcastMessage, values)
 
     async def get(self, task_id: UUID) -> Optional[Broadcast]:
-        return await self._get_one(Broadcast, Broadcast.task_id == task_id)
+        return await self._get_one(
+            Broadcast,
+            Broadcast.task_id == task_id,
+            options=(selectinload(Broadcast.messages),),
+        )
+
+    async def get_without_messages(self, task_id: UUID) -> Optional[Broadcast]:
+        stmt = (
+            select(Broadcast)
+            .where(Broadcast.task_id == task_id)
+            .options(noload(Broadcast.messages))
+        )
+        return await self.session.scalar(stmt)
+
+    async def get_status(self, task_id: UUID) -> Optional[BroadcastStatus]:
+        return await self.session.scalar(
+            select(Broadcast.status).where(Broadcast.task_id == task_id)
+        )
 
     async def get_all(self) -> list[Broadcast]:
-        return await self._get_many(Broadcast, order_by=Broadcast.id.asc())
+        stmt = select(Broadcast).options(noload(Broadcast.messages)).order_by(Broadcast.id.asc())
+        result = await self.session.scalars(stmt)
+        return list(result.all())
+
+    async def get_messages_page(
+        self,
+        broadcast_id: int,
+        status: BroadcastMessageStatus,
+        after_id: int,
+        limit: int,
+    ) -> list[BroadcastMessage]:
+        return await self._get_many(
+            BroadcastMessage,
+            BroadcastMessage.broadcast_id == broadcast_id,
+            BroadcastMessage.status == status,
+            BroadcastMessage.id > after_id,
+            order_by=BroadcastMessage.id.asc(),
+            limit=limit,
+        )
 
     async def get_message_by_user(
         self, broadcast_id: int, user_id: int
@@ -31,7 +70,18 @@ class BroadcastRepository(BaseRepository):
         )
 
     async def update(self, task_id: UUID, **data: Any) -> Optional[Broadcast]:
-        return await self._update(Broadcast, Broadcast.task_id == task_id, **data)
+        if not data:
+            return await self.get_without_messages(task_id)
+
+        stmt = (
+            update(Broadcast)
+            .where(Broadcast.task_id == task_id)
+            .values(**data)
+            .returning(Broadcast)
+            .options(noload(Broadcast.messages))
+            .execution_options(synchronize_session=False)
+        )
+        return await self.session.scalar(stmt)
 
     async def update_message(
         self, broadcast_id: int, user_id: int, **data: Any
@@ -43,6 +93,38 @@ class BroadcastRepository(BaseRepository):
             **data,
         )
 
+    async def heartbeat(
+        self,
+        broadcast_id: int,
+        success: int = 0,
+        failed: int = 0,
+        **data: Any,
+    ) -> None:
+        await self._update(
+            Broadcast,
+            Broadcast.id == broadcast_id,
+            load_result=False,
+            heartbeat_at=NOW_FUNC,
+            success_count=Broadcast.success_count + success,
+            failed_count=Broadcast.failed_count + failed,
+            **data,
+        )
+
+    async def claim_stale(self, heartbeat_before: datetime) -> list[Broadcast]:
+        stmt = (
+            update(Broadcast)
+            .where(
+                Broadcast.status == BroadcastStatus.PROCESSING,
+                Broadcast.heartbeat_at < heartbeat_before,
+            )
+            .values(heartbeat_at=NOW_FUNC)
+            .returning(Broadcast)
+            .options(noload(Broadcast.messages))
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.scalars(stmt)
+        return list(result.all())
+
     async def bulk_update_messages(self, data: list[dict]) -> None:
         if not data:
             return
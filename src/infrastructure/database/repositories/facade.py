@@ -7,6 +7,7 @@ from .promocode import PromocodeRepository
 from .promocode_activation import PromocodeActivationRepository
 from .referral import ReferralRepository
 from .settings import SettingsRepository
+from .statistics import StatisticsRepository
 from .subscription import SubscriptionRepository
 from .transaction import TransactionRepository
 from .user import UserRepository
@@ -25,6 +26,7 @@ class RepositoriesFacade:
     settings: SettingsRepository
     broadcasts: BroadcastRepository
     referrals: ReferralRepository
+    statistics: StatisticsRepository
 
     def __init__(self, session: AsyncSession) -> None:
         self.session = session
@@ -39,3 +41,4 @@ class RepositoriesFacade:
         self.settings = SettingsRepository(session)
         self.broadcasts = BroadcastRepository(session)
         self.referrals = ReferralRepository(session)
+        self.statistics = StatisticsRepository(session)
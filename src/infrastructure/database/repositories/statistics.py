@@ -0,0 +1,273 @@
+from datetime import date, datetime, time, timedelta
+from typing import Any, Optional, Sequence
+
+from sqlalchemy import (
+    Row,
+    delete,
+    distinct,
+    extract,
+    func,
+    insert,
+    not_,
+    or_,
+    select,
+)
+
+from src.core.constants import TIMEZONE, TIMEZONE_NAME
+from src.core.enums import SubscriptionStatus, TransactionStatus
+from src.infrastructure.database.models.sql import (
+    DailyRevenueStatistics,
+    DailyUserStatistics,
+    Promocode,
+    PromocodeActivation,
+    Subscription,
+    Transaction,
+    User,
+)
+
+from .base import BaseRepository
+
+# NOTE: Rollups are per calendar day, "weekly" and "monthly" include today
+# plus the previous 7 and 30 days (same as the former `timedelta.days <= N` checks)
+WEEKLY_DAYS = 7
+MONTHLY_DAYS = 30
+EXPIRING_WINDOW = timedelta(days=8)
+UNLIMITED_EXPIRE_YEAR = 2099
+
+
+def _final_amount() -> Any:
+    return Transaction.pricing["final_amount"].as_float()
+
+
+def _original_amount() -> Any:
+    return Transaction.pricing["original_amount"].as_float()
+
+
+def _day_of(column: Any) -> Any:
+    return func.date(func.timezone(TIMEZONE_NAME, column))
+
+
+def _day_start(day: date) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=TIMEZONE)
+
+
+def _subscription_is_active(now: datetime) -> Any:
+    return (Subscription.status == SubscriptionStatus.ACTIVE) & (Subscription.expire_at >= now)
+
+
+class StatisticsRepository(BaseRepository):
+    async def get_users_summary(self) -> Row[Any]:
+        trial_subscription = select(Subscription.id).where(
+            Subscription.id == User.current_subscription_id,
+            Subscription.is_trial.is_(True),
+        )
+
+        stmt = select(
+            func.count().label("total_users"),
+            func.count(User.current_subscription_id).label("users_with_subscription"),
+            func.count().filter(trial_subscription.exists()).label("users_with_trial"),
+            func.count().filter(User.is_blocked.is_(True)).label("blocked_users"),
+            func.count().filter(User.is_bot_blocked.is_(True)).label("bot_blocked_users"),
+        ).select_from(User)
+        return (await self.session.execute(stmt)).one()
+
+    async def count_paying_users(self) -> int:
+        stmt = select(func.count(distinct(Transaction.user_telegram_id))).where(
+            Transaction.status == TransactionStatus.COMPLETED,
+            _final_amount() != 0,
+        )
+        return await self.session.scalar(stmt) or 0
+
+    async def get_trial_conversion(self) -> Row[Any]:
+        per_user = (
+            select(
+                func.bool_or(Subscription.is_trial).label("had_trial"),
+                func.bool_or(not_(Subscription.is_trial)).label("had_paid"),
+            )
+            .group_by(Subscription.user_telegram_id)
+            .subquery()
+        )
+
+        stmt = select(
+            func.count().filter(per_user.c.had_trial).label("trial_users"),
+            func.count().filter(per_user.c.had_trial & per_user.c.had_paid).label("converted"),
+        ).select_from(per_user)
+        return (await self.session.execute(stmt)).one()
+
+    async def get_registrations(self, today: date) -> Row[Any]:
+        registrations = DailyUserStatistics.registrations
+        day = DailyUserStatistics.day
+
+        stmt = select(
+            func.coalesce(func.sum(registrations).filter(day >= today), 0).label("new_users_daily"),
+            func.coalesce(
+                func.sum(registrations).filter(day >= today - timedelta(days=WEEKLY_DAYS)), 0
+            ).label("new_users_weekly"),
+            func.coalesce(
+                func.sum(registrations).filter(day >= today - timedelta(days=MONTHLY_DAYS)), 0
+            ).label("new_users_monthly"),
+        )
+        return (await self.session.execute(stmt)).one()
+
+    async def get_transactions_summary(self) -> Row[Any]:
+        stmt = select(
+            func.coalesce(func.sum(DailyRevenueStatistics.transactions), 0).label(
+                "total_transactions"
+            ),
+            func.coalesce(func.sum(DailyRevenueStatistics.completed), 0).label(
+                "completed_transactions"
+            ),
+            func.coalesce(func.sum(DailyRevenueStatistics.free), 0).label("free_transactions"),
+        )
+        return (await self.session.execute(stmt)).one()
+
+    async def get_income_by_gateway(self, today: date) -> Sequence[Row[Any]]:
+        income = DailyRevenueStatistics.income
+        day = DailyRevenueStatistics.day
+
+        stmt = (
+            select(
+                DailyRevenueStatistics.gateway_type,
+                func.sum(income).label("total"),
+                func.coalesce(func.sum(income).filter(day >= today), 0).label("daily"),
+                func.coalesce(
+                    func.sum(income).filter(day >= today - timedelta(days=WEEKLY_DAYS)), 0
+                ).label("weekly"),
+                func.coalesce(
+                    func.sum(income).filter(day >= today - timedelta(days=MONTHLY_DAYS)), 0
+                ).label("monthly"),
+                func.sum(DailyRevenueStatistics.discount).label("discount"),
+                func.sum(DailyRevenueStatistics.paid).label("paid_count"),
+            )
+            .group_by(DailyRevenueStatistics.gateway_type)
+            .having(func.sum(DailyRevenueStatistics.completed) > 0)
+        )
+        return (await self.session.execute(stmt)).all()
+
+    async def get_subscriptions_summary(self, now: datetime) -> Row[Any]:
+        is_active = _subscription_is_active(now)
+        is_expired = or_(
+            Subscription.expire_at < now,
+            Subscription.status == SubscriptionStatus.EXPIRED,
+        )
+        is_unlimited = or_(
+            Subscription.device_limit <= 0,
+            Subscription.traffic_limit <= 0,
+            extract("year", Subscription.expire_at) == UNLIMITED_EXPIRE_YEAR,
+        )
+
+        stmt = select(
+            func.count().filter(is_active).label("total_active_subscriptions"),
+            func.count().filter(is_expired).label("total_expire_subscriptions"),
+            func.count()
+            .filter(is_active, Subscription.is_trial.is_(True))
+            .label("active_trial_subscriptions"),
+            func.count()
+            .filter(is_active, Subscription.expire_at < now + EXPIRING_WINDOW)
+            .label("expiring_subscriptions"),
+            func.count().filter(is_active, is_unlimited).label("total_unlimited"),
+            func.count().filter(is_active, Subscription.traffic_limit != -1).label("total_traffic"),
+            func.count().filter(is_active, Subscription.device_limit != -1).label("total_devices"),
+        ).select_from(Subscription)
+        return (await self.session.execute(stmt)).one()
+
+    async def get_subscriptions_by_plan(self, now: datetime) -> Sequence[Row[Any]]:
+        plan_id = Subscription.plan["id"].as_integer()
+        duration = Subscription.plan["duration"].as_integer()
+
+        stmt = select(
+            plan_id.label("plan_id"),
+            duration.label("duration"),
+            func.count().label("total"),
+            func.count().filter(_subscription_is_active(now)).label("active"),
+        ).group_by(plan_id, duration)
+        return (await self.session.execute(stmt)).all()
+
+    async def get_income_by_plan(self) -> Sequence[Row[Any]]:
+        plan_id = Transaction.plan["id"].as_integer()
+
+        stmt = (
+            select(
+                plan_id.label("plan_id"),
+                Transaction.currency,
+                func.sum(_final_amount()).label("amount"),
+            )
+            .where(
+                Transaction.status == TransactionStatus.COMPLETED,
+                plan_id.is_not(None),
+            )
+            .group_by(plan_id, Transaction.currency)
+        )
+        return (await self.session.execute(stmt)).all()
+
+    async def get_promocode_activations(self) -> Sequence[Row[Any]]:
+        stmt = (
+            select(
+                Promocode.code,
+                Promocode.reward_type,
+                func.coalesce(Promocode.reward, 0).label("reward"),
+                func.count(PromocodeActivation.id).label("activations"),
+            )
+            .outerjoin(PromocodeActivation, PromocodeActivation.promocode_id == Promocode.id)
+            .group_by(Promocode.id)
+        )
+        return (await self.session.execute(stmt)).all()
+
+    async def get_rollup_watermark(self) -> Optional[date]:
+        return await self.session.scalar(select(func.max(DailyUserStatistics.day)))
+
+    async def refresh_user_rollups(self, since: Optional[date]) -> None:
+        day = _day_of(User.created_at)
+        rollup = select(day, func.count()).group_by(day)
+
+        if since is not None:
+            rollup = rollup.where(User.created_at >= _day_start(since))
+            await self.session.execute(
+                delete(DailyUserStatistics).where(DailyUserStatistics.day >= since)
+            )
+        else:
+            await self.session.execute(delete(DailyUserStatistics))
+
+        stmt = insert(DailyUserStatistics).from_select(["day", "registrations"], rollup)
+        await self.session.execute(stmt)
+
+    async def refresh_revenue_rollups(self, since: Optional[date]) -> None:
+        day = _day_of(Transaction.created_at)
+        amount = _final_amount()
+        is_completed = Transaction.status == TransactionStatus.COMPLETED
+
+        rollup = select(
+            day,
+            Transaction.gateway_type,
+            Transaction.currency,
+            func.count(),
+            func.count().filter(is_completed),
+            func.count().filter(amount == 0),
+            func.count().filter(is_completed, amount != 0),
+            func.coalesce(func.sum(amount).filter(is_completed), 0),
+            func.coalesce(func.sum(_original_amount() - amount).filter(is_completed), 0),
+        ).group_by(day, Transaction.gateway_type, Transaction.currency)
+
+        if since is not None:
+            rollup = rollup.where(Transaction.created_at >= _day_start(since))
+            await self.session.execute(
+                delete(DailyRevenueStatistics).where(DailyRevenueStatistics.day >= since)
+            )
+        else:
+            await self.session.execute(delete(DailyRevenueStatistics))
+
+        stmt = insert(DailyRevenueStatistics).from_select(
+            [
+                "day",
+                "gateway_type",
+                "currency",
+                "transactions",
+                "completed",
+                "free",
+                "paid",
+                "income",
+                "discount",
+            ],
+            rollup,
+        )
+        await self.session.execute(stmt)
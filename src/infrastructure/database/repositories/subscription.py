@@ -1,6 +1,10 @@
-from typing import Any, Optional
+from datetime import datetime
+from typing import Any, Optional, Sequence
 
-from src.infrastructure.database.models.sql import Subscription
+from sqlalchemy import Row, select
+
+from src.core.enums import SubscriptionStatus
+from src.infrastructure.database.models.sql import Subscription, User
 
 from .base import BaseRepository
 
@@ -12,6 +16,56 @@ class SubscriptionRepository(BaseRepository):
     async def get(self, subscription_id: int) -> Optional[Subscription]:
         return await self._get_one(Subscription, Subscription.id == subscription_id)
 
+    async def get_current(self, telegram_id: int) -> Optional[Subscription]:
+        stmt = (
+            select(Subscription)
+            .join(User, User.current_subscription_id == Subscription.id)
+            .where(User.telegram_id == telegram_id)
+        )
+        return await self.session.scalar(stmt)
+
+    async def get_current_many(self, telegram_ids: list[int]) -> list[Subscription]:
+        if not telegram_ids:
+            return []
+
+        stmt = (
+            select(Subscription)
+            .join(User, User.current_subscription_id == Subscription.id)
+            .where(User.telegram_id.in_(telegram_ids))
+        )
+        result = await self.session.scalars(stmt)
+        return list(result.all())
+
+    async def get_current_fingerprints(self, telegram_ids: list[int]) -> Sequence[Row[Any]]:
+        if not telegram_ids:
+            return []
+
+        stmt = (
+            select(User.telegram_id, Subscription.sync_fingerprint)
+            .join(Subscription, User.current_subscription_id == Subscription.id)
+            .where(User.telegram_id.in_(telegram_ids))
+        )
+        result = await self.session.execute(stmt)
+        return result.all()
+
+    async def get_current_remna_ids(self, updated_before: datetime) -> Sequence[Row[Any]]:
+        stmt = (
+            select(User.telegram_id, Subscription.id, Subscription.user_remna_id)
+            .join(Subscription, User.current_subscription_id == Subscription.id)
+            .where(
+                Subscription.status != SubscriptionStatus.DELETED,
+                Subscription.updated_at < updated_before,
+            )
+        )
+        result = await self.session.execute(stmt)
+        return result.all()
+
+    async def create_many(self, subscriptions: list[Subscription]) -> list[Subscription]:
+        return await self.create_instances(subscriptions)
+
+    async def update_many(self, values: list[dict[str, Any]]) -> None:
+        await self._update_many(Subscription, values)
+
     async def get_all_by_user(self, telegram_id: int) -> list[Subscription]:
         return await self._get_many(Subscription, Subscription.user_telegram_id == telegram_id)
 
@@ -2,6 +2,7 @@ from typing import Any, Optional
 from uuid import UUID
 
 from sqlalchemy import desc
+from sqlalchemy.orm import joinedload
 
 from src.core.enums import PaymentGatewayType, TransactionStatus
 from src.infrastructure.database.models.sql import Transaction
@@ -14,7 +15,11 @@ class TransactionRepository(BaseRepository):
         return await self.create_instance(transaction)
 
     async def get(self, payment_id: UUID) -> Optional[Transaction]:
-        return await self._get_one(Transaction, Transaction.payment_id == payment_id)
+        return await self._get_one(
+            Transaction,
+            Transaction.payment_id == payment_id,
+            options=(joinedload(Transaction.user),),
+        )
 
     async def get_by_user(self, telegram_id: int) -> list[Transaction]:
         return await self._get_many(Transaction, Transaction.user_telegram_id == telegram_id)
@@ -1,22 +1,70 @@
 from typing import Any, Optional
 
-from sqlalchemy import func, or_
+from sqlalchemy import bindparam, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import selectinload, with_expression
+from sqlalchemy.sql.base import ExecutableOption
 
+from src.core.constants import BULK_INSERT_CHUNK_SIZE
 from src.core.enums import UserRole
-from src.infrastructure.database.models.sql import User
+from src.core.utils.iterables import chunked
+from src.infrastructure.database.models.sql import Referral, Subscription, User
 
-from .base import BaseRepository
+from .base import BaseRepository, ConditionType
+
+
+def _user_details() -> tuple[ExecutableOption, ...]:
+    # NOTE: Everything UserDto needs, without loading the subscription history or referral chain
+    return (
+        selectinload(User.current_subscription),
+        with_expression(
+            User.has_any_subscription,
+            select(Subscription.id)
+            .where(Subscription.user_telegram_id == User.telegram_id)
+            .exists(),
+        ),
+        with_expression(
+            User.is_invited_user,
+            select(Referral.id).where(Referral.referred_telegram_id == User.telegram_id).exists(),
+        ),
+    )
 
 
 class UserRepository(BaseRepository):
     async def create(self, user: User) -> User:
         return await self.create_instance(user)
 
+    async def create_many_if_missing(self, users: list[User]) -> list[int]:
+        if not users:
+            return []
+
+        created: list[int] = []
+
+        for chunk in chunked(self._instance_values(users), BULK_INSERT_CHUNK_SIZE):
+            stmt = (
+                insert(User)
+                .values(chunk)
+                .on_conflict_do_nothing(index_elements=[User.telegram_id])
+                .returning(User.telegram_id)
+            )
+            result = await self.session.scalars(stmt)
+            created.extend(result.all())
+
+        return created
+
     async def get(self, telegram_id: int) -> Optional[User]:
-        return await self._get_one(User, User.telegram_id == telegram_id)
+        return await self._get_one(
+            User,
+            User.telegram_id == telegram_id,
+            options=_user_details(),
+        )
 
     async def get_by_ids(self, telegram_ids: list[int]) -> list[User]:
-        return await self._get_many(User, User.telegram_id.in_(telegram_ids))
+        return await self._get_many(
+            User,
+            User.telegram_id.in_(telegram_ids),
+            options=_user_details(),
+        )
 
     async def get_by_partial_name(self, query: str) -> list[User]:
         search_pattern = f"%{query.lower()}%"
@@ -24,16 +72,71 @@ class UserRepository(BaseRepository):
             func.lower(User.name).like(search_pattern),
             func.lower(User.username).like(search_pattern),
         ]
-        return await self._get_many(User, or_(*conditions))
+        return await self._get_many(User, or_(*conditions), options=_user_details())
 
     async def get_by_referral_code(self, referral_code: str) -> Optional[User]:
-        return await self._get_one(User, User.referral_code == referral_code)
+        return await self._get_one(
+            User,
+            User.referral_code == referral_code,
+            options=_user_details(),
+        )
+
+    async def get_page_after(
+        self,
+        *conditions: ConditionType,
+        after_id: int,
+        limit: int,
+    ) -> list[User]:
+        return await self._get_many(
+            User,
+            User.id > after_id,
+            *conditions,
+            order_by=User.id.asc(),
+            limit=limit,
+        )
+
+    async def get_page(self, limit: int, offset: int) -> list[User]:
+        return await self._get_many(
+            User,
+            order_by=User.id.desc(),
+            limit=limit,
+            offset=offset,
+            options=_user_details(),
+        )
 
     async def get_all(self) -> list[User]:
-        return await self._get_many(User, order_by=User.id.desc())
+        return await self._get_many(User, order_by=User.id.desc(), options=_user_details())
 
     async def update(self, telegram_id: int, **data: Any) -> Optional[User]:
-        return await self._update(User, User.telegram_id == telegram_id, **data)
+        await self._update(User, User.telegram_id == telegram_id, load_result=False, **data)
+        return await self.get(telegram_id)
+
+    async def set_bot_blocked_many(self, telegram_ids: list[int], blocked: bool) -> int:
+        if not telegram_ids:
+            return 0
+
+        stmt = update(User).where(User.telegram_id.in_(telegram_ids)).values(is_bot_blocked=blocked)
+        result = await self.session.execute(stmt)
+        return result.rowcount  # type: ignore[attr-defined, no-any-return]
+
+    async def set_current_subscriptions(self, subscription_ids: dict[int, Optional[int]]) -> None:
+        if not subscription_ids:
+            return
+
+        stmt = (
+            update(User)
+            .where(User.telegram_id == bindparam("b_telegram_id"))
+            .values(current_subscription_id=bindparam("b_subscription_id"))
+        )
+        values = [
+            {"b_telegram_id": telegram_id, "b_subscription_id": subscription_id}
+            for telegram_id, subscription_id in subscription_ids.items()
+        ]
+
+        # NOTE: Core executemany, the ORM bulk path only matches rows by primary key
+        connection = await self.session.connection()
+        for chunk in chunked(values, BULK_INSERT_CHUNK_SIZE):
+            await connection.execute(stmt, chunk)
 
     async def delete(self, telegram_id: int) -> bool:
         return bool(await self._delete(User, User.telegram_id == telegram_id))
@@ -42,7 +145,19 @@ class UserRepository(BaseRepository):
         return await self._count(User)
 
     async def filter_by_role(self, role: UserRole) -> list[User]:
-        return await self._get_many(User, User.role == role)
+        return await self._get_many(User, User.role == role, options=_user_details())
 
     async def filter_by_blocked(self, blocked: bool) -> list[User]:
-        return await self._get_many(User, User.is_blocked == blocked)
+        return await self._get_many(User, User.is_blocked == blocked, options=_user_details())
+
+    async def get_ids_by_role(self, role: UserRole) -> list[int]:
+        result = await self.session.scalars(
+            select(User.telegram_id).where(User.role == role).order_by(User.id.desc())
+        )
+        return list(result.all())
+
+    async def get_blocked_ids(self) -> list[int]:
+        result = await self.session.scalars(
+            select(User.telegram_id).where(User.is_blocked.is_(True)).order_by(User.id.desc())
+        )
+        return list(result.all())
@@ -2,16 +2,31 @@ from types import TracebackType
 from typing import Optional, Self, Type
 
 from loguru import logger
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
+    AsyncEngine,
+    AsyncSession,
+    AsyncSessionTransaction,
+    async_sessionmaker,
+)
 
 from .repositories import RepositoriesFacade
 
 
 class UnitOfWork:
-    def __init__(self, session_maker: async_sessionmaker[AsyncSession]) -> None:
+    def __init__(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        engine: Optional[AsyncEngine] = None,
+    ) -> None:
+        # NOTE: With an engine the connection is checked out once and held until close(),
+        # every top-level block still gets its own session and transaction on it
         self.session_maker = session_maker
+        self.engine = engine
         self.session: Optional[AsyncSession] = None
         self._repository: Optional[RepositoriesFacade] = None
+        self._connection: Optional[AsyncConnection] = None
+        self._savepoints: list[AsyncSessionTransaction] = []
 
     @property
     def repository(self) -> RepositoriesFacade:
@@ -20,7 +35,20 @@ class UnitOfWork:
         return self._repository
 
     async def __aenter__(self) -> Self:
-        self.session = self.session_maker()
+        if self.session is not None:
+            self._savepoints.append(await self.session.begin_nested())
+            logger.debug(f"SQL savepoint started. Session ID: '{id(self.session)}'")
+            return self
+
+        if self.engine is not None:
+            if self._connection is None:
+                self._connection = await self.engine.connect()
+                logger.debug(f"SQL connection checked out. Connection ID: '{id(self._connection)}'")
+
+            self.session = self.session_maker(bind=self._connection)
+        else:
+            self.session = self.session_maker()
+
         self._repository = RepositoriesFacade(session=self.session)
 
         logger.debug(f"SQL session started. Session ID: '{id(self.session)}'")
@@ -35,6 +63,16 @@ class UnitOfWork:
         if self.session is None:
             return
 
+        if self._savepoints:
+            savepoint = self._savepoints.pop()
+            if exc_type:
+                await savepoint.rollback()
+                logger.warning(f"SQL savepoint rolled back due to error: '{exc_val}'")
+            else:
+                await savepoint.commit()
+                logger.debug("SQL savepoint released")
+            return
+
         try:
             if exc_type:
                 await self.session.rollback()
@@ -57,3 +95,11 @@ class UnitOfWork:
         if self.session:
             await self.session.rollback()
             logger.debug(f"Session '{id(self.session)}' rolled back")
+
+    async def close(self) -> None:
+        if self._connection is None:
+            return
+
+        await self._connection.close()
+        logger.debug(f"SQL connection released. Connection ID: '{id(self._connection)}'")
+        self._connection = None
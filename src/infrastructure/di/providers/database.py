@@ -41,7 +41,13 @@ class DatabaseProvider(Provider):
     @provide(scope=Scope.REQUEST)
     async def get_uow(
         self,
+        config: AppConfig,
+        engine: AsyncEngine,
         session_maker: async_sessionmaker[AsyncSession],
     ) -> AsyncIterable[UnitOfWork]:
-        uow = UnitOfWork(session_maker)
+        uow = UnitOfWork(
+            session_maker,
+            engine=engine if config.database.reuse_connection else None,
+        )
         yield uow
+        await uow.close()
@@ -5,7 +5,7 @@ from loguru import logger
 from redis.asyncio import ConnectionPool, Redis
 
 from src.core.config import AppConfig
-from src.infrastructure.redis import RedisRepository
+from src.infrastructure.redis import RedisRepository, TelegramRateLimiter, UserThrottler
 
 
 class RedisProvider(Provider):
@@ -31,3 +31,5 @@ class RedisProvider(Provider):
         await connection_pool.disconnect()
 
     redis_repository = provide(source=RedisRepository)
+    rate_limiter = provide(source=TelegramRateLimiter)
+    throttler = provide(source=UserThrottler)
@@ -1,16 +1,23 @@
+from collections.abc import AsyncGenerator
+from importlib.util import find_spec
+from typing import Optional
+from urllib.parse import urlsplit
+from urllib.request import getproxies, proxy_bypass
+
 from dishka import Provider, Scope, provide
-from httpx import AsyncClient, Timeout
+from httpx import AsyncClient, AsyncHTTPTransport, Limits, Timeout
 from loguru import logger
 from remnapy import RemnawaveSDK
 
 from src.core.config import AppConfig
+from src.infrastructure.remnawave import InstrumentedTransport
 
 
 class RemnawaveProvider(Provider):
     scope = Scope.APP
 
     @provide
-    def get_remnawave(self, config: AppConfig) -> RemnawaveSDK:
+    async def get_remnawave(self, config: AppConfig) -> AsyncGenerator[RemnawaveSDK, None]:
         logger.debug("Initializing RemnawaveSDK")
 
         headers = {}
@@ -21,12 +28,55 @@ class RemnawaveProvider(Provider):
             headers["x-forwarded-proto"] = "https"
             headers["x-forwarded-for"] = "127.0.0.1"
 
+        http2 = config.remnawave.http2
+        if http2 and find_spec("h2") is None:
+            logger.warning("REMNAWAVE_HTTP2 is enabled but 'h2' is not installed, using HTTP/1.1")
+            http2 = False
+
+        proxy = _get_proxy(config)
+        if proxy:
+            logger.info("Remnawave API requests are sent through a proxy")
+
+        # NOTE: HTTP/2 is only negotiated over TLS, the docker panel keeps using HTTP/1.1
+        transport = InstrumentedTransport(
+            AsyncHTTPTransport(
+                verify=True,
+                http2=http2,
+                proxy=proxy,
+                limits=Limits(
+                    max_connections=config.remnawave.max_connections,
+                    max_keepalive_connections=config.remnawave.max_keepalive_connections,
+                    keepalive_expiry=config.remnawave.keepalive_expiry,
+                ),
+            )
+        )
         client = AsyncClient(
             base_url=f"{config.remnawave.url.get_secret_value()}/api",
             headers=headers,
             cookies=config.remnawave.cookies,
-            verify=True,
-            timeout=Timeout(connect=15.0, read=25.0, write=10.0, pool=5.0),
+            transport=transport,
+            timeout=Timeout(
+                connect=15.0,
+                read=25.0,
+                write=10.0,
+                pool=config.remnawave.pool_timeout,
+            ),
         )
 
-        return RemnawaveSDK(client)
+        yield RemnawaveSDK(client)
+
+        logger.debug("Closing RemnawaveSDK client")
+        await client.aclose()
+
+
+def _get_proxy(config: AppConfig) -> Optional[str]:
+    if proxy := config.remnawave.proxy.get_secret_value():
+        return proxy
+
+    # NOTE: A custom transport disables httpx's own HTTP(S)_PROXY handling, so it is redone here
+    url = urlsplit(config.remnawave.url.get_secret_value())
+    if url.hostname and proxy_bypass(url.hostname):
+        return None
+
+    proxies = getproxies()
+    return proxies.get(url.scheme) or proxies.get("all")
@@ -1,7 +1,22 @@
-from .cache import redis_cache
+from .cache import invalidate_cache, listen_cache_invalidation, redis_cache
+from .event_queue import PushResult, discard_event, pop_event, push_event
+from .lock import acquire_lock, extend_lock, release_lock
+from .rate_limiter import TelegramRateLimiter
 from .repository import RedisRepository
+from .throttler import UserThrottler
 
 __all__ = [
+    "acquire_lock",
+    "extend_lock",
+    "release_lock",
+    "PushResult",
+    "discard_event",
+    "pop_event",
+    "push_event",
+    "invalidate_cache",
+    "listen_cache_invalidation",
     "redis_cache",
     "RedisRepository",
+    "TelegramRateLimiter",
+    "UserThrottler",
 ]
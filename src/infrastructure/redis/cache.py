@@ -1,35 +1,235 @@
+import asyncio
+import time
+import zlib
+from collections import OrderedDict
+from copy import deepcopy
+from datetime import timedelta
 from functools import wraps
-from typing import Any, Awaitable, Callable, Optional, ParamSpec, TypeVar, get_type_hints
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Final,
+    Optional,
+    ParamSpec,
+    TypeVar,
+    cast,
+    get_type_hints,
+)
 
 from loguru import logger
-from pydantic import SecretStr, TypeAdapter
+from msgspec.json import Encoder
+from pydantic import BaseModel, SecretStr, TypeAdapter
 from redis.asyncio import Redis
 from redis.typing import ExpiryT
 
-from src.core.constants import TIME_1M
-from src.core.utils import json_utils
+from src.core.constants import LOCAL_CACHE_MAX_SIZE, TIME_1M
+
+from .lock import acquire_lock, release_lock
 
 T = TypeVar("T", bound=Any)
 P = ParamSpec("P")
 
+CACHE_INVALIDATION_CHANNEL: Final[str] = "cache_invalidation"
+CACHE_INVALIDATION_RETRY_DELAY: Final[int] = 5
+CACHE_LOCK_TIMEOUT: Final[int] = 10
+CACHE_LOCK_POLL_INTERVAL: Final[float] = 0.05
+CACHE_COMPRESSION_THRESHOLD: Final[int] = 16 * 1024
+CACHE_COMPRESSION_LEVEL: Final[int] = 1
+# NOTE: JSON never starts with a NUL byte, so plain values written before stay readable
+CACHE_COMPRESSED_MARKER: Final[bytes] = b"\x00"
+
+_inflight: dict[str, "asyncio.Future[Any]"] = {}
+
+
+class LocalCache:
+    # NOTE: Stays disabled until the process listens for invalidations,
+    # otherwise another process could change a value and this one would never notice
+    enabled: bool
+
+    def __init__(self, max_size: int) -> None:
+        self.enabled = False
+        self.max_size = max_size
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: str) -> tuple[bool, Any]:
+        if not self.enabled or key not in self._data:
+            return False, None
+
+        expires_at, value = self._data[key]
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return False, None
+
+        self._data.move_to_end(key)
+        return True, deepcopy(value)
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        if not self.enabled:
+            return
 
-def prepare_for_cache(obj: Any) -> Any:
+        self._data[key] = (time.monotonic() + ttl, deepcopy(value))
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+
+local_cache = LocalCache(max_size=LOCAL_CACHE_MAX_SIZE)
+
+
+def _encode_hook(obj: Any) -> Any:
     if isinstance(obj, SecretStr):
         return obj.get_secret_value()
-    elif isinstance(obj, dict):
-        return {k: prepare_for_cache(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [prepare_for_cache(v) for v in obj]
-    return obj
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    raise NotImplementedError(f"Cannot cache objects of type '{type(obj).__name__}'")
+
+
+_cache_encoder: Final[Encoder] = Encoder(enc_hook=_encode_hook)
+
+
+def encode_for_cache(value: Any) -> bytes:
+    # NOTE: Secrets are stored as is, they must survive the round trip to Redis
+    data = _cache_encoder.encode(value)
+
+    if len(data) < CACHE_COMPRESSION_THRESHOLD:
+        return data
+
+    return CACHE_COMPRESSED_MARKER + zlib.compress(data, CACHE_COMPRESSION_LEVEL)
+
+
+def decode_from_cache(data: bytes) -> bytes:
+    if data.startswith(CACHE_COMPRESSED_MARKER):
+        return zlib.decompress(data[len(CACHE_COMPRESSED_MARKER) :])
+    return data
+
+
+async def _read_cached(
+    redis: Redis,
+    key: str,
+    type_adapter: TypeAdapter[T],
+    with_stale: bool,
+) -> tuple[bool, Optional[T], bool]:
+    if with_stale:
+        cached_value, fresh_marker = await redis.mget(key, f"{key}:fresh")
+        is_fresh = fresh_marker is not None
+    else:
+        cached_value = await redis.get(key)
+        is_fresh = True
+
+    # NOTE: A cached None is stored as "null", only a missing key is a miss
+    if cached_value is None:
+        return False, None, False
+
+    return True, type_adapter.validate_json(decode_from_cache(cached_value)), is_fresh
+
+
+async def _write_cached(
+    redis: Redis,
+    key: str,
+    value: bytes,
+    ttl: int,
+    stale_ttl: Optional[int],
+) -> None:
+    if stale_ttl is None:
+        await redis.setex(key, ttl, value)
+        return
+
+    pipeline = redis.pipeline(transaction=True)
+    pipeline.setex(key, ttl + stale_ttl, value)
+    pipeline.setex(f"{key}:fresh", ttl, 1)
+    await pipeline.execute()
+
+
+async def _acquire_or_wait(
+    redis: Redis,
+    key: str,
+    type_adapter: TypeAdapter[T],
+    with_stale: bool,
+) -> tuple[Optional[str], bool, Optional[T]]:
+    try:
+        deadline = time.monotonic() + CACHE_LOCK_TIMEOUT
 
+        # NOTE: Another process is computing the value, wait for it to land.
+        # Once its lock is gone (value written or computation failed) the next waiter takes over
+        while (token := await acquire_lock(redis, f"{key}:lock", CACHE_LOCK_TIMEOUT)) is None:
+            if time.monotonic() >= deadline:
+                return None, False, None
 
-def redis_cache(
+            await asyncio.sleep(CACHE_LOCK_POLL_INTERVAL)
+            is_hit, cached, is_fresh = await _read_cached(redis, key, type_adapter, with_stale)
+            if is_hit and is_fresh:
+                logger.debug(f"Cache filled by another process: '{key}'")
+                return None, True, cached
+
+        return token, False, None
+    except Exception as exception:
+        logger.warning(f"Cache lock failed for key '{key}': {exception}")
+
+    return None, False, None
+
+
+async def _release_cache_lock(redis: Redis, key: str, token: str) -> None:
+    try:
+        await release_lock(redis, f"{key}:lock", token)
+    except Exception as exception:
+        logger.warning(f"Cache lock release failed for key '{key}': {exception}")
+
+
+async def _is_revalidating(redis: Redis, key: str) -> bool:
+    if key in _inflight:
+        return True
+
+    try:
+        return bool(await redis.exists(f"{key}:lock"))
+    except Exception:
+        return False
+
+
+def redis_cache(  # noqa: C901
     prefix: Optional[str] = None,
     ttl: ExpiryT = TIME_1M,
+    local_ttl: Optional[float] = None,
+    stale_ttl: Optional[int] = None,
 ) -> Callable[[Callable[P, Awaitable[T]]], Callable[P, Awaitable[T]]]:
-    def decorator(func: Callable[P, Awaitable[T]]) -> Callable[P, Awaitable[T]]:
+    def decorator(func: Callable[P, Awaitable[T]]) -> Callable[P, Awaitable[T]]:  # noqa: C901
         return_type: Any = get_type_hints(func)["return"]
         type_adapter: TypeAdapter[T] = TypeAdapter(return_type)
+        ttl_seconds = int(ttl.total_seconds()) if isinstance(ttl, timedelta) else int(ttl)
+        with_stale = stale_ttl is not None
+
+        async def recompute(redis: Redis, key: str, *args: P.args, **kwargs: P.kwargs) -> T:
+            token, is_hit, result_from_cache = await _acquire_or_wait(
+                redis, key, type_adapter, with_stale
+            )
+            if is_hit:
+                return cast(T, result_from_cache)
+
+            try:
+                logger.debug(f"Cache miss: '{key}'. Executing function")
+                result: T = await func(*args, **kwargs)
+
+                try:
+                    # NOTE: Dumped by alias so models without populate_by_name validate back
+                    value = encode_for_cache(type_adapter.dump_python(result, by_alias=True))
+                    await _write_cached(redis, key, value, ttl_seconds, stale_ttl)
+                    logger.debug(f"Result cached: '{key}' (ttl={ttl})")
+                except Exception as exception:
+                    logger.warning(f"Cache write failed for key '{key}': {exception}")
+
+                return result
+            finally:
+                # NOTE: Released even when the function fails, waiters must not sit out the timeout
+                if token is not None:
+                    await _release_cache_lock(redis, key, token)
 
         @wraps(func)
         async def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
@@ -45,27 +245,107 @@ def redis_cache(
             ]
             key: str = ":".join(key_parts)
 
+            if local_ttl is not None:
+                is_hit, local_value = local_cache.get(key)
+                if is_hit:
+                    return local_value  # type: ignore[no-any-return]
+
+            result_from_cache: Optional[T] = None
+            is_hit = False
+            is_fresh = False
+
             try:
-                cached_value: Optional[bytes] = await redis.get(key)
-                if cached_value is not None:
-                    logger.debug(f"Cache hit: '{key}'")
-                    parsed = json_utils.decode(cached_value.decode())
-                    return type_adapter.validate_python(parsed)
+                is_hit, result_from_cache, is_fresh = await _read_cached(
+                    redis, key, type_adapter, with_stale
+                )
             except Exception as exception:
                 logger.warning(f"Cache read failed for key '{key}': {exception}")
 
-            logger.debug(f"Cache miss: '{key}'. Executing function")
-            result: T = await func(*args, **kwargs)
+            if is_hit and is_fresh:
+                logger.debug(f"Cache hit: '{key}'")
+                result = cast(T, result_from_cache)
+            elif is_hit and await _is_revalidating(redis, key):
+                # NOTE: Serve the previous value while someone else revalidates it
+                logger.debug(f"Cache stale hit: '{key}'")
+                return cast(T, result_from_cache)
+            else:
+                result = await single_flight(key, lambda: recompute(redis, key, *args, **kwargs))
 
-            try:
-                safe_result = prepare_for_cache(type_adapter.dump_python(result))
-                await redis.setex(key, ttl, json_utils.encode(safe_result))
-                logger.debug(f"Result cached: '{key}' (ttl={ttl})")
-            except Exception as exception:
-                logger.warning(f"Cache write failed for key '{key}': {exception}")
+            if local_ttl is not None:
+                local_cache.set(key, result, local_ttl)
 
             return result
 
         return wrapper
 
     return decorator
+
+
+async def single_flight(key: str, factory: Callable[[], Awaitable[T]]) -> T:
+    future = _inflight.get(key)
+
+    if future is not None:
+        try:
+            return deepcopy(await asyncio.shield(future))
+        except asyncio.CancelledError:
+            # NOTE: The leader was cancelled, not this caller, so compute on our own
+            if not future.cancelled():
+                raise
+
+    future = asyncio.get_running_loop().create_future()
+    _inflight[key] = future
+
+    try:
+        result = await factory()
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as exception:
+        future.set_exception(exception)
+        future.exception()  # NOTE: Marks the exception as retrieved when nobody waits for it
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        _inflight.pop(key, None)
+
+
+async def invalidate_cache(redis: Redis, *keys: str) -> None:
+    if not keys:
+        return
+
+    local_cache.delete(*keys)
+
+    pipeline = redis.pipeline(transaction=False)
+    pipeline.delete(*keys)
+    pipeline.publish(CACHE_INVALIDATION_CHANNEL, "\n".join(keys))
+    results = await pipeline.execute(raise_on_error=False)
+
+    if isinstance(results[0], Exception):
+        raise results[0]
+
+    if isinstance(results[1], Exception):
+        logger.warning(f"Failed to publish cache invalidation for {keys}: {results[1]}")
+
+
+async def listen_cache_invalidation(redis: Redis) -> None:
+    while True:
+        try:
+            async with redis.pubsub(ignore_subscribe_messages=True) as pubsub:
+                await pubsub.subscribe(CACHE_INVALIDATION_CHANNEL)
+                local_cache.enabled = True
+                logger.info("Local cache enabled, listening for invalidations")
+
+                async for message in pubsub.listen():
+                    local_cache.delete(*message["data"].decode().split("\n"))
+        except asyncio.CancelledError:
+            local_cache.enabled = False
+            local_cache.clear()
+            raise
+        except Exception as exception:
+            # NOTE: Invalidations may have been missed while disconnected
+            local_cache.enabled = False
+            local_cache.clear()
+            logger.warning(f"Cache invalidation listener failed: {exception}")
+            await asyncio.sleep(CACHE_INVALIDATION_RETRY_DELAY)
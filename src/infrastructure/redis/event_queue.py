@@ -0,0 +1,79 @@
+from enum import IntEnum
+from typing import Final, Optional
+
+from redis.asyncio import Redis
+
+# Appends an event to a per-entity queue and marks the queue as owned by a consumer.
+# When `coalesce_prefix` is given and the last pending event starts with it, that event
+# is replaced instead, so a burst collapses without reordering it against other events.
+# Returns 1 when the caller has to schedule a consumer, 0 when one already owns the queue,
+# 2 when the event replaced a pending one.
+PUSH_EVENT_SCRIPT: Final[str] = """
+local ttl = tonumber(ARGV[3])
+local coalesced = false
+
+if ARGV[2] ~= '' then
+    local tail = redis.call('LINDEX', KEYS[1], -1)
+    if tail and string.sub(tail, 1, #ARGV[2]) == ARGV[2] then
+        redis.call('LSET', KEYS[1], -1, ARGV[1])
+        coalesced = true
+    end
+end
+
+if not coalesced then
+    redis.call('RPUSH', KEYS[1], ARGV[1])
+end
+redis.call('EXPIRE', KEYS[1], ttl)
+
+if redis.call('SET', KEYS[2], 1, 'NX', 'EX', ttl) then
+    return 1
+end
+if coalesced then
+    return 2
+end
+return 0
+"""
+
+# Pops the next event, or releases the queue when it is empty, in one step,
+# so an event pushed right after the last pop always finds the queue unowned.
+POP_EVENT_SCRIPT: Final[str] = """
+local item = redis.call('LPOP', KEYS[1])
+if not item then
+    redis.call('DEL', KEYS[2])
+    return false
+end
+redis.call('EXPIRE', KEYS[2], ARGV[1])
+return item
+"""
+
+
+class PushResult(IntEnum):
+    QUEUED = 0
+    SCHEDULE = 1
+    COALESCED = 2
+
+
+async def push_event(
+    redis: Redis,
+    queue_key: str,
+    owner_key: str,
+    item: str,
+    ttl: int,
+    coalesce_prefix: str = "",
+) -> PushResult:
+    script = redis.register_script(PUSH_EVENT_SCRIPT)
+    result = await script(keys=[queue_key, owner_key], args=[item, coalesce_prefix, ttl])
+    return PushResult(int(result))
+
+
+async def pop_event(redis: Redis, queue_key: str, owner_key: str, ttl: int) -> Optional[str]:
+    script = redis.register_script(POP_EVENT_SCRIPT)
+    item = await script(keys=[queue_key, owner_key], args=[ttl])
+    return item.decode() if item is not None else None
+
+
+async def discard_event(redis: Redis, queue_key: str, owner_key: str, item: str) -> None:
+    pipeline = redis.pipeline(transaction=True)
+    pipeline.lrem(queue_key, -1, item)
+    pipeline.delete(owner_key)
+    await pipeline.execute()
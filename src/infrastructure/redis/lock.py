@@ -0,0 +1,39 @@
+from typing import Final, Optional
+from uuid import uuid4
+
+from redis.asyncio import Redis
+
+# Both scripts only touch the lock while it still holds the caller's token,
+# so an owner whose lock expired can never release or extend the next owner's lock.
+RELEASE_LOCK_SCRIPT: Final[str] = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+EXTEND_LOCK_SCRIPT: Final[str] = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+async def acquire_lock(redis: Redis, key: str, ttl: int) -> Optional[str]:
+    token = uuid4().hex
+
+    if await redis.set(key, token, nx=True, ex=ttl):
+        return token
+
+    return None
+
+
+async def release_lock(redis: Redis, key: str, token: str) -> bool:
+    script = redis.register_script(RELEASE_LOCK_SCRIPT)
+    return bool(await script(keys=[key], args=[token]))
+
+
+async def extend_lock(redis: Redis, key: str, token: str, ttl: int) -> bool:
+    script = redis.register_script(EXTEND_LOCK_SCRIPT)
+    return bool(await script(keys=[key], args=[token, ttl]))
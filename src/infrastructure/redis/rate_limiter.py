@@ -0,0 +1,115 @@
+import asyncio
+from typing import Final, Union
+
+from aiogram import Bot
+from loguru import logger
+from redis.asyncio import Redis
+
+from src.core.constants import (
+    TELEGRAM_BULK_RESERVE,
+    TELEGRAM_CHAT_BURST,
+    TELEGRAM_CHAT_RATE_LIMIT,
+    TELEGRAM_GLOBAL_RATE_LIMIT,
+)
+from src.core.enums import SendPriority
+from src.core.storage.keys import BotSendPauseKey, BotSendRateKey, ChatSendRateKey
+
+# Two token buckets (bot-wide and per chat) are refilled and checked atomically.
+# Returns 0 when both tokens were taken, otherwise milliseconds to wait before retrying.
+# Bulk traffic has to leave `reserve` tokens in the bot bucket for interactive sends.
+# While the pause key (set after a flood-control error) is alive, nothing is sent.
+TOKEN_BUCKET_SCRIPT: Final[str] = """
+local paused = redis.call('PTTL', KEYS[3])
+if paused > 0 then
+    return paused
+end
+
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+
+local function refill(key, rate, capacity)
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    return math.min(capacity, tokens + math.max(0, now - ts) * rate / 1000)
+end
+
+local bot_rate = tonumber(ARGV[1])
+local bot_capacity = tonumber(ARGV[2])
+local reserve = tonumber(ARGV[3])
+local chat_rate = tonumber(ARGV[4])
+local chat_capacity = tonumber(ARGV[5])
+
+local bot_tokens = refill(KEYS[1], bot_rate, bot_capacity)
+local chat_tokens = refill(KEYS[2], chat_rate, chat_capacity)
+
+local wait = 0
+if bot_tokens < 1 + reserve then
+    wait = math.ceil((1 + reserve - bot_tokens) * 1000 / bot_rate)
+end
+if chat_tokens < 1 then
+    wait = math.max(wait, math.ceil((1 - chat_tokens) * 1000 / chat_rate))
+end
+if wait > 0 then
+    return wait
+end
+
+redis.call('HSET', KEYS[1], 'tokens', bot_tokens - 1, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(bot_capacity * 1000 / bot_rate) + 1000)
+redis.call('HSET', KEYS[2], 'tokens', chat_tokens - 1, 'ts', now)
+redis.call('PEXPIRE', KEYS[2], math.ceil(chat_capacity * 1000 / chat_rate) + 1000)
+return 0
+"""
+
+
+class TelegramRateLimiter:
+    client: Redis
+    bot: Bot
+
+    def __init__(self, client: Redis, bot: Bot) -> None:
+        self.client = client
+        self.bot = bot
+        self._script = client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    async def acquire(
+        self,
+        chat_id: Union[int, str],
+        priority: SendPriority = SendPriority.INTERACTIVE,
+    ) -> None:
+        reserve = TELEGRAM_BULK_RESERVE if priority == SendPriority.BULK else 0
+        keys = [
+            BotSendRateKey(bot_id=self.bot.id).pack(),
+            ChatSendRateKey(bot_id=self.bot.id, chat_id=chat_id).pack(),
+            BotSendPauseKey(bot_id=self.bot.id).pack(),
+        ]
+        args = [
+            TELEGRAM_GLOBAL_RATE_LIMIT,
+            TELEGRAM_GLOBAL_RATE_LIMIT,
+            reserve,
+            TELEGRAM_CHAT_RATE_LIMIT,
+            TELEGRAM_CHAT_BURST,
+        ]
+
+        while True:
+            try:
+                wait_ms = int(await self._script(keys=keys, args=args))
+            except Exception as exception:
+                logger.warning(f"Rate limiter unavailable, sending without limit: {exception}")
+                return
+
+            if wait_ms <= 0:
+                return
+
+            logger.debug(f"Send to '{chat_id}' ({priority}) throttled for '{wait_ms}' ms")
+            await asyncio.sleep(wait_ms / 1000)
+
+    async def pause(self, retry_after: float) -> None:
+        logger.warning(f"Flood control hit, pausing all sends for '{retry_after}' seconds")
+        try:
+            await self.client.set(
+                BotSendPauseKey(bot_id=self.bot.id).pack(),
+                1,
+                px=max(1, int(retry_after * 1000)),
+            )
+        except Exception as exception:
+            logger.warning(f"Failed to pause rate limiter: {exception}")
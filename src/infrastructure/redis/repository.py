@@ -33,10 +33,18 @@ class RedisRepository:
         value = json_utils.decode(value)
         return TypeAdapter[T](validator).validate_python(value)
 
-    async def set(self, key: StorageKey, value: Any, ex: Optional[ExpiryT] = None) -> None:
+    async def set(
+        self,
+        key: StorageKey,
+        value: Any,
+        ex: Optional[ExpiryT] = None,
+        nx: bool = False,
+    ) -> bool:
         if isinstance(value, BaseModel):
             value = value.model_dump(exclude_defaults=True)
-        await self.client.set(name=key.pack(), value=json_utils.encode(value), ex=ex)
+        return bool(
+            await self.client.set(name=key.pack(), value=json_utils.encode(value), ex=ex, nx=nx)
+        )
 
     async def exists(self, key: StorageKey) -> bool:
         return cast(bool, await self.client.exists(key.pack()))
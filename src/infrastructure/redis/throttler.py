@@ -0,0 +1,60 @@
+from typing import Final
+
+from loguru import logger
+from redis.asyncio import Redis
+
+from src.core.enums import UserRole
+from src.core.storage.keys import UserThrottleKey
+
+# Generic cell rate algorithm: only the theoretical arrival time (TAT) is stored per user.
+# Returns 0 when the update is allowed, otherwise milliseconds until the next one would be.
+# Rejected updates do not move the TAT, so spamming does not extend the penalty.
+GCRA_SCRIPT: Final[str] = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+
+local interval = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+
+local tat = math.max(tonumber(redis.call('GET', KEYS[1])) or now, now)
+local new_tat = tat + interval
+local allow_at = new_tat - burst * interval
+
+if allow_at > now then
+    return allow_at - now
+end
+
+redis.call('SET', KEYS[1], new_tat, 'PX', new_tat - now)
+return 0
+"""
+
+# Emission interval in milliseconds and burst size per role
+ROLE_THROTTLING_LIMITS: Final[dict[UserRole, tuple[int, int]]] = {
+    UserRole.USER: (500, 1),
+    UserRole.ADMIN: (250, 4),
+    UserRole.DEV: (100, 10),
+}
+
+
+class UserThrottler:
+    client: Redis
+
+    def __init__(self, client: Redis) -> None:
+        self.client = client
+        self._script = client.register_script(GCRA_SCRIPT)
+
+    async def hit(self, telegram_id: int, role: UserRole) -> int:
+        interval, burst = ROLE_THROTTLING_LIMITS[role]
+
+        try:
+            retry_after_ms = int(
+                await self._script(
+                    keys=[UserThrottleKey(telegram_id=telegram_id).pack()],
+                    args=[interval, burst],
+                )
+            )
+        except Exception as exception:
+            logger.warning(f"Throttler unavailable, letting update through: {exception}")
+            return 0
+
+        return max(0, retry_after_ms)
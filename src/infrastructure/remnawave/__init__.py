@@ -0,0 +1,5 @@
+from .telemetry import InstrumentedTransport
+
+__all__ = [
+    "InstrumentedTransport",
+]
@@ -0,0 +1,101 @@
+import re
+import time
+from typing import Any, Optional
+
+from httpx import AsyncBaseTransport, Request, Response
+from loguru import logger
+
+from src.core.constants import REMNAWAVE_POOL_WAIT_WARNING, REMNAWAVE_SLOW_REQUEST_THRESHOLD
+
+_PATH_ID_REGEX = re.compile(
+    r"/(?:[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}|\d+)(?=/|$)"
+)
+
+
+class InstrumentedTransport(AsyncBaseTransport):
+    transport: AsyncBaseTransport
+    _endpoints: dict[str, dict[str, float]]
+    _in_flight: int
+    _peak_in_flight: int
+
+    def __init__(self, transport: AsyncBaseTransport) -> None:
+        self.transport = transport
+        self._endpoints = {}
+        self._in_flight = 0
+        self._peak_in_flight = 0
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        endpoints = {
+            endpoint: {
+                "requests": int(stats["requests"]),
+                "errors": int(stats["errors"]),
+                "avg_latency": round(stats["latency"] / stats["requests"], 3),
+                "max_latency": round(stats["max_latency"], 3),
+                "avg_pool_wait": round(stats["pool_wait"] / stats["requests"], 3),
+                "max_pool_wait": round(stats["max_pool_wait"], 3),
+            }
+            for endpoint, stats in self._endpoints.items()
+        }
+        return {
+            "in_flight": self._in_flight,
+            "peak_in_flight": self._peak_in_flight,
+            "endpoints": endpoints,
+        }
+
+    async def handle_async_request(self, request: Request) -> Response:
+        endpoint = f"{request.method} {_PATH_ID_REGEX.sub('/{id}', request.url.path)}"
+        started_at = time.monotonic()
+        acquired_at: Optional[float] = None
+
+        # NOTE: httpcore emits the first trace event once the pool hands out a connection
+        async def trace(event_name: str, info: dict[str, Any]) -> None:
+            nonlocal acquired_at
+            if acquired_at is None:
+                acquired_at = time.monotonic()
+
+        request.extensions["trace"] = trace
+        self._in_flight += 1
+        self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+        failed = True
+
+        try:
+            response = await self.transport.handle_async_request(request)
+            failed = False
+            return response
+        finally:
+            self._in_flight -= 1
+            finished_at = time.monotonic()
+            self._record(
+                endpoint,
+                latency=finished_at - started_at,
+                pool_wait=(acquired_at or finished_at) - started_at,
+                failed=failed,
+            )
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+        logger.info(f"Remnawave client closed: {self.stats}")
+
+    def _record(self, endpoint: str, latency: float, pool_wait: float, failed: bool) -> None:
+        stats = self._endpoints.setdefault(
+            endpoint,
+            dict.fromkeys(
+                ("requests", "errors", "latency", "max_latency", "pool_wait", "max_pool_wait"),
+                0.0,
+            ),
+        )
+        stats["requests"] += 1
+        stats["errors"] += failed
+        stats["latency"] += latency
+        stats["max_latency"] = max(stats["max_latency"], latency)
+        stats["pool_wait"] += pool_wait
+        stats["max_pool_wait"] = max(stats["max_pool_wait"], pool_wait)
+
+        if pool_wait >= REMNAWAVE_POOL_WAIT_WARNING:
+            logger.warning(
+                f"Remnawave request '{endpoint}' waited {pool_wait:.3f}s for a connection "
+                f"({self._in_flight} in flight)"
+            )
+        elif latency >= REMNAWAVE_SLOW_REQUEST_THRESHOLD:
+            logger.warning(f"Remnawave request '{endpoint}' took {latency:.3f}s")
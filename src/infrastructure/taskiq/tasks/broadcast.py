@@ -2,95 +2,221 @@ import asyncio
 from typing import Optional, cast
 
 from aiogram import Bot
+from aiogram.exceptions import TelegramForbiddenError, TelegramRetryAfter
 from dishka.integrations.taskiq import FromDishka, inject
 from loguru import logger
 
-from src.core.enums import BroadcastMessageStatus, BroadcastStatus
+from src.core.constants import BROADCAST_BATCH_SIZE, BROADCAST_MAX_ATTEMPTS
+from src.core.enums import BroadcastMessageStatus, BroadcastStatus, SendPriority
 from src.core.utils.iterables import chunked
-from src.core.utils.message_payload import MessagePayload
 from src.infrastructure.database.models.dto import BroadcastDto, BroadcastMessageDto, UserDto
+from src.infrastructure.redis import TelegramRateLimiter
 from src.infrastructure.taskiq.broker import broker
 from src.services.broadcast import BroadcastService
 from src.services.notification import NotificationService
+from src.services.user import UserService
 
 
 @broker.task
 @inject
-async def send_broadcast_task(
+async def send_broadcast_task(  # noqa: C901
     broadcast: BroadcastDto,
-    users: list[UserDto],
-    payload: MessagePayload,
     notification_service: FromDishka[NotificationService],
     broadcast_service: FromDishka[BroadcastService],
+    user_service: FromDishka[UserService],
 ) -> None:
     broadcast_id = cast(int, broadcast.id)
-    total_users = len(users)
+    payload = broadcast.payload
     loop = asyncio.get_running_loop()
     start_time = loop.time()
 
-    logger.info(f"Started sending broadcast '{broadcast_id}', total users: {total_users}")
+    lock_token = await broadcast_service.acquire_lock(broadcast_id)
+    if lock_token is None:
+        logger.warning(f"Broadcast '{broadcast_id}' is already being sent by another worker")
+        return
 
-    try:
-        broadcast_messages = await broadcast_service.create_messages(
-            broadcast_id,
-            [
-                BroadcastMessageDto(user_id=user.telegram_id, status=BroadcastMessageStatus.PENDING)
-                for user in users
-            ],
-        )
-        logger.debug(
-            f"Created '{len(broadcast_messages)}' message DTOs for broadcast '{broadcast_id}'"
-        )
-    except Exception:
-        logger.exception(f"Failed to create message DTOs for broadcast '{broadcast_id}'")
-        broadcast.status = BroadcastStatus.ERROR
-        await broadcast_service.update(broadcast)
+    # NOTE: Checkpoint in task arguments may be outdated, the DB row is the source of truth
+    actual_broadcast = await broadcast_service.get_state(broadcast.task_id)
+    if not actual_broadcast or actual_broadcast.status != BroadcastStatus.PROCESSING:
+        logger.warning(f"Broadcast '{broadcast_id}' is no longer processing, skipping")
+        await broadcast_service.release_lock(broadcast_id, lock_token)
         return
 
+    broadcast = actual_broadcast
+
+    logger.info(
+        f"Started sending broadcast '{broadcast_id}', "
+        f"audience: '{broadcast.audience}' (plan={broadcast.plan_id}), "
+        f"total users: {broadcast.total_count}, resume from user: {broadcast.last_user_id}"
+    )
+
+    blocked_user_ids: list[int] = []
+    success_count = 0
+    failed_count = 0
+    batch_index = 0
+    last_known_status: Optional[BroadcastStatus] = broadcast.status
+    lock_lost = False
+
     async def send_message(user: UserDto, message: BroadcastMessageDto) -> None:
         try:
-            tg_message = await notification_service.notify_user(user=user, payload=payload)
+            tg_message = await notification_service.notify_user(
+                user=user,
+                payload=payload,
+                priority=SendPriority.BULK,
+                raise_forbidden=True,
+            )
             if tg_message:
                 message.message_id = tg_message.message_id
                 message.status = BroadcastMessageStatus.SENT
             else:
                 message.status = BroadcastMessageStatus.FAILED
+        except TelegramRetryAfter as exception:
+            logger.warning(
+                f"Broadcast '{broadcast_id}' message for '{user.telegram_id}' throttled, "
+                f"requeued (retry after '{exception.retry_after}' seconds)"
+            )
+            message.status = BroadcastMessageStatus.PENDING
+        except TelegramForbiddenError:
+            logger.debug(
+                f"Broadcast '{broadcast_id}' message for '{user.telegram_id}' failed: "
+                f"bot was blocked by the user"
+            )
+            message.status = BroadcastMessageStatus.FAILED
+            blocked_user_ids.append(user.telegram_id)
         except Exception:
             logger.exception(
                 f"Failed to send broadcast '{broadcast_id}' message for '{user.telegram_id}'",
             )
             message.status = BroadcastMessageStatus.FAILED
 
-    user_message_pairs = list(zip(users, broadcast_messages))
-    last_known_status: Optional[BroadcastStatus] = broadcast.status
+    async def send_batch(batch: list[tuple[UserDto, BroadcastMessageDto]]) -> None:
+        pending = batch
 
-    for i, batch in enumerate(chunked(user_message_pairs, 20), start=1):
-        batch_start = loop.time()
+        for attempt in range(1, BROADCAST_MAX_ATTEMPTS + 1):
+            await asyncio.gather(*(send_message(u, m) for u, m in pending))
+            pending = [(u, m) for u, m in pending if m.status == BroadcastMessageStatus.PENDING]
 
-        last_known_status = await broadcast_service.get_status(broadcast.task_id)
-        if last_known_status == BroadcastStatus.CANCELED:
-            break
+            if not pending:
+                return
 
-        tasks = [send_message(u, m) for u, m in batch]
-        await asyncio.gather(*tasks)
+            logger.info(
+                f"Retrying '{len(pending)}' throttled messages of broadcast '{broadcast_id}' "
+                f"(attempt {attempt}/{BROADCAST_MAX_ATTEMPTS})"
+            )
 
-        _, messages_batch = zip(*batch)
-        await broadcast_service.bulk_update_messages(list(messages_batch))
+        for _, message in pending:
+            message.status = BroadcastMessageStatus.FAILED
 
-        batch_elapsed = loop.time() - batch_start
-        logger.info(f"Batch {i}: sent {len(batch)} messages in {batch_elapsed:.2f}s")
+    async def send_page(pairs: list[tuple[UserDto, BroadcastMessageDto]]) -> bool:
+        nonlocal success_count, failed_count, batch_index, last_known_status, lock_lost
 
-        wait_time = 1.0 - batch_elapsed
-        if wait_time > 0:
-            await asyncio.sleep(wait_time)
+        for batch in chunked(pairs, BROADCAST_BATCH_SIZE):
+            batch_index += 1
+            batch_start = loop.time()
 
-    broadcast.success_count = sum(
-        1 for m in broadcast_messages if m.status == BroadcastMessageStatus.SENT
-    )
-    broadcast.failed_count = sum(
-        1 for m in broadcast_messages if m.status == BroadcastMessageStatus.FAILED
-    )
+            last_known_status = await broadcast_service.get_status(broadcast.task_id)
+            if last_known_status == BroadcastStatus.CANCELED:
+                break
+
+            await send_batch(batch)
+
+            messages_batch = [m for _, m in batch]
+            batch_success = sum(
+                1 for m in messages_batch if m.status == BroadcastMessageStatus.SENT
+            )
+            batch_failed = len(messages_batch) - batch_success
+
+            await broadcast_service.bulk_update_messages(messages_batch)
+            lock_lost = not await broadcast_service.heartbeat(
+                broadcast_id,
+                lock_token,
+                success=batch_success,
+                failed=batch_failed,
+            )
+
+            success_count += batch_success
+            failed_count += batch_failed
 
+            batch_elapsed = loop.time() - batch_start
+            logger.info(f"Batch {batch_index}: sent {len(batch)} messages in {batch_elapsed:.2f}s")
+
+            # NOTE: Another worker may have resumed the broadcast, continuing would send twice
+            if lock_lost:
+                break
+
+        if blocked_user_ids:
+            await user_service.set_bot_blocked_many(blocked_user_ids)
+            blocked_user_ids.clear()
+
+        return last_known_status != BroadcastStatus.CANCELED and not lock_lost
+
+    try:
+        # Messages created by a previous run that never got sent
+        async for messages in broadcast_service.iter_pending_messages(broadcast_id):
+            recipients = await broadcast_service.get_recipients([m.user_id for m in messages])
+            users = {u.telegram_id: u for u in recipients if not u.is_blocked}
+            skipped = [m for m in messages if m.user_id not in users]
+
+            for message in skipped:
+                message.status = BroadcastMessageStatus.FAILED
+
+            if skipped:
+                await broadcast_service.bulk_update_messages(skipped)
+                lock_lost = not await broadcast_service.heartbeat(
+                    broadcast_id,
+                    lock_token,
+                    failed=len(skipped),
+                )
+                failed_count += len(skipped)
+
+                if lock_lost:
+                    break
+
+            pairs = [(users[m.user_id], m) for m in messages if m.user_id in users]
+            if not await send_page(pairs):
+                break
+        else:
+            async for users_page in broadcast_service.iter_audience_users(
+                broadcast.audience,
+                broadcast.plan_id,
+                after_id=broadcast.last_user_id,
+            ):
+                broadcast_messages = await broadcast_service.create_messages(
+                    broadcast_id,
+                    [
+                        BroadcastMessageDto(
+                            user_id=user.telegram_id,
+                            status=BroadcastMessageStatus.PENDING,
+                        )
+                        for user in users_page
+                    ],
+                    last_user_id=users_page[-1].id,
+                )
+                logger.debug(
+                    f"Created '{len(broadcast_messages)}' message DTOs "
+                    f"for broadcast '{broadcast_id}'"
+                )
+
+                if not await send_page(list(zip(users_page, broadcast_messages))):
+                    break
+
+    except Exception:
+        logger.exception(f"Failed to send broadcast '{broadcast_id}'")
+        broadcast.status = BroadcastStatus.ERROR
+        await broadcast_service.update(broadcast)
+        return
+
+    finally:
+        await broadcast_service.release_lock(broadcast_id, lock_token)
+
+    if lock_lost:
+        logger.warning(
+            f"Stopped broadcast '{broadcast_id}' after losing its lock "
+            f"(sent in this run: {success_count}, failed in this run: {failed_count})"
+        )
+        return
+
+    # NOTE: Counters are already incremented per batch, only the final status is written
     broadcast.status = (
         BroadcastStatus.CANCELED
         if last_known_status == BroadcastStatus.CANCELED
@@ -102,16 +228,33 @@ async def send_broadcast_task(
     total_elapsed = loop.time() - start_time
     logger.info(
         f"Finished broadcast '{broadcast_id}' in {total_elapsed:.2f}s "
-        f"(sent: {broadcast.success_count}, failed: {broadcast.failed_count})"
+        f"(sent in this run: {success_count}, failed in this run: {failed_count})"
     )
 
 
+@broker.task(schedule=[{"cron": "*/5 * * * *"}])
+@inject
+async def resume_broadcasts_task(broadcast_service: FromDishka[BroadcastService]) -> None:
+    broadcasts = await broadcast_service.claim_stale()
+
+    if not broadcasts:
+        logger.debug("No stale broadcasts found to resume")
+        return
+
+    for broadcast in broadcasts:
+        logger.warning(
+            f"Resuming stale broadcast '{broadcast.id}' from user '{broadcast.last_user_id}'"
+        )
+        await send_broadcast_task.kiq(broadcast)
+
+
 @broker.task
 @inject
 async def delete_broadcast_task(
     broadcast: BroadcastDto,
     bot: FromDishka[Bot],
     broadcast_service: FromDishka[BroadcastService],
+    rate_limiter: FromDishka[TelegramRateLimiter],
 ) -> tuple[int, int, int]:
     broadcast_id = cast(int, broadcast.id)
     logger.info(f"Started deleting messages for broadcast '{broadcast_id}'")
@@ -136,17 +279,25 @@ async def delete_broadcast_task(
             logger.warning(f"Skipping deletion for user '{user_id}'. No 'message_id'")
             return message
 
-        try:
-            deleted = await bot.delete_message(chat_id=user_id, message_id=message_id)
-            if deleted:
-                message.status = BroadcastMessageStatus.DELETED
-            else:
-                logger.debug(f"Deletion FAILED for user '{user_id}'. ID: '{message_id}'")
-        except Exception:
-            logger.exception(f"Exception deleting message for user '{user_id}'. ID: '{message_id}'")
+        for _ in range(BROADCAST_MAX_ATTEMPTS):
+            try:
+                await rate_limiter.acquire(chat_id=user_id, priority=SendPriority.BULK)
+                deleted = await bot.delete_message(chat_id=user_id, message_id=message_id)
+                if deleted:
+                    message.status = BroadcastMessageStatus.DELETED
+                else:
+                    logger.debug(f"Deletion FAILED for user '{user_id}'. ID: '{message_id}'")
+            except TelegramRetryAfter as exception:
+                await rate_limiter.pause(exception.retry_after)
+                continue
+            except Exception:
+                logger.exception(
+                    f"Exception deleting message for user '{user_id}'. ID: '{message_id}'"
+                )
+            break
         return message
 
-    for i, batch in enumerate(chunked(broadcast.messages, 20), start=1):
+    for i, batch in enumerate(chunked(broadcast.messages, BROADCAST_BATCH_SIZE), start=1):
         batch_start = loop.time()
         tasks = [delete_message(m) for m in batch]
         results = await asyncio.gather(*tasks)
@@ -158,10 +309,6 @@ async def delete_broadcast_task(
         batch_elapsed = loop.time() - batch_start
         logger.info(f"Batch {i}: processed {len(batch)} messages in {batch_elapsed:.2f}s")
 
-        wait_time = 1.0 - batch_elapsed
-        if wait_time > 0:
-            await asyncio.sleep(wait_time)
-
     total_elapsed = loop.time() - start_time
     logger.info(
         f"Deletion finished for broadcast '{broadcast_id}'. "
@@ -1,3 +1,5 @@
+import asyncio
+from typing import Optional
 from uuid import UUID
 
 from dishka.integrations.taskiq import FromDishka, inject
@@ -6,11 +8,13 @@ from remnapy import RemnawaveSDK
 from remnapy.exceptions import BadRequestError
 from remnapy.models import CreateUserRequestDto, UserResponseDto
 
+from src.core.config import AppConfig
+from src.core.constants import REMNAWAVE_SYNC_CONCURRENCY, REMNAWAVE_SYNC_PAGE_SIZE
 from src.core.storage.keys import SyncRunningKey
+from src.core.utils.time import datetime_now
 from src.infrastructure.redis.repository import RedisRepository
 from src.infrastructure.taskiq.broker import broker
 from src.services.remnawave import RemnawaveService
-from src.services.subscription import SubscriptionService
 from src.services.user import UserService
 
 
@@ -52,77 +56,126 @@ async def sync_all_users_from_panel_task(
     remnawave: FromDishka[RemnawaveSDK],
     remnawave_service: FromDishka[RemnawaveService],
     user_service: FromDishka[UserService],
-    subscription_service: FromDishka[SubscriptionService],
 ) -> dict[str, int]:
     key = SyncRunningKey()
-    all_remna_users: list[UserResponseDto] = []
-    start = 0
-    size = 50
 
-    stats = await remnawave.system.get_stats()
-    total_users = stats.users.total_users
+    try:
+        result, _ = await _sync_users_from_panel(remnawave, remnawave_service, incremental=False)
+        result["total_bot_users"] = await user_service.count()
+
+        logger.info(f"Sync users summary: '{result}'")
+        return result
+    finally:
+        await redis_repository.delete(key)
+
+
+@broker.task(schedule=[{"cron": "*/10 * * * *"}], retry_on_error=False)
+@inject
+async def reconcile_users_from_panel_task(
+    config: FromDishka[AppConfig],
+    redis_repository: FromDishka[RedisRepository],
+    remnawave: FromDishka[RemnawaveSDK],
+    remnawave_service: FromDishka[RemnawaveService],
+) -> None:
+    key = SyncRunningKey()
 
-    for start in range(0, total_users, size):
-        response = await remnawave.users.get_all_users(start=start, size=size)
-        if not response.users:
-            break
+    if not await redis_repository.set(key, value=True, ex=3600, nx=True):
+        logger.info("Users sync is already running, skipping reconciliation")
+        return
 
-        all_remna_users.extend(response.users)
-        start += len(response.users)
+    try:
+        started_at = datetime_now()
+        result, remna_ids = await _sync_users_from_panel(
+            remnawave,
+            remnawave_service,
+            incremental=True,
+        )
+
+        # NOTE: Offset paging skips users when the panel changes mid-run,
+        # so only a clean pass over a stable panel may delete anything
+        stats = await remnawave.system.get_stats()
+        if not config.remnawave.reconcile_delete:
+            logger.debug("Deleting missing subscriptions is disabled, keeping missing")
+        elif result["errors"] or stats.users.total_users != result["total_panel_users"]:
+            logger.warning("Panel changed or sync failed during reconciliation, keeping missing")
+        else:
+            result["deleted"] = await remnawave_service.delete_missing_subscriptions(
+                remna_ids,
+                updated_before=started_at,
+            )
+
+        logger.info(f"Reconcile users summary: '{result}'")
+    finally:
+        await redis_repository.delete(key)
 
-        if len(response.users) < size:
-            break
 
-    bot_users = await user_service.get_all()
-    bot_users_map = {user.telegram_id: user for user in bot_users}
+async def _sync_users_from_panel(
+    remnawave: RemnawaveSDK,
+    remnawave_service: RemnawaveService,
+    incremental: bool,
+) -> tuple[dict[str, int], set[UUID]]:
+    result = {
+        "total_panel_users": 0,
+        "total_bot_users": 0,
+        "added_users": 0,
+        "added_subscription": 0,
+        "updated": 0,
+        "unchanged": 0,
+        "deleted": 0,
+        "errors": 0,
+        "missing_telegram": 0,
+    }
+    remna_ids: set[UUID] = set()
 
-    logger.info(f"Total users in panel: '{len(all_remna_users)}'")
-    logger.info(f"Total users in bot: '{len(bot_users)}'")
+    stats = await remnawave.system.get_stats()
+    total_users = stats.users.total_users
+    logger.info(f"Total users in panel: '{total_users}'")
+
+    # NOTE: Pages are fetched concurrently but written one at a time,
+    # the unit of work of this task must not be shared between coroutines
+    starts = iter(range(0, total_users, REMNAWAVE_SYNC_PAGE_SIZE))
+    pages: asyncio.Queue[Optional[list[UserResponseDto]]] = asyncio.Queue(
+        maxsize=REMNAWAVE_SYNC_CONCURRENCY
+    )
+
+    async def fetch_pages() -> None:
+        for start in starts:
+            response = await remnawave.users.get_all_users(
+                start=start,
+                size=REMNAWAVE_SYNC_PAGE_SIZE,
+            )
+            await pages.put(response.users)
+
+    async def produce() -> None:
+        try:
+            async with asyncio.TaskGroup() as task_group:
+                for _ in range(REMNAWAVE_SYNC_CONCURRENCY):
+                    task_group.create_task(fetch_pages())
+        finally:
+            await pages.put(None)
 
-    added_users = 0
-    added_subscription = 0
-    updated = 0
-    errors = 0
-    missing_telegram = 0
+    producer = asyncio.create_task(produce())
 
     try:
-        for remna_user in all_remna_users:
-            try:
-                if not remna_user.telegram_id:
-                    missing_telegram += 1
-                    continue
-
-                user = bot_users_map.get(remna_user.telegram_id)
-
-                if not user:
-                    await remnawave_service.sync_user(remna_user)
-                    added_users += 1
-                else:
-                    current_subscription = await subscription_service.get_current(user.telegram_id)
-                    if not current_subscription:
-                        await remnawave_service.sync_user(remna_user)
-                        added_subscription += 1
-                    else:
-                        await remnawave_service.sync_user(remna_user)
-                        updated += 1
+        while (page := await pages.get()) is not None:
+            result["total_panel_users"] += len(page)
+            remna_ids.update(remna_user.uuid for remna_user in page)
 
+            try:
+                page_result = await remnawave_service.sync_users(page, incremental)
             except Exception as exception:
-                logger.exception(
-                    f"Error syncing RemnaUser '{remna_user.telegram_id}' exception: {exception}"
+                logger.exception(f"Error syncing page of '{len(page)}' users: {exception}")
+                result["errors"] += sum(1 for remna_user in page if remna_user.telegram_id)
+                result["missing_telegram"] += sum(
+                    1 for remna_user in page if not remna_user.telegram_id
                 )
-                errors += 1
-
-        result = {
-            "total_panel_users": len(all_remna_users),
-            "total_bot_users": len(bot_users),
-            "added_users": added_users,
-            "added_subscription": added_subscription,
-            "updated": updated,
-            "errors": errors,
-            "missing_telegram": missing_telegram,
-        }
+                continue
 
-        logger.info(f"Sync users summary: '{result}'")
-        return result
+            for name, value in page_result.items():
+                result[name] += value
+
+        await producer
     finally:
-        await redis_repository.delete(key)
+        producer.cancel()
+
+    return result, remna_ids
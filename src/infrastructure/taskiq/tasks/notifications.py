@@ -1,12 +1,9 @@
-import asyncio
 from typing import Any, Union, cast
 
 from dishka.integrations.taskiq import FromDishka, inject
 
 from src.bot.keyboards import get_buy_keyboard, get_renew_keyboard
-from src.core.constants import BATCH_DELAY, BATCH_SIZE
-from src.core.enums import UserNotificationType
-from src.core.utils.iterables import chunked
+from src.core.enums import SendPriority, UserNotificationType
 from src.core.utils.message_payload import MessagePayload
 from src.core.utils.types import RemnaUserDto
 from src.infrastructure.taskiq.broker import broker
@@ -36,18 +33,17 @@ async def send_access_opened_notifications_task(
     user_service: FromDishka[UserService],
     notification_service: FromDishka[NotificationService],
 ) -> None:
-    for batch in chunked(waiting_user_ids, BATCH_SIZE):
-        for user_telegram_id in batch:
-            user = await user_service.get(user_telegram_id)
-            await notification_service.notify_user(
-                user=user,
-                payload=MessagePayload(
-                    i18n_key="ntf-access-allowed",
-                    auto_delete_after=None,
-                    add_close_button=True,
-                ),
-            )
-        await asyncio.sleep(BATCH_DELAY)
+    for user_telegram_id in waiting_user_ids:
+        user = await user_service.get(user_telegram_id)
+        await notification_service.notify_user(
+            user=user,
+            payload=MessagePayload(
+                i18n_key="ntf-access-allowed",
+                auto_delete_after=None,
+                add_close_button=True,
+            ),
+            priority=SendPriority.BULK,
+        )
 
 
 @broker.task(retry_on_error=True)
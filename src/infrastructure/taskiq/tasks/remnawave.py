@@ -0,0 +1,69 @@
+from typing import cast
+
+from dishka.integrations.taskiq import FromDishka, inject
+from loguru import logger
+from redis.asyncio import Redis
+from remnapy.controllers import WebhookUtility
+from remnapy.models.webhook import NodeDto, UserDto, UserHwidDeviceEventDto, WebhookPayloadDto
+
+from src.core.constants import REMNAWAVE_USER_EVENT_TTL
+from src.core.storage.keys import RemnawaveUserEventsKey, RemnawaveUserEventsOwnerKey
+from src.core.utils import json_utils
+from src.infrastructure.redis import pop_event
+from src.infrastructure.taskiq.broker import broker
+from src.services.remnawave import RemnawaveService
+
+
+@broker.task(retry_on_error=False)
+@inject
+async def handle_remnawave_webhook_task(
+    body: str,
+    remnawave_service: FromDishka[RemnawaveService],
+) -> None:
+    await _handle_webhook(body, remnawave_service)
+
+
+@broker.task(retry_on_error=False)
+@inject
+async def handle_remnawave_user_events_task(
+    user_uuid: str,
+    redis_client: FromDishka[Redis],
+    remnawave_service: FromDishka[RemnawaveService],
+) -> None:
+    # NOTE: One consumer per user drains its events in order, so a stale modification
+    # can never be applied after a later deletion or status change
+    queue_key = RemnawaveUserEventsKey(uuid=user_uuid).pack()
+    owner_key = RemnawaveUserEventsOwnerKey(uuid=user_uuid).pack()
+
+    while item := await pop_event(redis_client, queue_key, owner_key, REMNAWAVE_USER_EVENT_TTL):
+        _, body = item.split("\n", 1)
+
+        try:
+            await _handle_webhook(body, remnawave_service)
+        except Exception:
+            # NOTE: The queue is still owned, hand the remaining events over to a new consumer
+            await handle_remnawave_user_events_task.kiq(user_uuid)
+            raise
+
+
+async def _handle_webhook(body: str, remnawave_service: RemnawaveService) -> None:
+    payload = WebhookPayloadDto.from_dict(json_utils.decode(body))
+
+    if WebhookUtility.is_user_event(payload.event):
+        user = cast(UserDto, WebhookUtility.get_typed_data(payload))
+        await remnawave_service.handle_user_event(payload.event, user)
+
+    elif WebhookUtility.is_user_hwid_devices_event(payload.event):
+        event = cast(UserHwidDeviceEventDto, WebhookUtility.get_typed_data(payload))
+        await remnawave_service.handle_device_event(
+            payload.event,
+            event.user,
+            event.hwid_user_device,
+        )
+
+    elif WebhookUtility.is_node_event(payload.event):
+        node = cast(NodeDto, WebhookUtility.get_typed_data(payload))
+        await remnawave_service.handle_node_event(payload.event, node)
+
+    else:
+        logger.warning(f"Unhandled Remnawave event type '{payload.event}'")
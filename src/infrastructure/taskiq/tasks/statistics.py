@@ -0,0 +1,29 @@
+from dishka.integrations.taskiq import FromDishka, inject
+from loguru import logger
+from redis.asyncio import Redis
+
+from src.core.constants import TIME_10M
+from src.core.storage.keys import StatisticsRollupLockKey
+from src.infrastructure.redis import acquire_lock, release_lock
+from src.infrastructure.taskiq.broker import broker
+from src.services.statistics import StatisticsService
+
+
+@broker.task(schedule=[{"cron": "*/10 * * * *"}], retry_on_error=False)
+@inject
+async def refresh_statistics_rollups_task(
+    redis_client: FromDishka[Redis],
+    statistics_service: FromDishka[StatisticsService],
+) -> None:
+    # NOTE: Every worker also queues a refresh on startup, only one of them may rebuild
+    lock_key = StatisticsRollupLockKey().pack()
+    lock_token = await acquire_lock(redis_client, lock_key, TIME_10M)
+
+    if lock_token is None:
+        logger.info("Statistics rollups are already being refreshed, skipping")
+        return
+
+    try:
+        await statistics_service.refresh_rollups()
+    finally:
+        await release_lock(redis_client, lock_key, lock_token)
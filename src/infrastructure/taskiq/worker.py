@@ -1,5 +1,6 @@
 from dishka.integrations.aiogram import setup_dishka as setup_aiogram_dishka
 from dishka.integrations.taskiq import setup_dishka as setup_taskiq_dishka
+from taskiq import TaskiqEvents, TaskiqState
 from taskiq_redis import RedisStreamBroker
 
 from src.bot.dispatcher import create_bg_manager_factory, create_dispatcher, setup_dispatcher
@@ -8,6 +9,7 @@ from src.core.logger import setup_logger
 from src.infrastructure.di import create_container
 
 from .broker import broker
+from .tasks.statistics import refresh_statistics_rollups_task
 
 
 def worker() -> RedisStreamBroker:
@@ -22,4 +24,16 @@ def worker() -> RedisStreamBroker:
     setup_taskiq_dishka(container=container, broker=broker)
     setup_aiogram_dishka(container=container, router=dispatcher, auto_inject=True)
 
+    # NOTE: Releases APP-scoped resources such as the Remnawave and Redis clients
+    async def close_container(state: TaskiqState) -> None:
+        await container.close()
+
+    broker.add_event_handler(TaskiqEvents.WORKER_SHUTDOWN, close_container)
+
+    # NOTE: Statistics screens read only the rollups, fill them without waiting for the cron
+    async def refresh_statistics(state: TaskiqState) -> None:
+        await refresh_statistics_rollups_task.kiq()
+
+    broker.add_event_handler(TaskiqEvents.WORKER_STARTUP, refresh_statistics)
+
     return broker
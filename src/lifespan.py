@@ -10,13 +10,16 @@ from aiogram.utils.formatting import Text
 from dishka import AsyncContainer, Scope
 from fastapi import FastAPI
 from loguru import logger
+from redis.asyncio import Redis
 
 from src.__version__ import __version__
 from src.api.endpoints import TelegramWebhookEndpoint
 from src.core.constants import TIMEZONE_NAME
 from src.core.config.app import AppConfig
 from src.core.enums import SystemNotificationType
+from src.core.storage.keys import LegacyRecentActivityUsersKey
 from src.core.utils.message_payload import MessagePayload
+from src.infrastructure.redis import listen_cache_invalidation
 from src.infrastructure.taskiq.tasks.updates import check_bot_update
 from src.services.command import CommandService
 from src.services.notification import NotificationService
@@ -32,6 +35,10 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     telegram_webhook_endpoint: TelegramWebhookEndpoint = app.state.telegram_webhook_endpoint
     container: AsyncContainer = app.state.dishka_container
 
+    redis_client: Redis = await container.get(Redis)
+    cache_listener = asyncio.create_task(listen_cache_invalidation(redis_client))
+    await redis_client.delete(LegacyRecentActivityUsersKey().pack())
+
     async with container(scope=Scope.REQUEST) as startup_container:
         config: AppConfig = await startup_container.get(AppConfig)
         webhook_service: WebhookService = await startup_container.get(WebhookService)
@@ -136,6 +143,7 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
         )
 
     await telegram_webhook_endpoint.shutdown()
+    cache_listener.cancel()
     await command_service.delete()
     await webhook_service.delete()
 
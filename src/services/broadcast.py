@@ -1,24 +1,29 @@
-from typing import Optional
+from datetime import timedelta
+from typing import AsyncIterator, Optional, cast
 from uuid import UUID
 
 from aiogram import Bot
 from fluentogram import TranslatorHub
 from loguru import logger
 from redis.asyncio import Redis
-from sqlalchemy import and_
+from sqlalchemy import ColumnElement, and_
 
 from src.core.config import AppConfig
+from src.core.constants import BROADCAST_PAGE_SIZE, BROADCAST_STALE_TIMEOUT
 from src.core.enums import (
     BroadcastAudience,
+    BroadcastMessageStatus,
     BroadcastStatus,
     PlanAvailability,
     SubscriptionStatus,
 )
+from src.core.storage.keys import BroadcastLockKey
+from src.core.utils.time import datetime_now
 from src.infrastructure.database import UnitOfWork
 from src.infrastructure.database.models.dto import BroadcastDto, BroadcastMessageDto, UserDto
-from src.infrastructure.database.models.sql import Broadcast, BroadcastMessage, Subscription, User
+from src.infrastructure.database.models.sql import Broadcast, Subscription, User
 from src.infrastructure.database.models.sql.plan import Plan
-from src.infrastructure.redis import RedisRepository
+from src.infrastructure.redis import RedisRepository, acquire_lock, extend_lock, release_lock
 
 from .base import BaseService
 
@@ -52,18 +57,22 @@ class BroadcastService(BaseService):
         self,
         broadcast_id: int,
         messages: list[BroadcastMessageDto],
+        last_user_id: Optional[int] = None,
     ) -> list[BroadcastMessageDto]:
-        db_messages = [
-            BroadcastMessage(
-                broadcast_id=broadcast_id,
-                user_id=m.user_id,
-                status=m.status,
-            )
+        values = [
+            {"broadcast_id": broadcast_id, "user_id": m.user_id, "status": m.status}
             for m in messages
         ]
 
         async with self.uow:
-            db_created_messages = await self.uow.repository.broadcasts.create_messages(db_messages)
+            db_created_messages = await self.uow.repository.broadcasts.create_messages(values)
+
+            # NOTE: Checkpoint is committed together with the messages it covers
+            if last_user_id is not None:
+                await self.uow.repository.broadcasts.heartbeat(
+                    broadcast_id,
+                    last_user_id=last_user_id,
+                )
 
         return BroadcastMessageDto.from_model_list(db_created_messages)
 
@@ -121,9 +130,97 @@ class BroadcastService(BaseService):
 
     async def get_status(self, task_id: UUID) -> Optional[BroadcastStatus]:
         async with self.uow:
-            db_broadcast = await self.uow.repository.broadcasts.get(task_id)
+            return await self.uow.repository.broadcasts.get_status(task_id)
+
+    async def get_state(self, task_id: UUID) -> Optional[BroadcastDto]:
+        async with self.uow:
+            db_broadcast = await self.uow.repository.broadcasts.get_without_messages(task_id)
+
+        return BroadcastDto.from_model(db_broadcast)
+
+    async def heartbeat(
+        self,
+        broadcast_id: int,
+        lock_token: str,
+        success: int = 0,
+        failed: int = 0,
+    ) -> bool:
+        async with self.uow:
+            await self.uow.repository.broadcasts.heartbeat(
+                broadcast_id,
+                success=success,
+                failed=failed,
+            )
 
-        return db_broadcast.status if db_broadcast else None
+        # NOTE: Counters are still recorded, the messages were sent even if the lock was lost
+        extended = await extend_lock(
+            self.redis_client,
+            BroadcastLockKey(broadcast_id=broadcast_id).pack(),
+            lock_token,
+            BROADCAST_STALE_TIMEOUT,
+        )
+
+        if not extended:
+            logger.warning(f"Lock of broadcast '{broadcast_id}' was lost")
+
+        return extended
+
+    async def acquire_lock(self, broadcast_id: int) -> Optional[str]:
+        return await acquire_lock(
+            self.redis_client,
+            BroadcastLockKey(broadcast_id=broadcast_id).pack(),
+            BROADCAST_STALE_TIMEOUT,
+        )
+
+    async def release_lock(self, broadcast_id: int, lock_token: str) -> None:
+        await release_lock(
+            self.redis_client,
+            BroadcastLockKey(broadcast_id=broadcast_id).pack(),
+            lock_token,
+        )
+
+    async def claim_stale(self) -> list[BroadcastDto]:
+        heartbeat_before = datetime_now() - timedelta(seconds=BROADCAST_STALE_TIMEOUT)
+
+        async with self.uow:
+            db_broadcasts = await self.uow.repository.broadcasts.claim_stale(heartbeat_before)
+
+        if db_broadcasts:
+            logger.info(f"Claimed '{len(db_broadcasts)}' stale broadcasts for resume")
+
+        return BroadcastDto.from_model_list(db_broadcasts)
+
+    async def iter_pending_messages(
+        self,
+        broadcast_id: int,
+        page_size: int = BROADCAST_PAGE_SIZE,
+    ) -> AsyncIterator[list[BroadcastMessageDto]]:
+        after_id = 0
+
+        while True:
+            async with self.uow:
+                db_messages = await self.uow.repository.broadcasts.get_messages_page(
+                    broadcast_id,
+                    status=BroadcastMessageStatus.PENDING,
+                    after_id=after_id,
+                    limit=page_size,
+                )
+
+            if not db_messages:
+                return
+
+            yield BroadcastMessageDto.from_model_list(db_messages)
+
+            if len(db_messages) < page_size:
+                return
+
+            after_id = db_messages[-1].id
+
+    async def get_recipients(self, telegram_ids: list[int]) -> list[UserDto]:
+        async with self.uow:
+            db_users = await self.uow.repository.users.get_by_ids(telegram_ids)
+
+        return UserDto.from_model_list(db_users)
 
     #
 
@@ -134,25 +231,7 @@ class BroadcastService(BaseService):
     ) -> int:
         logger.debug(f"Counting audience '{audience}' for plan '{plan_id}'")
 
-        is_not_block = and_(
-            User.is_blocked.is_(False),
-            User.is_bot_blocked.is_(False),
-        )
-
-        if audience == BroadcastAudience.PLAN:
-            if plan_id:
-                async with self.uow:
-                    db_subs = await self.uow.repository.subscriptions.filter_by_plan_id(plan_id)
-
-                active_subs = [
-                    s
-                    for s in db_subs
-                    if s.status == SubscriptionStatus.ACTIVE
-                    and not s.user.is_blocked
-                    and not s.user.is_bot_blocked
-                ]
-                return len(active_subs)
-
+        if audience == BroadcastAudience.PLAN and not plan_id:
             async with self.uow:
                 count = await self.uow.repository.plans._count(
                     Plan,
@@ -162,136 +241,98 @@ class BroadcastService(BaseService):
             logger.debug(f"Audience count for '{audience}' (plan={plan_id}) is '{count}'")
             return count
 
-        if audience == BroadcastAudience.ALL:
-            async with self.uow:
-                result = await self.uow.repository.users._count(User, is_not_block)
-            return result
-
-        if audience == BroadcastAudience.SUBSCRIBED:
-            conditions = and_(
-                is_not_block,
-                User.current_subscription.has(Subscription.status == SubscriptionStatus.ACTIVE),
-            )
-
-            async with self.uow:
-                result = await self.uow.repository.users._count(User, conditions)
+        conditions = self._get_audience_conditions(audience, plan_id)
 
-            return result
+        async with self.uow:
+            count = await self.uow.repository.users._count(User, *conditions)
 
-        if audience == BroadcastAudience.UNSUBSCRIBED:
-            conditions = and_(
-                is_not_block,
-                User.current_subscription_id.is_(None),
-            )
+        logger.debug(f"Audience count for '{audience}' (plan={plan_id}) is '{count}'")
+        return count
 
-            async with self.uow:
-                result = await self.uow.repository.users._count(User, conditions)
-            return result
+    async def get_audience_users_page(
+        self,
+        audience: BroadcastAudience,
+        plan_id: Optional[int] = None,
+        after_id: int = 0,
+        limit: int = BROADCAST_PAGE_SIZE,
+    ) -> list[UserDto]:
+        conditions = self._get_audience_conditions(audience, plan_id)
 
-        if audience == BroadcastAudience.EXPIRED:
-            conditions = and_(
-                is_not_block,
-                User.current_subscription.has(Subscription.status == SubscriptionStatus.EXPIRED),
+        async with self.uow:
+            db_users = await self.uow.repository.users.get_page_after(
+                *conditions,
+                after_id=after_id,
+                limit=limit,
             )
 
-            async with self.uow:
-                result = await self.uow.repository.users._count(User, conditions)
-
-            return result
+        logger.debug(
+            f"Retrieved '{len(db_users)}' users for audience '{audience}' "
+            f"(plan={plan_id}) after id '{after_id}'"
+        )
+        return UserDto.from_model_list(db_users)
 
-        if audience == BroadcastAudience.TRIAL:
-            conditions = and_(
-                is_not_block,
-                User.current_subscription.has(Subscription.is_trial.is_(True)),
-            )
+    async def iter_audience_users(
+        self,
+        audience: BroadcastAudience,
+        plan_id: Optional[int] = None,
+        after_id: int = 0,
+        page_size: int = BROADCAST_PAGE_SIZE,
+    ) -> AsyncIterator[list[UserDto]]:
+        while True:
+            users = await self.get_audience_users_page(audience, plan_id, after_id, page_size)
+            if not users:
+                return
 
-            async with self.uow:
-                result = await self.uow.repository.users._count(User, conditions)
+            yield users
 
-            return result
+            if len(users) < page_size:
+                return
 
-        raise Exception(f"Unknown broadcast audience: {audience}")
+            after_id = cast(int, users[-1].id)
 
-    async def get_audience_users(
+    def _get_audience_conditions(
         self,
         audience: BroadcastAudience,
         plan_id: Optional[int] = None,
-    ) -> list[UserDto]:
-        logger.debug(f"Retrieving users for audience '{audience}', plan_id: {plan_id}")
-
+    ) -> list[ColumnElement[bool]]:
         is_not_block = and_(
             User.is_blocked.is_(False),
             User.is_bot_blocked.is_(False),
         )
 
         if audience == BroadcastAudience.PLAN and plan_id:
-            async with self.uow:
-                db_subscriptions = await self.uow.repository.subscriptions.filter_by_plan_id(
-                    plan_id
-                )
-
-            active_subs = [
-                s
-                for s in db_subscriptions
-                if s.status == SubscriptionStatus.ACTIVE
-                and not s.user.is_blocked
-                and not s.user.is_bot_blocked
+            return [
+                is_not_block,
+                User.subscriptions.any(
+                    and_(
+                        Subscription.plan["id"].as_integer() == plan_id,
+                        Subscription.status == SubscriptionStatus.ACTIVE,
+                    )
+                ),
             ]
-            user_ids = [sub.user_telegram_id for sub in active_subs]
-
-            async with self.uow:
-                db_users = await self.uow.repository.users.get_by_ids(telegram_ids=user_ids)
-
-            logger.debug(
-                f"Retrieved '{len(db_users)}' users for audience '{audience}' (plan={plan_id})"
-            )
-            return UserDto.from_model_list(db_users)
 
         if audience == BroadcastAudience.ALL:
-            async with self.uow:
-                db_users = await self.uow.repository.users._get_many(User, is_not_block)
-
-            return UserDto.from_model_list(db_users)
+            return [is_not_block]
 
         if audience == BroadcastAudience.SUBSCRIBED:
-            conditions = and_(
+            return [
                 is_not_block,
                 User.current_subscription.has(Subscription.status == SubscriptionStatus.ACTIVE),
-            )
-
-            async with self.uow:
-                db_users = await self.uow.repository.users._get_many(User, conditions)
-
-            return UserDto.from_model_list(db_users)
+            ]
 
         if audience == BroadcastAudience.UNSUBSCRIBED:
-            conditions = and_(is_not_block, User.current_subscription_id.is_(None))
-
-            async with self.uow:
-                db_users = await self.uow.repository.users._get_many(User, conditions)
-
-            return UserDto.from_model_list(db_users)
+            return [is_not_block, User.current_subscription_id.is_(None)]
 
         if audience == BroadcastAudience.EXPIRED:
-            conditions = and_(
+            return [
                 is_not_block,
                 User.current_subscription.has(Subscription.status == SubscriptionStatus.EXPIRED),
-            )
-
-            async with self.uow:
-                db_users = await self.uow.repository.users._get_many(User, conditions)
-
-            return UserDto.from_model_list(db_users)
+            ]
 
         if audience == BroadcastAudience.TRIAL:
-            conditions = and_(
+            return [
                 is_not_block,
                 User.current_subscription.has(Subscription.is_trial.is_(True)),
-            )
-
-            async with self.uow:
-                db_users = await self.uow.repository.users._get_many(User, conditions)
-
-            return UserDto.from_model_list(db_users)
+            ]
 
         raise Exception(f"Unknown broadcast audience: {audience}")
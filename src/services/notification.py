@@ -3,7 +3,7 @@ import uuid
 from typing import Any, Optional, Union, cast
 
 from aiogram import Bot
-from aiogram.exceptions import TelegramForbiddenError
+from aiogram.exceptions import TelegramForbiddenError, TelegramRetryAfter
 from aiogram.types import (
     BufferedInputFile,
     InlineKeyboardButton,
@@ -25,6 +25,7 @@ from src.core.enums import (
     Locale,
     MediaType,
     MessageEffect,
+    SendPriority,
     SystemNotificationType,
     UserNotificationType,
     UserRole,
@@ -35,7 +36,7 @@ from src.core.utils.message_payload import MessagePayload
 from src.core.utils.types import AnyKeyboard
 from src.infrastructure.database.models.dto import UserDto
 from src.infrastructure.database.models.dto.user import BaseUserDto
-from src.infrastructure.redis.repository import RedisRepository
+from src.infrastructure.redis import RedisRepository, TelegramRateLimiter
 from src.services.settings import SettingsService
 
 from .base import BaseService
@@ -45,6 +46,7 @@ from .user import UserService
 class NotificationService(BaseService):
     user_service: UserService
     settings_service: SettingsService
+    rate_limiter: TelegramRateLimiter
 
     def __init__(
         self,
@@ -56,16 +58,20 @@ class NotificationService(BaseService):
         #
         user_service: UserService,
         settings_service: SettingsService,
+        rate_limiter: TelegramRateLimiter,
     ) -> None:
         super().__init__(config, bot, redis_client, redis_repository, translator_hub)
         self.user_service = user_service
         self.settings_service = settings_service
+        self.rate_limiter = rate_limiter
 
     async def notify_user(
         self,
         user: Optional[BaseUserDto],
         payload: MessagePayload,
         ntf_type: Optional[UserNotificationType] = None,
+        priority: SendPriority = SendPriority.INTERACTIVE,
+        raise_forbidden: bool = False,
     ) -> Optional[Message]:
         if not user:
             logger.warning("Skipping user notification: user object is empty")
@@ -82,7 +88,7 @@ class NotificationService(BaseService):
             f"Attempting to send user notification '{payload.i18n_key}' to '{user.telegram_id}'"
         )
 
-        return await self._send_message(user, payload)
+        return await self._send_message(user, payload, priority, raise_forbidden)
 
     async def system_notify(
         self,
@@ -151,7 +157,13 @@ class NotificationService(BaseService):
 
     #
 
-    async def _send_message(self, user: BaseUserDto, payload: MessagePayload) -> Optional[Message]:
+    async def _send_message(
+        self,
+        user: BaseUserDto,
+        payload: MessagePayload,
+        priority: SendPriority = SendPriority.INTERACTIVE,
+        raise_forbidden: bool = False,
+    ) -> Optional[Message]:
         reply_markup = self._prepare_reply_markup(
             payload.reply_markup,
             payload.add_close_button,
@@ -159,6 +171,8 @@ class NotificationService(BaseService):
             user.language,
             user.telegram_id,
         )
+        await self.rate_limiter.acquire(chat_id=user.telegram_id, priority=priority)
+
         try:
             if (payload.media or payload.media_id) and payload.media_type:
                 sent_message = await self._send_media_message(user, payload, reply_markup)
@@ -181,7 +195,14 @@ class NotificationService(BaseService):
 
             return sent_message
 
+        except TelegramRetryAfter as exception:
+            await self.rate_limiter.pause(exception.retry_after)
+            raise
+
         except TelegramForbiddenError as exception:
+            if raise_forbidden:
+                raise
+
             logger.exception(
                 f"Failed to send notification '{payload.i18n_key}' "
                 f"to '{user.telegram_id}': {exception}"
@@ -1,5 +1,5 @@
-from datetime import timedelta
-from typing import Optional, cast
+from datetime import datetime, timedelta
+from typing import Optional, Sequence, cast
 from uuid import UUID
 
 from aiogram import Bot
@@ -11,18 +11,28 @@ from remnapy.exceptions import ConflictError, NotFoundError
 from remnapy.models import (
     CreateUserRequestDto,
     CreateUserResponseDto,
+    ExternalSquadDto,
     GetStatsResponseDto,
+    HostResponseDto,
     HWIDDeleteRequest,
     HwidUserDeviceDto,
     UpdateUserRequestDto,
     UserResponseDto,
 )
 from remnapy.models.hwid import HwidDeviceDto
+from remnapy.models.internal_squads import InternalSquadDto
+from remnapy.models.nodes import NodeResponseDto
 from remnapy.models.webhook import NodeDto
 
 from src.bot.keyboards import get_user_keyboard
 from src.core.config import AppConfig
-from src.core.constants import DATETIME_FORMAT, IMPORTED_TAG
+from src.core.constants import (
+    DATETIME_FORMAT,
+    IMPORTED_TAG,
+    REMNAWAVE_USER_CACHE_TTL,
+    TIME_1M,
+    TIME_5M,
+)
 from src.core.enums import (
     RemnaNodeEvent,
     RemnaUserEvent,
@@ -32,6 +42,7 @@ from src.core.enums import (
     UserNotificationType,
 )
 from src.core.i18n.keys import ByteUnitKey
+from src.core.storage.key_builder import build_key
 from src.core.utils.formatters import (
     format_country_code,
     format_days_to_datetime,
@@ -52,7 +63,7 @@ from src.infrastructure.database.models.dto import (
     SubscriptionDto,
     UserDto,
 )
-from src.infrastructure.redis import RedisRepository
+from src.infrastructure.redis import RedisRepository, invalidate_cache, redis_cache
 from src.infrastructure.taskiq.tasks.notifications import (
     send_subscription_expire_notification_task,
     send_subscription_limited_notification_task,
@@ -158,6 +169,7 @@ class RemnawaveService(BaseService):
             await self.remnawave.users.delete_user(old_remna_user.uuid)
             created = await _do_create()
 
+        await self.clear_user_cache(created.uuid, user.telegram_id)
         logger.info(f"RemnaUser '{created.username}' created successfully")
         return created
 
@@ -219,6 +231,7 @@ class RemnawaveService(BaseService):
             await self.remnawave.users.reset_user_traffic(uuid)
             logger.info(f"Traffic reset for RemnaUser '{user.telegram_id}'")
 
+        await self.clear_user_cache(uuid, user.telegram_id)
         logger.info(f"RemnaUser '{user.telegram_id}' updated successfully")
         return updated_user
 
@@ -240,6 +253,7 @@ class RemnawaveService(BaseService):
             uuid = user.current_subscription.user_remna_id
 
         result = await self.remnawave.users.delete_user(uuid)
+        await self.clear_user_cache(uuid, user.telegram_id)
 
         if result.is_deleted:
             logger.info(f"RemnaUser '{user.telegram_id}' deleted successfully")
@@ -255,15 +269,20 @@ class RemnawaveService(BaseService):
             logger.warning(f"No subscription found for user '{user.telegram_id}'")
             return []
 
-        result = await self.remnawave.hwid.get_hwid_user(user.current_subscription.user_remna_id)
+        devices = await self.get_devices(user.current_subscription.user_remna_id)
 
-        if result.total:
-            logger.info(f"Found '{result.total}' device(s) for RemnaUser '{user.telegram_id}'")
-            return result.devices
+        if devices:
+            logger.info(f"Found '{len(devices)}' device(s) for RemnaUser '{user.telegram_id}'")
+            return devices
 
         logger.info(f"No devices found for RemnaUser '{user.telegram_id}'")
         return []
 
+    @redis_cache(prefix="remnawave_devices", ttl=REMNAWAVE_USER_CACHE_TTL)
+    async def get_devices(self, uuid: UUID) -> list[HwidDeviceDto]:
+        result = await self.remnawave.hwid.get_hwid_user(uuid)
+        return result.devices
+
     async def delete_device(self, user: UserDto, hwid: str) -> Optional[int]:
         logger.info(f"Deleting device '{hwid}' for RemnaUser '{user.telegram_id}'")
 
@@ -278,9 +297,11 @@ class RemnawaveService(BaseService):
             )
         )
 
+        await self.clear_user_cache(user.current_subscription.user_remna_id)
         logger.info(f"Deleted device '{hwid}' for RemnaUser '{user.telegram_id}'")
         return result.total
 
+    @redis_cache(prefix="remnawave_user", ttl=REMNAWAVE_USER_CACHE_TTL)
     async def get_user(self, uuid: UUID) -> Optional[UserResponseDto]:
         logger.info(f"Fetching RemnaUser '{uuid}'")
         try:
@@ -292,6 +313,52 @@ class RemnawaveService(BaseService):
         logger.info(f"RemnaUser '{remna_user.telegram_id}' fetched successfully")
         return remna_user
 
+    @redis_cache(prefix="remnawave_users_by_telegram_id", ttl=REMNAWAVE_USER_CACHE_TTL)
+    async def get_users_by_telegram_id(self, telegram_id: int) -> list[UserResponseDto]:
+        try:
+            result = await self.remnawave.users.get_users_by_telegram_id(
+                telegram_id=str(telegram_id)
+            )
+        except NotFoundError:
+            return []
+
+        return result.root
+
+    @redis_cache(prefix="remnawave_internal_squads", ttl=TIME_5M)
+    async def get_internal_squads(self) -> list[InternalSquadDto]:
+        result = await self.remnawave.internal_squads.get_internal_squads()
+        return result.internal_squads
+
+    @redis_cache(prefix="remnawave_external_squads", ttl=TIME_5M)
+    async def get_external_squads(self) -> list[ExternalSquadDto]:
+        result = await self.remnawave.external_squads.get_external_squads()
+        return result.external_squads
+
+    @redis_cache(prefix="remnawave_hosts", ttl=TIME_5M)
+    async def get_hosts(self) -> list[HostResponseDto]:
+        result = await self.remnawave.hosts.get_all_hosts()
+        return result.root
+
+    @redis_cache(prefix="remnawave_nodes", ttl=TIME_1M)
+    async def get_nodes(self) -> list[NodeResponseDto]:
+        result = await self.remnawave.nodes.get_all_nodes()
+        return result.root
+
+    async def get_node(self, uuid: UUID) -> Optional[NodeResponseDto]:
+        return next((node for node in await self.get_nodes() if node.uuid == uuid), None)
+
+    async def clear_user_cache(self, uuid: UUID, telegram_id: Optional[int] = None) -> None:
+        keys = [
+            build_key("cache", "remnawave_user", uuid),
+            build_key("cache", "remnawave_devices", uuid),
+        ]
+
+        if telegram_id:
+            keys.append(build_key("cache", "remnawave_users_by_telegram_id", telegram_id))
+
+        await invalidate_cache(self.redis_client, *keys)
+        logger.debug(f"Remnawave cache for RemnaUser '{uuid}' invalidated")
+
     async def get_subscription_url(self, uuid: UUID) -> Optional[str]:
         remna_user = await self.get_user(uuid)
 
@@ -322,39 +389,7 @@ class RemnawaveService(BaseService):
         if not subscription:
             logger.info(f"No subscription found for '{user.telegram_id}', creating")
 
-            temp_plan = PlanSnapshotDto(
-                id=-1,
-                name=IMPORTED_TAG,
-                tag=remna_subscription.tag,
-                type=format_limits_to_plan_type(
-                    remna_subscription.traffic_limit,
-                    remna_subscription.device_limit,
-                ),
-                traffic_limit=remna_subscription.traffic_limit,
-                device_limit=remna_subscription.device_limit,
-                duration=-1,
-                traffic_limit_strategy=remna_subscription.traffic_limit_strategy,
-                internal_squads=remna_subscription.internal_squads,
-                external_squad=remna_subscription.external_squad,
-            )
-
-            expired = remna_user.expire_at and remna_user.expire_at < datetime_now()
-            status = SubscriptionStatus.EXPIRED if expired else remna_user.status
-
-            subscription = SubscriptionDto(
-                user_remna_id=remna_user.uuid,
-                status=status,
-                traffic_limit=temp_plan.traffic_limit,
-                device_limit=temp_plan.device_limit,
-                traffic_limit_strategy=temp_plan.traffic_limit_strategy,
-                tag=temp_plan.tag,
-                internal_squads=remna_subscription.internal_squads,
-                external_squad=remna_subscription.external_squad,
-                expire_at=remna_user.expire_at,
-                url=remna_subscription.url,
-                plan=temp_plan,
-            )
-
+            subscription = self._build_imported_subscription(remna_user, remna_subscription)
             await self.subscription_service.create(user, subscription)
             logger.info(f"Subscription created for '{user.telegram_id}'")
 
@@ -369,6 +404,128 @@ class RemnawaveService(BaseService):
 
         logger.info(f"Sync completed for user '{remna_user.telegram_id}'")
 
+    async def sync_users(
+        self,
+        remna_users: Sequence[RemnaUserDto],
+        incremental: bool = False,
+    ) -> dict[str, int]:
+        # NOTE: A telegram_id may own several panel users, the last one wins like in sync_user
+        remna_subscriptions = {
+            remna_user.telegram_id: (remna_user, RemnaSubscriptionDto.from_remna_user(remna_user))
+            for remna_user in remna_users
+            if remna_user.telegram_id
+        }
+        unchanged = 0
+
+        if incremental:
+            fingerprints = await self.subscription_service.get_current_fingerprints(
+                list(remna_subscriptions)
+            )
+            for telegram_id, (_, remna_subscription) in list(remna_subscriptions.items()):
+                if fingerprints.get(telegram_id) == remna_subscription.sync_fingerprint:
+                    del remna_subscriptions[telegram_id]
+                    unchanged += 1
+
+        telegram_ids = list(remna_subscriptions)
+        created_ids = set(await self.user_service.create_many_from_panel(telegram_ids))
+        current_subscriptions = await self.subscription_service.get_current_many(telegram_ids)
+
+        subscriptions_to_create: dict[int, SubscriptionDto] = {}
+        subscriptions_to_update: dict[int, SubscriptionDto] = {}
+
+        for telegram_id, (remna_user, remna_subscription) in remna_subscriptions.items():
+            subscription = current_subscriptions.get(telegram_id)
+
+            if not subscription:
+                subscriptions_to_create[telegram_id] = self._build_imported_subscription(
+                    remna_user,
+                    remna_subscription,
+                )
+            else:
+                subscriptions_to_update[telegram_id] = SubscriptionService.apply_sync(
+                    target=subscription,
+                    source=remna_subscription,
+                )
+
+        await self.subscription_service.create_many(subscriptions_to_create)
+        updated = await self.subscription_service.update_many(subscriptions_to_update)
+
+        return {
+            "added_users": len(created_ids),
+            "added_subscription": len(subscriptions_to_create.keys() - created_ids),
+            "updated": updated,
+            "unchanged": unchanged + len(subscriptions_to_update) - updated,
+            "missing_telegram": sum(1 for remna_user in remna_users if not remna_user.telegram_id),
+        }
+
+    async def delete_missing_subscriptions(
+        self,
+        remna_ids: set[UUID],
+        updated_before: datetime,
+    ) -> int:
+        # NOTE: Rows touched after the panel was read may belong to users it did not list yet
+        current_subscriptions = await self.subscription_service.get_current_remna_ids(
+            updated_before
+        )
+        missing: dict[int, int] = {}
+
+        for telegram_id, subscription_id, remna_id in current_subscriptions:
+            if remna_id in remna_ids:
+                continue
+
+            # NOTE: Offset paging may skip live users, so each one is confirmed with the panel
+            try:
+                await self.remnawave.users.get_user_by_uuid(str(remna_id))
+            except NotFoundError:
+                missing[telegram_id] = subscription_id
+                continue
+            except Exception as exception:
+                logger.warning(f"Failed to confirm RemnaUser '{remna_id}' is gone: {exception}")
+                continue
+
+            logger.debug(f"RemnaUser '{remna_id}' was skipped by the sync but still exists")
+
+        await self.subscription_service.delete_many(missing)
+        return len(missing)
+
+    @staticmethod
+    def _build_imported_subscription(
+        remna_user: RemnaUserDto,
+        remna_subscription: RemnaSubscriptionDto,
+    ) -> SubscriptionDto:
+        temp_plan = PlanSnapshotDto(
+            id=-1,
+            name=IMPORTED_TAG,
+            tag=remna_subscription.tag,
+            type=format_limits_to_plan_type(
+                remna_subscription.traffic_limit,
+                remna_subscription.device_limit,
+            ),
+            traffic_limit=remna_subscription.traffic_limit,
+            device_limit=remna_subscription.device_limit,
+            duration=-1,
+            traffic_limit_strategy=remna_subscription.traffic_limit_strategy,
+            internal_squads=remna_subscription.internal_squads,
+            external_squad=remna_subscription.external_squad,
+        )
+
+        expired = remna_user.expire_at and remna_user.expire_at < datetime_now()
+        status = SubscriptionStatus.EXPIRED if expired else remna_user.status
+
+        return SubscriptionDto(
+            user_remna_id=remna_user.uuid,
+            status=status,
+            traffic_limit=temp_plan.traffic_limit,
+            device_limit=temp_plan.device_limit,
+            traffic_limit_strategy=temp_plan.traffic_limit_strategy,
+            tag=temp_plan.tag,
+            internal_squads=remna_subscription.internal_squads,
+            external_squad=remna_subscription.external_squad,
+            expire_at=remna_user.expire_at,
+            url=remna_subscription.url,
+            plan=temp_plan,
+        )
+
     #
 
     async def handle_user_event(self, event: str, remna_user: RemnaUserDto) -> None:  # noqa: C901
@@ -378,6 +535,7 @@ class RemnawaveService(BaseService):
         )
 
         logger.info(f"Received event '{event}' for RemnaUser '{remna_user.telegram_id}'")
+        await self.clear_user_cache(remna_user.uuid, remna_user.telegram_id)
 
         if not remna_user.telegram_id:
             logger.debug(f"Skipping RemnaUser '{remna_user.username}': telegram_id is empty")
@@ -505,6 +663,7 @@ class RemnawaveService(BaseService):
         device: HwidUserDeviceDto,
     ) -> None:
         logger.info(f"Received device event '{event}' for RemnaUser '{remna_user.telegram_id}'")
+        await self.clear_user_cache(remna_user.uuid, remna_user.telegram_id)
 
         if not remna_user.telegram_id:
             logger.debug(f"Skipping RemnaUser '{remna_user.username}': telegram_id is empty")
@@ -550,6 +709,7 @@ class RemnawaveService(BaseService):
 
     async def handle_node_event(self, event: str, node: NodeDto) -> None:
         logger.info(f"Received node event '{event}' for node '{node.name}'")
+        await invalidate_cache(self.redis_client, build_key("cache", "remnawave_nodes"))
 
         if event == RemnaNodeEvent.CONNECTION_LOST:
             logger.warning(f"Connection lost for node '{node.name}'")
@@ -1,4 +1,4 @@
-from typing import Any
+from typing import Any, Optional
 
 from aiogram import Bot
 from fluentogram import TranslatorHub
@@ -6,7 +6,7 @@ from loguru import logger
 from redis.asyncio import Redis
 
 from src.core.config import AppConfig
-from src.core.constants import TIME_10M
+from src.core.constants import TIME_1M, TIME_10M
 from src.core.enums import AccessMode, Currency, SystemNotificationType, UserNotificationType
 from src.core.storage.key_builder import build_key
 from src.core.utils.types import AnyNotification
@@ -14,13 +14,14 @@ from src.infrastructure.database import UnitOfWork
 from src.infrastructure.database.models.dto import ReferralSettingsDto, SettingsDto
 from src.infrastructure.database.models.sql import Settings
 from src.infrastructure.redis import RedisRepository
-from src.infrastructure.redis.cache import redis_cache
+from src.infrastructure.redis.cache import invalidate_cache, redis_cache
 
 from .base import BaseService
 
 
 class SettingsService(BaseService):
     uow: UnitOfWork
+    _settings: Optional[SettingsDto]
 
     def __init__(
         self,
@@ -34,6 +35,7 @@ class SettingsService(BaseService):
     ) -> None:
         super().__init__(config, bot, redis_client, redis_repository, translator_hub)
         self.uow = uow
+        self._settings = None
 
     async def create(self) -> SettingsDto:
         settings = SettingsDto()
@@ -46,8 +48,15 @@ class SettingsService(BaseService):
         logger.info("Default settings created in DB")
         return SettingsDto.from_model(db_settings)  # type: ignore[return-value]
 
-    @redis_cache(prefix="get_settings", ttl=TIME_10M)
     async def get(self) -> SettingsDto:
+        # NOTE: The service is request-scoped, so settings are loaded once per update
+        if self._settings is None:
+            self._settings = await self._get()
+
+        return self._settings
+
+    @redis_cache(prefix="get_settings", ttl=TIME_10M, local_ttl=TIME_1M, stale_ttl=TIME_1M)
+    async def _get(self) -> SettingsDto:
         async with self.uow:
             db_settings = await self.uow.repository.settings.get()
 
@@ -186,5 +195,6 @@ class SettingsService(BaseService):
 
     async def _clear_cache(self) -> None:
         settings_cache_key: str = build_key("cache", "get_settings")
+        self._settings = None
+        await invalidate_cache(self.redis_client, settings_cache_key)
         logger.debug(f"Cache '{settings_cache_key}' cleared")
-        await self.redis_client.delete(settings_cache_key)
@@ -0,0 +1,114 @@
+from datetime import timedelta
+from typing import Any
+
+from aiogram import Bot
+from fluentogram import TranslatorHub
+from loguru import logger
+from redis.asyncio import Redis
+
+from src.core.config import AppConfig
+from src.core.constants import STATISTICS_ROLLUP_LOOKBACK_DAYS, TIME_1M, TIME_5M
+from src.core.storage.key_builder import build_key
+from src.core.utils.time import datetime_now
+from src.infrastructure.database import UnitOfWork
+from src.infrastructure.redis import RedisRepository, invalidate_cache, redis_cache
+
+from .base import BaseService
+
+
+class StatisticsService(BaseService):
+    uow: UnitOfWork
+
+    def __init__(
+        self,
+        config: AppConfig,
+        bot: Bot,
+        redis_client: Redis,
+        redis_repository: RedisRepository,
+        translator_hub: TranslatorHub,
+        #
+        uow: UnitOfWork,
+    ) -> None:
+        super().__init__(config, bot, redis_client, redis_repository, translator_hub)
+        self.uow = uow
+
+    async def refresh_rollups(self) -> None:
+        async with self.uow:
+            watermark = await self.uow.repository.statistics.get_rollup_watermark()
+            since = (
+                watermark - timedelta(days=STATISTICS_ROLLUP_LOOKBACK_DAYS) if watermark else None
+            )
+
+            await self.uow.repository.statistics.refresh_user_rollups(since)
+            await self.uow.repository.statistics.refresh_revenue_rollups(since)
+
+        logger.info(f"Refreshed daily statistics rollups since '{since or 'the beginning'}'")
+
+        # NOTE: Screens cached before the first rollup would keep showing empty totals
+        await invalidate_cache(
+            self.redis_client,
+            build_key("cache", "statistics_users"),
+            build_key("cache", "statistics_transactions"),
+        )
+
+    @redis_cache(prefix="statistics_users", ttl=TIME_1M, stale_ttl=TIME_5M)
+    async def get_users_statistics(self) -> dict[str, Any]:
+        async with self.uow:
+            summary = await self.uow.repository.statistics.get_users_summary()
+            registrations = await self.uow.repository.statistics.get_registrations(
+                datetime_now().date()
+            )
+            paying_users = await self.uow.repository.statistics.count_paying_users()
+            trial = await self.uow.repository.statistics.get_trial_conversion()
+
+        statistics = dict(summary._mapping) | dict(registrations._mapping)
+        statistics["paying_users"] = paying_users
+        statistics["trial_users"] = trial.trial_users
+        statistics["converted_from_trial"] = trial.converted
+
+        logger.debug("Calculated users statistics")
+        return statistics
+
+    @redis_cache(prefix="statistics_transactions", ttl=TIME_1M, stale_ttl=TIME_5M)
+    async def get_transactions_statistics(self) -> dict[str, Any]:
+        async with self.uow:
+            summary = await self.uow.repository.statistics.get_transactions_summary()
+            gateways = await self.uow.repository.statistics.get_income_by_gateway(
+                datetime_now().date()
+            )
+
+        statistics = dict(summary._mapping)
+        statistics["gateways"] = [dict(row._mapping) for row in gateways]
+
+        logger.debug("Calculated transactions statistics")
+        return statistics
+
+    @redis_cache(prefix="statistics_subscriptions", ttl=TIME_1M, stale_ttl=TIME_5M)
+    async def get_subscriptions_statistics(self) -> dict[str, Any]:
+        async with self.uow:
+            summary = await self.uow.repository.statistics.get_subscriptions_summary(datetime_now())
+
+        logger.debug("Calculated subscriptions statistics")
+        return dict(summary._mapping)
+
+    @redis_cache(prefix="statistics_plans", ttl=TIME_1M, stale_ttl=TIME_5M)
+    async def get_plans_statistics(self) -> dict[str, Any]:
+        async with self.uow:
+            subscriptions = await self.uow.repository.statistics.get_subscriptions_by_plan(
+                datetime_now()
+            )
+            income = await self.uow.repository.statistics.get_income_by_plan()
+
+        logger.debug("Calculated plans statistics")
+        return {
+            "subscriptions": [dict(row._mapping) for row in subscriptions],
+            "income": [dict(row._mapping) for row in income],
+        }
+
+    @redis_cache(prefix="statistics_promocodes", ttl=TIME_1M, stale_ttl=TIME_5M)
+    async def get_promocodes_statistics(self) -> list[dict[str, Any]]:
+        async with self.uow:
+            promocodes = await self.uow.repository.statistics.get_promocode_activations()
+
+        logger.debug("Calculated promocodes statistics")
+        return [dict(row._mapping) for row in promocodes]
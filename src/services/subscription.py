@@ -1,5 +1,6 @@
 from datetime import datetime, timedelta
-from typing import Optional, TypeVar, Union
+from typing import Any, Optional, TypeVar, Union
+from uuid import UUID
 
 from aiogram import Bot
 from fluentogram import TranslatorHub
@@ -23,7 +24,7 @@ from src.infrastructure.database.models.dto import (
 )
 from src.infrastructure.database.models.sql import Subscription
 from src.infrastructure.redis import RedisRepository
-from src.infrastructure.redis.cache import redis_cache
+from src.infrastructure.redis.cache import invalidate_cache, redis_cache
 from src.services.user import UserService
 
 from .base import BaseService
@@ -51,6 +52,7 @@ class SubscriptionService(BaseService):
         self.user_service = user_service
 
     async def create(self, user: UserDto, subscription: SubscriptionDto) -> SubscriptionDto:
+        subscription.refresh_sync_fingerprint()
         data = subscription.model_dump(exclude={"user"})
         data["plan"] = subscription.plan.model_dump(mode="json")
 
@@ -70,6 +72,30 @@ class SubscriptionService(BaseService):
         logger.info(f"Created subscription '{db_subscription.id}' for user '{user.telegram_id}'")
         return SubscriptionDto.from_model(db_created_subscription)  # type: ignore[return-value]
 
+    async def create_many(self, subscriptions: dict[int, SubscriptionDto]) -> list[SubscriptionDto]:
+        db_subscriptions: list[Subscription] = []
+
+        for telegram_id, subscription in subscriptions.items():
+            subscription.refresh_sync_fingerprint()
+            # NOTE: Generated columns are left unset so the database fills them
+            data = subscription.model_dump(exclude={"user", "id", "created_at", "updated_at"})
+            data["plan"] = subscription.plan.model_dump(mode="json")
+            db_subscriptions.append(Subscription(**data, user_telegram_id=telegram_id))
+
+        async with self.uow:
+            db_created_subscriptions = await self.uow.repository.subscriptions.create_many(
+                db_subscriptions
+            )
+            await self.uow.repository.users.set_current_subscriptions(
+                {s.user_telegram_id: s.id for s in db_created_subscriptions}
+            )
+
+        await self._clear_subscriptions_cache(
+            [(s.id, s.user_telegram_id) for s in db_created_subscriptions]
+        )
+        logger.info(f"Created '{len(db_created_subscriptions)}' subscriptions")
+        return SubscriptionDto.from_model_list(db_created_subscriptions)
+
     @redis_cache(prefix="get_subscription", ttl=TIME_5M)
     async def get(self, subscription_id: int) -> Optional[SubscriptionDto]:
         async with self.uow:
@@ -85,30 +111,46 @@ class SubscriptionService(BaseService):
     @redis_cache(prefix="get_current_subscription", ttl=TIME_1M)
     async def get_current(self, telegram_id: int) -> Optional[SubscriptionDto]:
         async with self.uow:
-            db_user = await self.uow.repository.users.get(telegram_id)
-
-            if not db_user or not db_user.current_subscription_id:
-                logger.debug(
-                    f"Current subscription check: User '{telegram_id}' has no active subscription"
-                )
-                return None
-
-            subscription_id = db_user.current_subscription_id
-            db_active_subscription = await self.uow.repository.subscriptions.get(subscription_id)
+            db_active_subscription = await self.uow.repository.subscriptions.get_current(
+                telegram_id
+            )
 
         if db_active_subscription:
             logger.debug(
-                f"Current subscription check: Subscription '{subscription_id}' "
+                f"Current subscription check: Subscription '{db_active_subscription.id}' "
                 f"retrieved for user '{telegram_id}'"
             )
         else:
-            logger.warning(
-                f"User '{telegram_id}' linked to subscription ID '{subscription_id}', "
-                f"but subscription object was not found"
+            logger.debug(
+                f"Current subscription check: User '{telegram_id}' has no active subscription"
             )
 
         return SubscriptionDto.from_model(db_active_subscription)
 
+    async def get_current_many(self, telegram_ids: list[int]) -> dict[int, SubscriptionDto]:
+        async with self.uow:
+            db_subscriptions = await self.uow.repository.subscriptions.get_current_many(
+                telegram_ids
+            )
+
+        logger.debug(f"Retrieved '{len(db_subscriptions)}' current subscriptions")
+        return {
+            subscription.user_telegram_id: SubscriptionDto.from_model(subscription)  # type: ignore[misc]
+            for subscription in db_subscriptions
+        }
+
+    async def get_current_fingerprints(self, telegram_ids: list[int]) -> dict[int, Optional[str]]:
+        async with self.uow:
+            rows = await self.uow.repository.subscriptions.get_current_fingerprints(telegram_ids)
+
+        return {row.telegram_id: row.sync_fingerprint for row in rows}
+
+    async def get_current_remna_ids(self, updated_before: datetime) -> list[tuple[int, int, UUID]]:
+        async with self.uow:
+            rows = await self.uow.repository.subscriptions.get_current_remna_ids(updated_before)
+
+        return [(row.telegram_id, row.id, row.user_remna_id) for row in rows]
+
     async def get_all_by_user(self, telegram_id: int) -> list[SubscriptionDto]:
         async with self.uow:
             db_subscriptions = await self.uow.repository.subscriptions.get_all_by_user(telegram_id)
@@ -124,6 +166,7 @@ class SubscriptionService(BaseService):
         return SubscriptionDto.from_model_list(db_subscriptions)
 
     async def update(self, subscription: SubscriptionDto) -> Optional[SubscriptionDto]:
+        subscription.refresh_sync_fingerprint()
         data = subscription.changed_data.copy()
 
         if subscription.plan.changed_data or "plan" in data:
@@ -150,6 +193,56 @@ class SubscriptionService(BaseService):
 
         return SubscriptionDto.from_model(db_updated_subscription)
 
+    async def update_many(self, subscriptions: dict[int, SubscriptionDto]) -> int:
+        values: list[dict[str, Any]] = []
+        updated: list[tuple[int, int]] = []
+
+        for telegram_id, subscription in subscriptions.items():
+            subscription.refresh_sync_fingerprint()
+            data = subscription.changed_data.copy()
+
+            if subscription.plan.changed_data or "plan" in data:
+                data["plan"] = subscription.plan.model_dump(mode="json")
+
+            if not data:
+                continue
+
+            values.append({"id": subscription.id, **data})
+            updated.append((subscription.id, telegram_id))  # type: ignore[arg-type]
+
+        if not values:
+            return 0
+
+        async with self.uow:
+            await self.uow.repository.subscriptions.update_many(values)
+
+        await self._clear_subscriptions_cache(updated)
+        logger.info(f"Updated '{len(values)}' subscriptions")
+        return len(values)
+
+    async def delete_many(self, subscriptions: dict[int, int]) -> None:
+        if not subscriptions:
+            return
+
+        async with self.uow:
+            await self.uow.repository.subscriptions.update_many(
+                [
+                    {"id": subscription_id, "status": SubscriptionStatus.DELETED}
+                    for subscription_id in subscriptions.values()
+                ]
+            )
+            await self.uow.repository.users.set_current_subscriptions(
+                dict.fromkeys(subscriptions, None)
+            )
+
+        await self._clear_subscriptions_cache(
+            [
+                (subscription_id, telegram_id)
+                for telegram_id, subscription_id in subscriptions.items()
+            ]
+        )
+        logger.info(f"Marked '{len(subscriptions)}' subscriptions as deleted")
+
     @redis_cache(prefix="has_used_trial", ttl=TIME_10M)
     async def has_used_trial(self, user_telegram_id: int) -> bool:
         conditions = and_(
@@ -173,6 +266,22 @@ class SubscriptionService(BaseService):
         await self.redis_client.delete(*list_cache_keys_to_invalidate)
         logger.debug(f"Cache for subscription '{subscription_id}' invalidated")
 
+    async def _clear_subscriptions_cache(self, subscriptions: list[tuple[int, int]]) -> None:
+        keys: list[str] = []
+
+        for subscription_id, user_telegram_id in subscriptions:
+            keys.extend(
+                (
+                    build_key("cache", "get_subscription", subscription_id),
+                    build_key("cache", "get_current_subscription", user_telegram_id),
+                    build_key("cache", "has_used_trial", user_telegram_id),
+                    build_key("cache", "get_user", user_telegram_id),
+                )
+            )
+
+        await invalidate_cache(self.redis_client, *keys)
+        logger.debug(f"Cache for '{len(subscriptions)}' subscriptions invalidated")
+
     @staticmethod
     def subscriptions_match(
         bot_subscription: Optional[SubscriptionDto],
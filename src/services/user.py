@@ -1,4 +1,5 @@
-from typing import Optional, Union
+import time
+from typing import Awaitable, Callable, Final, Optional, Union
 
 from aiogram import Bot
 from aiogram.types import Message
@@ -6,6 +7,8 @@ from aiogram.types import User as AiogramUser
 from fluentogram import TranslatorHub
 from loguru import logger
 from redis.asyncio import Redis
+from redis.asyncio.client import Pipeline
+from redis.exceptions import WatchError
 from sqlalchemy.exc import IntegrityError
 
 from src.core.config import AppConfig
@@ -15,10 +18,11 @@ from src.core.constants import (
     REMNASHOP_PREFIX,
     TIME_5M,
     TIME_10M,
+    USER_LOCAL_CACHE_TTL,
 )
 from src.core.enums import Locale, UserRole
 from src.core.storage.key_builder import StorageKey, build_key
-from src.core.storage.keys import RecentActivityUsersKey
+from src.core.storage.keys import BlockedUserIdsKey, RecentActivityUsersKey, UserRoleIdsKey
 from src.core.utils.formatters import format_user_name
 from src.core.utils.generators import generate_referral_code
 from src.core.utils.types import RemnaUserDto
@@ -27,9 +31,14 @@ from src.infrastructure.database.models.dto import UserDto
 from src.infrastructure.database.models.dto.user import BaseUserDto
 from src.infrastructure.database.models.sql import User
 from src.infrastructure.redis import RedisRepository, redis_cache
+from src.infrastructure.redis.cache import decode_from_cache, encode_for_cache, invalidate_cache
 
 from .base import BaseService
 
+# NOTE: Marks an ID set as fully built, so an empty list can be cached
+# and a set created by an in-place patch is never mistaken for a complete one
+IDS_CACHE_SENTINEL: Final[str] = "*"
+
 
 class UserService(BaseService):
     uow: UnitOfWork
@@ -69,29 +78,46 @@ class UserService(BaseService):
             db_created_user = await self.uow.repository.users.create(db_user)
 
         await self.clear_user_cache(user.telegram_id)
+        await self._on_user_created(user)
         logger.info(f"Created new user '{user.telegram_id}'")
         return UserDto.from_model(db_created_user)  # type: ignore[return-value]
 
     async def create_from_panel(self, remna_user: RemnaUserDto) -> UserDto:
-        user = UserDto(
-            telegram_id=remna_user.telegram_id,
-            referral_code=generate_referral_code(
-                remna_user.telegram_id,  # type: ignore[arg-type]
-                secret=self.config.crypt_key.get_secret_value(),
-            ),
-            name=str(remna_user.telegram_id),
-            role=UserRole.USER,
-            language=self.config.default_locale,
-        )
+        user = self._build_panel_user(remna_user.telegram_id)  # type: ignore[arg-type]
         db_user = User(**user.model_dump())
 
         async with self.uow:
             db_created_user = await self.uow.repository.users.create(db_user)
 
         await self.clear_user_cache(user.telegram_id)
+        await self._on_user_created(user)
         logger.info(f"Created new user '{user.telegram_id}' from panel")
         return UserDto.from_model(db_created_user)  # type: ignore[return-value]
 
+    async def create_many_from_panel(self, telegram_ids: list[int]) -> list[int]:
+        # NOTE: Generated columns are left unset so the database fills them
+        db_users = [
+            User(
+                **self._build_panel_user(telegram_id).model_dump(
+                    exclude={"id", "created_at", "updated_at", "current_subscription"}
+                )
+            )
+            for telegram_id in telegram_ids
+        ]
+
+        async with self.uow:
+            created_ids = await self.uow.repository.users.create_many_if_missing(db_users)
+
+        if created_ids:
+            await invalidate_cache(
+                self.redis_client,
+                *(build_key("cache", "get_user", telegram_id) for telegram_id in created_ids),
+            )
+            await self._on_users_created(created_ids)
+
+        logger.info(f"Created '{len(created_ids)}' new users from panel")
+        return created_ids
+
     async def get_or_create_stub(
         self,
         telegram_id: int,
@@ -120,10 +146,11 @@ class UserService(BaseService):
             db_created_user = await self.uow.repository.users.create(db_user)
 
         await self.clear_user_cache(telegram_id)
+        await self._on_user_created(user)
         logger.info(f"Created stub user '{telegram_id}'")
         return UserDto.from_model(db_created_user)  # type: ignore[return-value]
 
-    @redis_cache(prefix="get_user", ttl=TIME_5M)
+    @redis_cache(prefix="get_user", ttl=TIME_5M, local_ttl=USER_LOCAL_CACHE_TTL)
     async def get(self, telegram_id: int) -> Optional[UserDto]:
         async with self.uow:
             db_user = await self.uow.repository.users.get(telegram_id)
@@ -136,14 +163,21 @@ class UserService(BaseService):
         return UserDto.from_model(db_user)
 
     async def update(self, user: UserDto) -> Optional[UserDto]:
+        changed_data = user.prepare_changed_data()
+
         async with self.uow:
             db_updated_user = await self.uow.repository.users.update(
                 telegram_id=user.telegram_id,
-                **user.prepare_changed_data(),
+                **changed_data,
             )
 
         if db_updated_user:
             await self.clear_user_cache(db_updated_user.telegram_id)
+            await self._patch_list_caches(
+                db_updated_user.telegram_id,
+                role=db_updated_user.role if "role" in changed_data else None,
+                is_blocked=db_updated_user.is_blocked if "is_blocked" in changed_data else None,
+            )
             logger.info(f"Updated user '{user.telegram_id}' successfully")
         else:
             logger.warning(
@@ -205,13 +239,16 @@ class UserService(BaseService):
 
             if result:
                 await self.clear_user_cache(user.telegram_id)
+                await self._on_user_deleted(user.telegram_id)
                 await self._remove_from_recent_activity(user.telegram_id)
 
             logger.info(f"Deleted user '{user.telegram_id}': '{result}'")
             return result
 
         except IntegrityError as exc:
-            logger.exception(f"Failed to delete user '{user.telegram_id}' due to FK constraints: {exc}")
+            logger.exception(
+                f"Failed to delete user '{user.telegram_id}' due to FK constraints: {exc}"
+            )
             return False
 
     async def get_by_partial_name(self, query: str) -> list[UserDto]:
@@ -227,7 +264,7 @@ class UserService(BaseService):
 
         return UserDto.from_model(user)
 
-    @redis_cache(prefix="users_count", ttl=TIME_10M)
+    @redis_cache(prefix="users_count", ttl=TIME_10M, stale_ttl=TIME_10M)
     async def count(self) -> int:
         async with self.uow:
             count = await self.uow.repository.users.count()
@@ -235,23 +272,67 @@ class UserService(BaseService):
         logger.debug(f"Total users count: '{count}'")
         return count
 
-    @redis_cache(prefix="get_by_role", ttl=TIME_10M)
+    async def get_many(self, telegram_ids: list[int]) -> list[UserDto]:
+        if not telegram_ids:
+            return []
+
+        users: dict[int, UserDto] = {}
+        cached_values = await self.redis_client.mget(
+            [build_key("cache", "get_user", telegram_id) for telegram_id in telegram_ids]
+        )
+
+        for telegram_id, cached_value in zip(telegram_ids, cached_values):
+            if cached_value is None:
+                continue
+
+            try:
+                users[telegram_id] = UserDto.model_validate_json(decode_from_cache(cached_value))
+            except Exception as exception:
+                logger.warning(f"Cache read failed for user '{telegram_id}': {exception}")
+
+        missing_ids = [telegram_id for telegram_id in telegram_ids if telegram_id not in users]
+
+        if missing_ids:
+            async with self.uow:
+                db_users = await self.uow.repository.users.get_by_ids(missing_ids)
+
+            pipeline = self.redis_client.pipeline(transaction=False)
+            for user in UserDto.from_model_list(db_users):
+                users[user.telegram_id] = user
+                pipeline.setex(
+                    build_key("cache", "get_user", user.telegram_id),
+                    TIME_5M,
+                    encode_for_cache(user.model_dump()),
+                )
+            await pipeline.execute()
+
+        logger.debug(
+            f"Retrieved '{len(users)}' users ({len(telegram_ids) - len(missing_ids)} from cache)"
+        )
+        return [users[telegram_id] for telegram_id in telegram_ids if telegram_id in users]
+
     async def get_by_role(self, role: UserRole) -> list[UserDto]:
-        async with self.uow:
-            db_users = await self.uow.repository.users.filter_by_role(role)
+        async def load_ids() -> list[int]:
+            async with self.uow:
+                return await self.uow.repository.users.get_ids_by_role(role)
 
-        logger.debug(f"Retrieved '{len(db_users)}' users with role '{role}'")
-        return UserDto.from_model_list(db_users)
+        telegram_ids = await self._get_cached_ids(UserRoleIdsKey(role=role), load_ids)
+        users = await self.get_many(telegram_ids)
+
+        logger.debug(f"Retrieved '{len(users)}' users with role '{role}'")
+        return users
 
-    @redis_cache(prefix="get_blocked_users", ttl=TIME_10M)
     async def get_blocked_users(self) -> list[UserDto]:
-        async with self.uow:
-            db_users = await self.uow.repository.users.filter_by_blocked(blocked=True)
+        async def load_ids() -> list[int]:
+            async with self.uow:
+                return await self.uow.repository.users.get_blocked_ids()
 
-        logger.debug(f"Retrieved '{len(db_users)}' blocked users")
-        return UserDto.from_model_list(list(reversed(db_users)))
+        telegram_ids = await self._get_cached_ids(BlockedUserIdsKey(), load_ids)
+        users = await self.get_many(telegram_ids)
+
+        logger.debug(f"Retrieved '{len(users)}' blocked users")
+        return sorted(users, key=lambda user: user.id or 0, reverse=True)
 
-    @redis_cache(prefix="get_all", ttl=TIME_10M)
     async def get_all(self) -> list[UserDto]:
         async with self.uow:
             db_users = await self.uow.repository.users.get_all()
@@ -259,6 +340,16 @@ class UserService(BaseService):
         logger.debug(f"Retrieved '{len(db_users)}' users")
         return UserDto.from_model_list(db_users)
 
+    async def get_page(self, page: int, page_size: int) -> list[UserDto]:
+        async with self.uow:
+            db_users = await self.uow.repository.users.get_page(
+                limit=page_size,
+                offset=(page - 1) * page_size,
+            )
+
+        logger.debug(f"Retrieved '{len(db_users)}' users for page '{page}'")
+        return UserDto.from_model_list(db_users)
+
     async def set_block(self, user: UserDto, blocked: bool) -> None:
         user.is_blocked = blocked
 
@@ -269,6 +360,7 @@ class UserService(BaseService):
             )
 
         await self.clear_user_cache(user.telegram_id)
+        await self._patch_list_caches(user.telegram_id, is_blocked=blocked)
         logger.info(f"Set block={blocked} for user '{user.telegram_id}'")
 
     async def set_bot_blocked(self, user: UserDto, blocked: bool) -> None:
@@ -283,6 +375,19 @@ class UserService(BaseService):
         await self.clear_user_cache(user.telegram_id)
         logger.info(f"Set bot_blocked={blocked} for user '{user.telegram_id}'")
 
+    async def set_bot_blocked_many(self, telegram_ids: list[int], blocked: bool = True) -> None:
+        if not telegram_ids:
+            return
+
+        async with self.uow:
+            updated = await self.uow.repository.users.set_bot_blocked_many(telegram_ids, blocked)
+
+        await invalidate_cache(
+            self.redis_client,
+            *[build_key("cache", "get_user", telegram_id) for telegram_id in telegram_ids],
+        )
+        logger.info(f"Set bot_blocked={blocked} for '{updated}' users")
+
     async def set_role(self, user: UserDto, role: UserRole) -> None:
         user.role = role
 
@@ -293,6 +398,7 @@ class UserService(BaseService):
             )
 
         await self.clear_user_cache(user.telegram_id)
+        await self._patch_list_caches(user.telegram_id, role=role)
         logger.info(f"Set role='{role.name}' for user '{user.telegram_id}'")
 
     #
@@ -312,22 +418,21 @@ class UserService(BaseService):
         return UserDto.from_model_list(list(reversed(db_users)))
 
     async def get_recent_activity_users(self, excluded_ids: list[int] = []) -> list[UserDto]:
-        telegram_ids = await self._get_recent_activity()
-        users: list[UserDto] = []
-
-        for telegram_id in telegram_ids:
-            if telegram_id in excluded_ids:
-                continue
+        telegram_ids = [
+            telegram_id
+            for telegram_id in await self._get_recent_activity()
+            if telegram_id not in excluded_ids
+        ]
+        users = await self.get_many(telegram_ids)
 
-            user = await self.get(telegram_id)
+        found_ids = {user.telegram_id for user in users}
+        missing_ids = [telegram_id for telegram_id in telegram_ids if telegram_id not in found_ids]
 
-            if user:
-                users.append(user)
-            else:
-                logger.warning(
-                    f"User '{telegram_id}' not found in DB, removing from recent activity cache"
-                )
-                await self._remove_from_recent_activity(telegram_id)
+        if missing_ids:
+            logger.warning(
+                f"Users {missing_ids} not found in DB, removing from recent activity cache"
+            )
+            await self._remove_from_recent_activity(*missing_ids)
 
         logger.debug(f"Retrieved '{len(users)}' recent active users")
         return users
@@ -416,42 +521,139 @@ class UserService(BaseService):
 
     #
 
+    def _build_panel_user(self, telegram_id: int) -> UserDto:
+        return UserDto(
+            telegram_id=telegram_id,
+            referral_code=generate_referral_code(
+                telegram_id,
+                secret=self.config.crypt_key.get_secret_value(),
+            ),
+            name=str(telegram_id),
+            role=UserRole.USER,
+            language=self.config.default_locale,
+        )
+
     async def clear_user_cache(self, telegram_id: int) -> None:
         user_cache_key: str = build_key("cache", "get_user", telegram_id)
-        await self.redis_client.delete(user_cache_key)
-        await self._clear_list_caches()
+        await invalidate_cache(self.redis_client, user_cache_key)
         logger.debug(f"User cache for '{telegram_id}' invalidated")
 
-    async def _clear_list_caches(self) -> None:
-        list_cache_keys_to_invalidate = [
-            build_key("cache", "get_blocked_users"),
-            build_key("cache", "count"),
-            build_key("cache", "get_all"),
-        ]
+    async def _on_user_created(self, user: UserDto) -> None:
+        await self.redis_client.delete(build_key("cache", "users_count"))
+        await self._patch_list_caches(user.telegram_id, role=user.role)
+
+    async def _on_users_created(self, telegram_ids: list[int]) -> None:
+        # NOTE: Panel users always start as plain users
+        pipeline = self.redis_client.pipeline(transaction=False)
+        pipeline.delete(build_key("cache", "users_count"))
+        pipeline.sadd(UserRoleIdsKey(role=UserRole.USER).pack(), *telegram_ids)
+        self._bump_ids_generation(pipeline, UserRoleIdsKey(role=UserRole.USER).pack())
+        await pipeline.execute()
+
+    async def _on_user_deleted(self, telegram_id: int) -> None:
+        pipeline = self.redis_client.pipeline(transaction=False)
+        pipeline.delete(build_key("cache", "users_count"))
+        pipeline.srem(BlockedUserIdsKey().pack(), telegram_id)
+        self._bump_ids_generation(pipeline, BlockedUserIdsKey().pack())
 
         for role in UserRole:
-            key = build_key("cache", "get_by_role", role=role)
-            list_cache_keys_to_invalidate.append(key)
+            pipeline.srem(UserRoleIdsKey(role=role).pack(), telegram_id)
+            self._bump_ids_generation(pipeline, UserRoleIdsKey(role=role).pack())
+
+        await pipeline.execute()
+        logger.debug(f"User '{telegram_id}' removed from list caches")
+
+    async def _patch_list_caches(
+        self,
+        telegram_id: int,
+        role: Optional[UserRole] = None,
+        is_blocked: Optional[bool] = None,
+    ) -> None:
+        if role is None and is_blocked is None:
+            return
 
-        await self.redis_client.delete(*list_cache_keys_to_invalidate)
-        logger.debug("List caches invalidated")
+        pipeline = self.redis_client.pipeline(transaction=False)
+
+        if role is not None:
+            for key_role in UserRole:
+                key = UserRoleIdsKey(role=key_role).pack()
+                if key_role == role:
+                    pipeline.sadd(key, telegram_id)
+                else:
+                    pipeline.srem(key, telegram_id)
+                self._bump_ids_generation(pipeline, key)
+
+        if is_blocked is not None:
+            key = BlockedUserIdsKey().pack()
+            if is_blocked:
+                pipeline.sadd(key, telegram_id)
+            else:
+                pipeline.srem(key, telegram_id)
+            self._bump_ids_generation(pipeline, key)
+
+        await pipeline.execute()
+        logger.debug(f"List caches patched for '{telegram_id}' (role={role}, blocked={is_blocked})")
+
+    async def _get_cached_ids(
+        self,
+        key: StorageKey,
+        loader: Callable[[], Awaitable[list[int]]],
+    ) -> list[int]:
+        members = await self.redis_repository.collection_members(key)
+
+        if IDS_CACHE_SENTINEL in members:
+            return [int(member) for member in members if member != IDS_CACHE_SENTINEL]
+
+        generation_key = f"{key.pack()}:generation"
+        generation = await self.redis_client.get(generation_key)
+        telegram_ids = await loader()
+
+        rebuilt = False
+
+        # NOTE: Every patch bumps the generation of the sets it touches. The set is only
+        # replaced when no patch landed since loading, otherwise the stale snapshot
+        # would overwrite a change committed in between
+        async with self.redis_client.pipeline(transaction=True) as pipeline:
+            try:
+                await pipeline.watch(generation_key)
+
+                if await pipeline.get(generation_key) == generation:
+                    pipeline.multi()
+                    pipeline.delete(key.pack())
+                    pipeline.sadd(key.pack(), IDS_CACHE_SENTINEL, *telegram_ids)
+                    pipeline.expire(key.pack(), TIME_10M)
+                    await pipeline.execute()
+                    rebuilt = True
+            except WatchError:
+                pass
+
+        if rebuilt:
+            logger.debug(f"ID set '{key.pack()}' rebuilt with '{len(telegram_ids)}' members")
+        else:
+            logger.debug(f"ID set '{key.pack()}' changed while loading, rebuild skipped")
+
+        return telegram_ids
+
+    @staticmethod
+    def _bump_ids_generation(pipeline: Pipeline, key: str) -> None:
+        pipeline.incr(f"{key}:generation")
+        pipeline.expire(f"{key}:generation", TIME_10M)
 
     async def _add_to_recent_activity(self, key: StorageKey, telegram_id: int) -> None:
-        await self.redis_repository.list_remove(key, value=telegram_id, count=0)
-        await self.redis_repository.list_push(key, telegram_id)
-        await self.redis_repository.list_trim(key, start=0, end=RECENT_ACTIVITY_MAX_COUNT - 1)
+        pipeline = self.redis_client.pipeline(transaction=True)
+        pipeline.zadd(key.pack(), {str(telegram_id): time.time()})
+        pipeline.zremrangebyrank(key.pack(), 0, -RECENT_ACTIVITY_MAX_COUNT - 1)
+        await pipeline.execute()
         logger.debug(f"User '{telegram_id}' activity updated in recent cache")
 
-    async def _remove_from_recent_activity(self, telegram_id: int) -> None:
-        await self.redis_repository.list_remove(
-            key=RecentActivityUsersKey(),
-            value=telegram_id,
-            count=0,
+    async def _remove_from_recent_activity(self, *telegram_ids: int) -> None:
+        await self.redis_repository.sorted_collection_remove(
+            RecentActivityUsersKey(), *telegram_ids
         )
-        logger.debug(f"User '{telegram_id}' removed from recent activity cache")
+        logger.debug(f"Users {list(telegram_ids)} removed from recent activity cache")
 
     async def _get_recent_activity(self) -> list[int]:
-        telegram_ids_str = await self.redis_repository.list_range(
+        telegram_ids_str = await self.redis_repository.sorted_collection_revrange(
             key=RecentActivityUsersKey(),
             start=0,
             end=RECENT_ACTIVITY_MAX_COUNT - 1,